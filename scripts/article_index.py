@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+跨天文章索引 (SQLite)
+- 以规范化 URL 为键: 去除跟踪参数和锚点, 统一协议/主机大小写/默认端口/末尾斜杠, 查询参数排序
+- 记录首次/最近出现时间与出现次数, 标题改动不会产生"新"文章
+- 爬虫和处理器按需查询, 不需要把历史数据读入内存
+
+用法:
+  python3 scripts/article_index.py              # 各范围文章数与最近 7 天新增
+  python3 scripts/article_index.py <url>        # 查询某个链接的记录
+"""
+
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
+INDEX_FILE = PROJECT_ROOT / "data" / "index" / "articles.db"
+
+# 不影响内容的跟踪/分享参数
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "spm", "scm", "from", "ref", "ref_src", "referrer", "share", "share_from",
+    "share_token", "sharer", "tt_from", "wxfrom", "isappinstalled",
+    "cmpid", "ncid", "ocid",
+}
+TRACKING_PREFIXES = ("utm_", "_hs", "pk_", "mtm_")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    scope      TEXT NOT NULL,
+    url        TEXT NOT NULL,
+    title      TEXT,
+    source     TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen  TEXT NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (scope, url)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_articles_first_seen ON articles (scope, first_seen);
+"""
+
+
+def _is_tracking(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def canonical_url(url):
+    """规范化 URL, 同一篇文章的不同写法得到同一个键"""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if url.startswith("//"):
+        url = "https:" + url
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url
+    host = (parts.hostname or "").rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+
+    # 重复的斜杠合并, 去掉末尾斜杠 (根路径为空)
+    path = "/".join(segment for segment in parts.path.split("/") if segment)
+    path = "/" + path if path else ""
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)]
+    query.sort()
+
+    # http / https 视为同一篇
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+def article_key(article):
+    """文章去重键: 规范化 URL, 没有链接时退回文章 id"""
+    return canonical_url(article.get("url", "")) or article.get("id")
+
+
+class ArticleIndex:
+    """文章索引, 同一进程内多线程共享一个连接"""
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def first_seen(self, scope, urls):
+        """{规范化URL: 首次出现时间}, 只包含索引中已有的链接"""
+        keys = list({canonical_url(url) for url in urls if url})
+        found = {}
+        with self._lock:
+            # 分批查询, 避免超过 SQLite 参数个数上限
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT url, first_seen FROM articles WHERE scope = ? AND url IN ({marks})",
+                    [scope] + batch)
+                found.update(rows)
+        return found
+
+    def is_new(self, scope, url, date):
+        """该链接在 date (YYYY-MM-DD) 之前没有出现过"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT first_seen FROM articles WHERE scope = ? AND url = ?",
+                (scope, canonical_url(url))).fetchone()
+        return row is None or row[0][:10] >= date
+
+    def record(self, scope, articles, seen_time=None):
+        """登记一批文章: 新链接写入首次出现时间, 已有链接更新最近出现时间和次数"""
+        seen_time = seen_time or datetime.now().isoformat()
+        rows = {}
+        for article in articles:
+            key = canonical_url(article.get("url", ""))
+            if key:
+                rows[key] = (scope, key, article.get("title", ""), article.get("source", ""), seen_time, seen_time)
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """INSERT INTO articles (scope, url, title, source, first_seen, last_seen)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (scope, url) DO UPDATE SET
+                       title = excluded.title,
+                       last_seen = MAX(last_seen, excluded.last_seen),
+                       first_seen = MIN(first_seen, excluded.first_seen),
+                       seen_count = seen_count + 1""",
+                list(rows.values()))
+
+    def lookup(self, url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT scope, url, title, source, first_seen, last_seen, seen_count FROM articles WHERE url = ?",
+                (canonical_url(url),)).fetchall()
+
+    def stats(self, days=7):
+        with self._lock:
+            totals = self._conn.execute("SELECT scope, COUNT(*) FROM articles GROUP BY scope").fetchall()
+            daily = self._conn.execute(
+                """SELECT scope, substr(first_seen, 1, 10) AS day, COUNT(*) FROM articles
+                   GROUP BY scope, day ORDER BY day DESC LIMIT ?""", (days * max(len(totals), 1),)).fetchall()
+        return totals, daily
+
+
+def unseen_today(index, scope, articles, now=None):
+    """登记本次抓取的文章, 返回今天之前没有出现过的部分 (同一天多次抓取的文章保留)"""
+    now = now or datetime.now()
+    today = now.strftime("%Y-%m-%d")
+    first_seen = index.first_seen(scope, (a.get("url", "") for a in articles))
+    index.record(scope, articles, now.isoformat())
+    return [a for a in articles
+            if first_seen.get(canonical_url(a.get("url", "")), today)[:10] >= today]
+
+
+def main():
+    with ArticleIndex() as index:
+        if len(sys.argv) > 1:
+            for row in index.lookup(sys.argv[1]):
+                scope, url, title, source, first_seen, last_seen, count = row
+                print(f"[{scope}] {title} ({source})\n  {url}\n  首次 {first_seen}  最近 {last_seen}  共 {count} 次")
+            return
+
+        totals, daily = index.stats()
+        for scope, count in totals:
+            print(f"{scope}: {count} 篇")
+        for scope, day, count in daily:
+            print(f"  {day} [{scope}] 新增 {count}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+处理阶段的紧凑文章表示
+- ArticleRecord 使用 __slots__, 没有逐篇的字段名字典
+- 来源、分类、日期等重复出现的字符串驻留 (sys.intern), 分类列表共享同一个元组
+- crawl_time (爬虫写入的本地时间, 带微秒) 能原样还原时保存为整数 (自 1970-01-01 起的微秒数, 按墙上时间计算, 不涉及时区);
+  market_signal / entities 为字符串列表结构时保存为驻留字符串元组, 其他结构 (旧数据的计数等) 原样保留
+- 保留 dict 风格的 get / [] 访问, 处理代码无需改动; 只在输出时 to_dict() 还原为原有 JSON 结构
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+# 输出时的字段顺序 (与爬虫写入的原始结构一致, 处理阶段字段在后)
+FIELDS = (
+    "id", "title", "url", "source", "categories", "pub_date", "crawl_time", "date",
+    "market_signal", "entities",
+    "auto_categories", "importance_score",
+    "investment_categories", "investment_score", "key_points",
+    "duplicate_count", "related_sources",
+)
+# 字符串元组字段
+TUPLE_FIELDS = ("categories", "auto_categories", "investment_categories", "key_points", "related_sources")
+SIGNAL_KEYS = ("bullish", "bearish", "neutral")
+ENTITY_KEYS = ("stocks", "companies", "sectors", "indices")
+
+_MISSING = object()
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_tuples = {}
+
+
+def _interned_tuple(values):
+    """驻留字符串组成的共享元组"""
+    key = tuple(values)
+    shared = _tuples.get(key)
+    if shared is None:
+        shared = tuple(sys.intern(v) if isinstance(v, str) else v for v in key)
+        if len(_tuples) < 100000:
+            _tuples[key] = shared
+    return shared
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _to_epoch(value):
+    """ISO 时间 -> 整数微秒数; 无法原样还原的 (带时区、非 ISO 写法等) 保留字符串"""
+    if isinstance(value, str):
+        try:
+            moment = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if moment.tzinfo is None:
+            epoch = (moment - _EPOCH) // _MICROSECOND
+            if _from_epoch(epoch) == value:
+                return epoch
+    return value
+
+def _from_epoch(epoch):
+    return (_EPOCH + epoch * _MICROSECOND).isoformat()
+
+def _lists(mapping, keys):
+    """mapping 只含 keys 中的字段且取值都是字符串列表时才压缩; 其他结构 (如旧数据的计数) 原样保留"""
+    return (isinstance(mapping, dict) and set(mapping) <= set(keys)
+            and all(isinstance(v, list) and all(isinstance(x, str) for x in v) for v in mapping.values()))
+
+def _pack_signal(signal):
+    if not (isinstance(signal, dict) and set(signal) == {"overall", *SIGNAL_KEYS}
+            and isinstance(signal["overall"], str) and _lists({k: signal[k] for k in SIGNAL_KEYS}, SIGNAL_KEYS)):
+        return signal
+    return (_intern(signal["overall"]),) + tuple(_interned_tuple(signal[k]) for k in SIGNAL_KEYS)
+
+def _unpack_signal(packed):
+    if not isinstance(packed, tuple):
+        return packed
+    signal = {k: list(v) for k, v in zip(SIGNAL_KEYS, packed[1:])}
+    signal["overall"] = packed[0]
+    return signal
+
+def _pack_entities(entities):
+    """缺少的字段记为 None, 还原时不补出"""
+    if not _lists(entities, ENTITY_KEYS):
+        return entities
+    return tuple(_interned_tuple(entities[k]) if k in entities else None for k in ENTITY_KEYS)
+
+def _unpack_entities(packed):
+    if not isinstance(packed, tuple):
+        return packed
+    return {k: list(v) for k, v in zip(ENTITY_KEYS, packed) if v is not None}
+
+
+class ArticleRecord:
+    """一篇文章; 未列入 FIELDS 的字段放在 extra 字典中"""
+
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self):
+        for name in FIELDS:
+            object.__setattr__(self, name, _MISSING)
+        self.extra = None
+
+    @classmethod
+    def from_dict(cls, article):
+        record = cls()
+        for key, value in article.items():
+            record[key] = value
+        return record
+
+    def __setitem__(self, key, value):
+        if key in TUPLE_FIELDS and isinstance(value, list):
+            value = _interned_tuple(value)
+        elif key == "crawl_time":
+            value = _to_epoch(value)
+        elif key == "market_signal":
+            value = _pack_signal(value)
+        elif key == "entities":
+            value = _pack_entities(value)
+        elif key in ("source", "date"):
+            value = _intern(value)
+
+        if key in _FIELD_SET:
+            object.__setattr__(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        """按原有字典结构取值"""
+        if key in _FIELD_SET:
+            value = object.__getattribute__(self, key)
+            if value is _MISSING:
+                return default
+            if key in TUPLE_FIELDS and isinstance(value, tuple):
+                return list(value)
+            if key == "crawl_time" and isinstance(value, int):
+                return _from_epoch(value)
+            if key == "market_signal":
+                return _unpack_signal(value)
+            if key == "entities":
+                return _unpack_entities(value)
+            return value
+        if self.extra is None:
+            return default
+        return self.extra.get(key, default)
+
+    def overall_signal(self):
+        """market_signal.overall, 不构造字典"""
+        value = self.market_signal
+        if isinstance(value, tuple):
+            return value[0]
+        return value.get("overall", "neutral") if isinstance(value, dict) else "neutral"
+
+    def to_dict(self):
+        """还原为原有 JSON 结构"""
+        article = {}
+        for name in FIELDS:
+            value = self.get(name, _MISSING)
+            if value is not _MISSING:
+                article[name] = value
+        if self.extra:
+            article.update(self.extra)
+        return article
+
+
+_FIELD_SET = frozenset(FIELDS)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+文章全文检索 (SQLite FTS5)
+- 处理器在增量摄取时把新文章写入索引 (标题、来源、分类、市场信号、评分、日期)
+- 中文按相邻两字切分 (宁德时代 -> 宁德 德时 时代), 英文/数字按单词; 查询词按同样方式切分后做短语匹配,
+  因此任意长度 >= 2 的中文词都能命中, 不依赖词典; 单个汉字按前缀匹配
+- 来源、分类、信号、日期范围都是普通索引列, 与全文条件组合查询
+- 同一范围内按规范化链接 (key) 去重, 结果中显示文章的原始链接 (url)
+
+用法:
+  python3 scripts/article_search.py 宁德时代 days=30
+  python3 scripts/article_search.py 降息 scope=finance signal=bullish since=2026-03-01 until=2026-03-15
+  python3 scripts/article_search.py OpenAI category=AI source=36氪 limit=20
+  python3 scripts/article_search.py reindex      # 从处理器的按日状态重建索引
+"""
+
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import article_index
+import raw_store
+
+PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
+SEARCH_FILE = PROJECT_ROOT / "data" / "index" / "search.db"
+# reindex 读取的按日状态目录
+STATE_DIRS = {
+    "tech": PROJECT_ROOT / "data" / "processed" / "state",
+    "finance": PROJECT_ROOT / "data" / "finance" / "processed" / "state",
+}
+# 各范围的分类/评分字段
+CATEGORY_FIELDS = ("auto_categories", "investment_categories")
+SCORE_FIELDS = ("importance_score", "investment_score")
+
+BATCH_SIZE = 500
+
+TOKEN_PATTERN = re.compile(r"[㐀-鿿豈-﫿]+|[a-z0-9]+")
+CJK_PATTERN = re.compile(r"[㐀-鿿豈-﫿]")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id       INTEGER PRIMARY KEY,
+    scope    TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    url      TEXT NOT NULL,
+    title    TEXT,
+    source   TEXT,
+    signal   TEXT,
+    score    INTEGER,
+    date     TEXT,
+    pub_date TEXT,
+    UNIQUE (scope, key)
+);
+CREATE INDEX IF NOT EXISTS idx_docs_date ON docs (date, score);
+CREATE INDEX IF NOT EXISTS idx_docs_source ON docs (source, date);
+CREATE TABLE IF NOT EXISTS doc_categories (
+    doc_id   INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    PRIMARY KEY (doc_id, category)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_doc_categories ON doc_categories (category, doc_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(text, tokenize = 'unicode61');
+"""
+
+
+def tokenize(text):
+    """切分为检索词元: 中文相邻两字, 英文/数字单词"""
+    tokens = []
+    for run in TOKEN_PATTERN.findall((text or "").lower()):
+        if CJK_PATTERN.match(run) and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+def match_query(query):
+    """查询串 -> FTS5 MATCH 表达式; 空格分隔的多个词为 AND"""
+    terms = []
+    for term in query.split():
+        tokens = tokenize(term)
+        if len(tokens) == 1 and len(tokens[0]) == 1 and CJK_PATTERN.match(tokens[0]):
+            terms.append(f'"{tokens[0]}"*')
+        elif tokens:
+            terms.append('"' + " ".join(tokens) + '"')
+    return " AND ".join(terms)
+
+
+class SearchIndex:
+    """检索索引; add 缓冲写入, flush / 退出 with 时提交"""
+
+    def __init__(self, path=SEARCH_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._conn.executescript(SCHEMA)
+        self._pending = []
+
+    def _migrate(self):
+        """旧版索引没有 key 列, url 中存的是规范化链接: 按新结构重建 docs 表 (保留 id, 全文与分类表不变);
+        原始链接在文章重新登记或 reindex 时补上"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(docs)")}
+        if not columns or "key" in columns:
+            return
+        self._conn.executescript("""
+            ALTER TABLE docs RENAME TO docs_old;
+            DROP INDEX IF EXISTS idx_docs_date;
+            DROP INDEX IF EXISTS idx_docs_source;
+        """ + SCHEMA + """
+            INSERT INTO docs (id, scope, key, url, title, source, signal, score, date, pub_date)
+                SELECT id, scope, url, url, title, source, signal, score, date, pub_date FROM docs_old;
+            DROP TABLE docs_old;
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def add(self, scope, article):
+        """登记一篇文章 (同一范围内同一链接重复登记时更新)"""
+        self._pending.append((scope, article))
+        if len(self._pending) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        with self._conn:
+            for scope, article in self._pending:
+                self._upsert(scope, article)
+        self._pending = []
+
+    def _upsert(self, scope, article):
+        key = article_index.article_key(article) or ""
+        signal = article.get("market_signal")
+        if isinstance(signal, dict):
+            signal = signal.get("overall")
+        score = next((article.get(k) for k in SCORE_FIELDS if article.get(k) is not None), None)
+        date = article.get("date") or (article.get("crawl_time") or "")[:10]
+
+        doc_id = self._conn.execute(
+            """INSERT INTO docs (scope, key, url, title, source, signal, score, date, pub_date)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (scope, key) DO UPDATE SET
+                   url = excluded.url, title = excluded.title, source = excluded.source, signal = excluded.signal,
+                   score = excluded.score, date = excluded.date, pub_date = excluded.pub_date
+               RETURNING id""",
+            (scope, key, article.get("url") or key, article.get("title", ""), article.get("source", ""), signal, score,
+             date, article.get("pub_date") or "")).fetchone()[0]
+
+        self._conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+        self._conn.execute("INSERT INTO docs_fts (rowid, text) VALUES (?, ?)",
+                           (doc_id, " ".join(tokenize(article.get("title", "")))))
+        self._conn.execute("DELETE FROM doc_categories WHERE doc_id = ?", (doc_id,))
+        categories = {cat for field in CATEGORY_FIELDS for cat in article.get(field) or []}
+        self._conn.executemany("INSERT INTO doc_categories (doc_id, category) VALUES (?, ?)",
+                               [(doc_id, cat) for cat in categories])
+
+    def search(self, query=None, scope=None, source=None, category=None, signal=None,
+               since=None, until=None, limit=50):
+        """检索文章, 按日期倒序 (同日按评分); 返回字典列表"""
+        sql = "SELECT d.scope, d.date, d.title, d.source, d.url, d.signal, d.score FROM docs d"
+        where, params = [], []
+        if query:
+            expression = match_query(query)
+            if not expression:
+                return []
+            sql += " JOIN docs_fts f ON f.rowid = d.id"
+            where.append("docs_fts MATCH ?")
+            params.append(expression)
+        for column, value in (("d.scope", scope), ("d.source", source), ("d.signal", signal)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if category:
+            where.append("d.id IN (SELECT doc_id FROM doc_categories WHERE category = ?)")
+            params.append(category)
+        if since:
+            where.append("d.date >= ?")
+            params.append(since)
+        if until:
+            where.append("d.date <= ?")
+            params.append(until)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY d.date DESC, d.score DESC LIMIT ?"
+        params.append(limit)
+
+        self.flush()
+        columns = ("scope", "date", "title", "source", "url", "signal", "score")
+        return [dict(zip(columns, row)) for row in self._conn.execute(sql, params)]
+
+    def count(self):
+        return self._conn.execute("SELECT scope, COUNT(*) FROM docs GROUP BY scope").fetchall()
+
+
+def reindex(index):
+    """从按日状态文件重建索引, 返回文章数"""
+    total = 0
+    for scope, state_dir in STATE_DIRS.items():
+        paths = sorted(state_dir.glob("day_*.jsonl")) + sorted(state_dir.glob("day_*.json"))
+        for path in paths:
+            for article in raw_store.iter_articles(path):
+                index.add(scope, article)
+                total += 1
+    index.flush()
+    return total
+
+
+def main():
+    args = sys.argv[1:]
+    with SearchIndex() as index:
+        if args[:1] == ["reindex"]:
+            print(f"已索引 {reindex(index)} 篇")
+            return
+        if not args:
+            for scope, count in index.count():
+                print(f"{scope}: {count} 篇")
+            return
+
+        # 查询词 + key=value 过滤条件
+        filters = dict(arg.split("=", 1) for arg in args if "=" in arg)
+        query = " ".join(arg for arg in args if "=" not in arg)
+        if "days" in filters:
+            filters.setdefault("since", (datetime.now() - timedelta(days=int(filters["days"]))).strftime("%Y-%m-%d"))
+        options = {k: filters[k] for k in ("scope", "source", "category", "signal", "since", "until") if k in filters}
+
+        start = time.perf_counter()
+        results = index.search(query, limit=int(filters.get("limit", 50)), **options)
+        elapsed = (time.perf_counter() - start) * 1000
+        for r in results:
+            signal = f" [{r['signal']}]" if r["signal"] else ""
+            print(f"{r['date']} [{r['scope']}] {r['title']} ({r['source']}){signal}\n  {r['url']}")
+        print(f"共 {len(results)} 条, 耗时 {elapsed:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+按日期范围重新处理历史数据 (修改分类词库、评分权重后回填)
+1. 先摄取尚未处理的原始文件
+2. 范围内每一天: 按当前词库重新标注按日状态中的全部文章, 原子重写状态文件,
+   同步全文检索索引, 重建日汇总 (按天分给多个进程并行)
+3. 实体基线按日期顺序从日汇总重放, 得到每天的提及异动
+4. 每天重新生成处理结果 processed_YYYY-MM-DD.json (原子写入, 并行), 可选重新生成报告
+- 每天完成的阶段记入检查点 (处理目录下的 backfill_checkpoint.json), 中断后重新运行同一命令从断点继续
+- 检查点带词库指纹 (处理器、词库模块、分类配置的内容哈希), 词库或评分代码变化后自动作废
+
+用法:
+  python3 scripts/backfill.py tech 2026-01-01 2026-03-15
+  python3 scripts/backfill.py finance 2026-03-01 2026-03-15 workers=4 reports=1
+  python3 scripts/backfill.py tech 2026-03-15 force=1        # 忽略检查点, 单日重做
+"""
+
+import hashlib
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import article_record
+import article_search
+import daily_rollup
+import entity_trends
+import finance_analyzer
+import finance_annotator
+import finance_processor
+import keyword_automaton
+import output_store
+import process_pool
+import tech_analyzer
+import tech_processor
+
+PROCESSORS = {"tech": tech_processor, "finance": finance_processor}
+ANALYZERS = {"tech": tech_analyzer, "finance": finance_analyzer}
+# 决定标注结果的模块 (内容变化时检查点作废)
+LEXICON_MODULES = {
+    "tech": (tech_processor, keyword_automaton),
+    "finance": (finance_processor, finance_annotator, keyword_automaton),
+}
+CHECKPOINT_NAME = "backfill_checkpoint.json"
+
+# 每天的阶段
+ANNOTATED = "annotated"
+DONE = "done"
+
+
+def fingerprint(scope):
+    """词库指纹: 标注相关源码与分类配置的内容哈希"""
+    digest = hashlib.sha256()
+    paths = [module.__file__ for module in LEXICON_MODULES[scope]]
+    if scope == "tech":
+        paths.append(tech_processor.SOURCES_FILE)
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b"-")
+    return digest.hexdigest()[:16]
+
+def date_range(start, end):
+    day = datetime.strptime(start, "%Y-%m-%d")
+    last = datetime.strptime(end, "%Y-%m-%d")
+    dates = []
+    while day <= last:
+        dates.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return dates
+
+
+class Checkpoint:
+    """每天完成到哪个阶段, 每次更新都原子写入"""
+
+    def __init__(self, path, fingerprint, reset=False):
+        self.path = path
+        self.fingerprint = fingerprint
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.days = data.get("days", {}) if data.get("fingerprint") == fingerprint and not reset else {}
+
+    def stage(self, date):
+        return self.days.get(date, (None, 0))[0]
+
+    def articles(self, date):
+        return self.days.get(date, (None, 0))[1]
+
+    def mark(self, date, stage, articles):
+        self.days[date] = (stage, articles)
+        output_store.atomic_write(self.path, json.dumps({"fingerprint": self.fingerprint, "days": self.days},
+                                                        ensure_ascii=False, sort_keys=True))
+
+
+# 工作进程状态 (由 _init_worker 设置)
+_worker = {}
+
+def _init_worker(scope):
+    """工作进程启动时加载分类配置并编译一次词库"""
+    processor = PROCESSORS[scope]
+    if scope == "tech":
+        categories = processor.load_categories()
+        processor.keyword_automaton()
+        _worker["annotate"] = lambda articles: processor.annotate_articles(articles, categories, 1)
+    else:
+        finance_annotator.warm()
+        _worker["annotate"] = lambda articles: processor.annotate_articles(articles, 1)
+    _worker["scope"] = scope
+
+def _reannotate_day(date):
+    """按当前词库重新标注某天的全部文章, 重写状态、检索索引和日汇总; 返回 (日期, 文章数)"""
+    scope = _worker["scope"]
+    processor = PROCESSORS[scope]
+    state = processor.open_state()
+    articles = list(state.iter_day(date))
+    if not articles:
+        return date, 0
+
+    for article in articles:
+        for key in processor.ANNOTATION_FIELDS:
+            article.pop(key, None)
+    _worker["annotate"](articles)
+    state.rewrite_day(date, articles)
+
+    with article_search.SearchIndex() as search:
+        for article in articles:
+            search.add(scope, article)
+    daily_rollup.save(daily_rollup.build(scope, date, articles), processor.PROCESSED_DIR / "rollups")
+    return date, len(articles)
+
+def _write_day(date, entity_spikes):
+    """重新生成某天的处理结果; 返回 (日期, 文章数)"""
+    processor = PROCESSORS[_worker["scope"]]
+    articles = [article_record.ArticleRecord.from_dict(a) for a in processor.open_state().iter_day(date)]
+    processor.save_processed(date, articles, entity_spikes)
+    return date, len(articles)
+
+def _run(scope, func, jobs, workers):
+    """按天执行 func(*参数), 完成一天产出一天的结果 (顺序不定); 单进程时直接在当前进程执行"""
+    if workers <= 1 or len(jobs) <= 1:
+        _init_worker(scope)
+        for args in jobs:
+            yield func(*args)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(scope,)) as pool:
+        for future in as_completed([pool.submit(func, *args) for args in jobs]):
+            yield future.result()
+
+
+def backfill(scope, start, end, workers=None, reports=False, force=False):
+    """重新处理 [start, end] 内的每一天, 返回处理的文章总数"""
+    processor = PROCESSORS[scope]
+    dates = date_range(start, end)
+    workers = min(process_pool.worker_count(workers or 0), len(dates))
+    checkpoint = Checkpoint(processor.PROCESSED_DIR / CHECKPOINT_NAME, fingerprint(scope), force)
+    started = time.perf_counter()
+
+    # 1. 尚未处理的原始文件 (新文章按当前词库标注)
+    processor.ingest_new(processor.open_state(), workers=workers)
+
+    # 2. 重新标注
+    pending = [(date,) for date in dates if checkpoint.stage(date) is None]
+    print(f"🔁 {scope} {start} ~ {end}: 共 {len(dates)} 天, 待重新标注 {len(pending)} 天, {workers} 个进程")
+    for date, count in _run(scope, _reannotate_day, pending, workers):
+        if count:
+            # 没有数据的日子不记入, 之后补到原始数据时仍会处理
+            checkpoint.mark(date, ANNOTATED, count)
+            print(f"   {date}: 重新标注 {count} 篇")
+
+    # 3. 实体基线按日期顺序重放
+    spikes = entity_trends.rebuild(scope, processor.PROCESSED_DIR)
+
+    # 4. 处理结果
+    pending = [(date, spikes.get(date, [])) for date in dates if checkpoint.stage(date) == ANNOTATED]
+    for date, count in _run(scope, _write_day, pending, workers):
+        checkpoint.mark(date, DONE, count)
+        print(f"   {date}: 处理结果已更新 ({count} 篇)")
+
+    # 报告在主进程中逐天生成 (输出存储的清单不能多进程同时写)
+    if reports:
+        for date in dates:
+            if checkpoint.articles(date):
+                ANALYZERS[scope].main(date)
+
+    total = sum(checkpoint.articles(date) for date in dates)
+    print(f"✅ 回填完成: {total} 篇, 耗时 {time.perf_counter() - started:.1f} 秒")
+    return total
+
+def main():
+    args = sys.argv[1:]
+    options = dict(arg.split("=", 1) for arg in args if "=" in arg)
+    positional = [arg for arg in args if "=" not in arg]
+    if not positional or positional[0] not in PROCESSORS or len(positional) < 2:
+        print(__doc__)
+        return
+
+    scope, start = positional[0], positional[1]
+    end = positional[2] if len(positional) > 2 else start
+    backfill(scope, start, end, workers=int(options.get("workers", 0)),
+             reports=options.get("reports") == "1", force=options.get("force") == "1")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+响应体字符集识别
+按以下顺序确定编码, 每个响应体只解码一次:
+1. Content-Type 响应头中的 charset
+2. 文档前 4KB 内的 <meta charset> / http-equiv
+3. 该站点上次运行学到的编码 (按主机缓存); 前缀含非 ASCII 字节且判断结果与缓存不符时以前缀为准
+4. 检查前 4KB 是否为合法 UTF-8, 否则按 GB18030 处理
+- 前缀全是 ASCII 时无法区分 UTF-8 与 GBK, 这样猜出的编码不写入站点缓存
+- 没有声明 (来自缓存或猜测) 的 UTF-8 按严格模式解码; 遇到非法字节时, 其后内容仍是合法 UTF-8 的
+  视为个别坏字节 (替换为 U+FFFD), 否则从出错处起改按 GB18030 解码; 出错前已解码的文字不变,
+  解码出错推断的编码不写入站点缓存
+取代对整个响应体依次尝试 utf-8 / gbk / gb2312 / latin-1 的做法
+"""
+
+import codecs
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
+CACHE_FILE = PROJECT_ROOT / "data" / "cache" / "charsets.json"
+
+SNIFF_BYTES = 4096
+DECODE_CHUNK = 64 * 1024
+
+# GBK / GB2312 统一按超集 GB18030 解码
+ALIASES = {
+    "gb2312": "gb18030", "gbk": "gb18030", "x-gbk": "gb18030", "cp936": "gb18030",
+    "utf8": "utf-8",
+}
+
+CONTENT_TYPE_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+
+def normalize(name):
+    """规范化编码名, 无法识别时返回 None"""
+    if not name:
+        return None
+    name = name.strip().lower()
+    try:
+        name = codecs.lookup(ALIASES.get(name, name)).name
+    except LookupError:
+        return None
+    return ALIASES.get(name, name)
+
+def from_content_type(value):
+    match = CONTENT_TYPE_CHARSET.search(value or "")
+    return normalize(match.group(1)) if match else None
+
+def from_meta(head):
+    match = META_CHARSET.search(head)
+    return normalize(match.group(1).decode("ascii", "ignore")) if match else None
+
+def sniff(head):
+    """无任何声明时根据前缀判断"""
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "gb18030"
+
+
+class CharsetCache:
+    """按主机记录上次识别出的编码, 线程安全"""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = Path(path)
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, key):
+        with self._lock:
+            return self._load().get(key)
+
+    def learn(self, key, encoding):
+        with self._lock:
+            entries = self._load()
+            if entries.get(key) != encoding:
+                entries[key] = encoding
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    merged = json.load(f)
+            except (OSError, ValueError):
+                merged = {}
+            merged.update(self._entries)
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def default_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = CharsetCache()
+        return _default_cache
+
+
+def _detect(resp, cache):
+    """返回 (编码, 是否有声明, 站点键); 有声明或前缀含非 ASCII 字节时记录到站点缓存"""
+    key = urlsplit(resp.url).netloc.lower()
+    head = resp.content[:SNIFF_BYTES]
+
+    encoding = from_content_type(resp.header("Content-Type")) or from_meta(head)
+    if encoding:
+        cache.learn(key, encoding)
+        return encoding, True, key
+    encoding = cache.get(key)
+    if head.isascii():
+        return encoding or sniff(head), False, key
+    sniffed = sniff(head)
+    if encoding != sniffed:
+        encoding = sniffed
+        cache.learn(key, encoding)
+    return encoding, False, key
+
+def resolve(resp, cache=None):
+    """确定响应体编码, 并记录到站点缓存"""
+    return _detect(resp, cache or default_cache())[0]
+
+def iter_decoded(resp, cache=None):
+    """按块解码响应体, 配合链接提取器使用时未读到的部分不会被解码"""
+    cache = cache or default_cache()
+    encoding, declared, key = _detect(resp, cache)
+    # 未声明的 UTF-8 可能只是前缀恰好全为 ASCII: 严格解码, 出错时再判断
+    strict = not declared and encoding == "utf-8"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="strict" if strict else "replace")
+    content = resp.content
+    for i in range(0, len(content), DECODE_CHUNK):
+        chunk = content[i:i + DECODE_CHUNK]
+        following = content[i + DECODE_CHUNK:i + DECODE_CHUNK + SNIFF_BYTES]
+        text = ""
+        while True:
+            try:
+                text += decoder.decode(chunk)
+                break
+            except UnicodeDecodeError as exc:
+                # exc.object 为上块末尾未解码的字节加本块; 出错位置之前都是合法 UTF-8
+                data = exc.object
+                text += data[:exc.start].decode("utf-8")
+                rest = data[exc.end:]
+                if sniff((rest + following)[:SNIFF_BYTES]) == "utf-8":
+                    # 个别坏字节: 替换后继续严格解码
+                    text += "\ufffd"
+                    decoder = codecs.getincrementaldecoder("utf-8")(errors="strict")
+                    chunk = rest
+                else:
+                    decoder = codecs.getincrementaldecoder("gb18030")(errors="replace")
+                    chunk = data[exc.start:]
+        if text:
+            yield text
+    try:
+        tail = decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        # 末尾是不完整的 UTF-8 序列
+        tail = decoder.getstate()[0].decode("utf-8", errors="replace")
+    if tail:
+        yield tail
+
+def decode(resp, cache=None):
+    """一次性解码整个响应体"""
+    return "".join(iter_decoded(resp, cache))
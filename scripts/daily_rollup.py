@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+按日汇总与多日窗口统计
+- 处理器每次运行后把当天文章的计数 (来源/分类/实体/公司/多空信号) 写入 rollups/rollup_YYYY-MM-DD.json,
+  计数不截断, 任意多天可以精确相加
+- N 天窗口统计 = 合并 N 个日汇总, 耗时与天数成正比, 与文章总数无关
+- 缺少汇总或汇总早于按日状态的日期, 从处理器的按日状态 (state/day_*.jsonl) 补建一次
+
+用法:
+  python3 scripts/daily_rollup.py tech days=7                  # 生成截至今天的 7 日窗口报告
+  python3 scripts/daily_rollup.py finance days=30 date=2026-03-15
+  python3 scripts/daily_rollup.py tech rebuild                 # 从按日状态重建全部日汇总
+"""
+
+import json
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import output_store
+import raw_store
+from article_record import ENTITY_KEYS
+
+PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
+PROCESSED_DIRS = {
+    "tech": PROJECT_ROOT / "data" / "processed",
+    "finance": PROJECT_ROOT / "data" / "finance" / "processed",
+}
+OUTPUT_DIRS = {
+    "tech": PROJECT_ROOT / "output" / "tech",
+    "finance": PROJECT_ROOT / "output" / "finance",
+}
+CATEGORY_FIELDS = {"tech": "auto_categories", "finance": "investment_categories"}
+
+# 日汇总中的计数项
+COUNTERS = ("source_stats", "category_stats", "entity_stats", "company_stats", "signal_stats")
+# 窗口报告中实体/公司只保留前若干项
+TOP_ENTITIES = 20
+
+
+def rollup_dir(scope):
+    return PROCESSED_DIRS[scope] / "rollups"
+
+def rollup_path(scope, date):
+    return rollup_dir(scope) / f"rollup_{date}.json"
+
+def _state_path(scope, date):
+    """按日状态文件 (兼容旧的整文件 .json), 不存在时返回 None"""
+    path = PROCESSED_DIRS[scope] / "state" / f"day_{date}.jsonl"
+    for candidate in (path, path.with_suffix(".json")):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def build(scope, date, articles):
+    """统计一天的文章 (字典或 ArticleRecord), 返回日汇总"""
+    counters = {key: Counter() for key in COUNTERS}
+    category_field = CATEGORY_FIELDS[scope]
+    total = 0
+    for article in articles:
+        total += 1
+        counters["source_stats"][article.get("source") or "未知"] += 1
+        for cat in article.get(category_field) or []:
+            counters["category_stats"][cat] += 1
+
+        signal = article.get("market_signal")
+        if isinstance(signal, dict):
+            counters["signal_stats"][signal.get("overall", "neutral")] += 1
+
+        entities = article.get("entities") or {}
+        for key in ENTITY_KEYS:
+            for name in entities.get(key, []):
+                counters["entity_stats"][name] += 1
+        for name in entities.get("companies", []):
+            counters["company_stats"][name] += 1
+
+    rollup = {"scope": scope, "date": date, "total": total}
+    rollup.update((key, dict(counter)) for key, counter in counters.items())
+    return rollup
+
+def save(rollup, directory=None):
+    """写入日汇总; directory 默认为该范围处理目录下的 rollups/"""
+    directory = Path(directory) if directory else rollup_dir(rollup["scope"])
+    path = directory / f"rollup_{rollup['date']}.json"
+    output_store.atomic_write(path, json.dumps(rollup, ensure_ascii=False))
+    return path
+
+def rebuild_day(scope, date):
+    """从按日状态重建某天的汇总; 当天没有数据时返回 None"""
+    state = _state_path(scope, date)
+    if state is None:
+        return None
+    rollup = build(scope, date, raw_store.iter_articles(state))
+    save(rollup)
+    return rollup
+
+def load(scope, date):
+    """读取某天的汇总, 缺失或早于按日状态时补建"""
+    path = rollup_path(scope, date)
+    state = _state_path(scope, date)
+    if path.exists() and (state is None or state.stat().st_mtime <= path.stat().st_mtime):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return rebuild_day(scope, date)
+
+
+def _sorted(counter, limit=None):
+    items = sorted(counter.items(), key=lambda x: x[1], reverse=True)
+    return dict(items[:limit] if limit else items)
+
+def merge(rollups):
+    """合并多个日汇总为窗口统计"""
+    total = 0
+    counters = {key: Counter() for key in COUNTERS}
+    date_stats = {}
+    for rollup in rollups:
+        total += rollup["total"]
+        date_stats[rollup["date"]] = rollup["total"]
+        for key in COUNTERS:
+            counters[key].update(rollup.get(key, {}))
+
+    return {
+        "total": total,
+        "signal_stats": _sorted(counters["signal_stats"]),
+        "source_stats": _sorted(counters["source_stats"]),
+        "category_stats": _sorted(counters["category_stats"]),
+        "entity_stats": _sorted(counters["entity_stats"], TOP_ENTITIES),
+        "date_stats": dict(sorted(date_stats.items())),
+        "company_stats": _sorted(counters["company_stats"], TOP_ENTITIES),
+    }
+
+def window(scope, end_date, days):
+    """截至 end_date (含) 的 days 天窗口统计"""
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    dates = [(end - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(days - 1, -1, -1)]
+    return merge(filter(None, (load(scope, date) for date in dates)))
+
+
+def rebuild_all(scope):
+    """从全部按日状态重建日汇总, 返回天数"""
+    state_dir = PROCESSED_DIRS[scope] / "state"
+    dates = sorted({path.name[4:14] for path in state_dir.glob("day_*.json*")})
+    return sum(1 for date in dates if rebuild_day(scope, date) is not None)
+
+def main():
+    args = sys.argv[1:]
+    scope = args[0] if args and args[0] in PROCESSED_DIRS else "tech"
+    if "rebuild" in args:
+        print(f"✅ 已重建 {rebuild_all(scope)} 天的日汇总")
+        return
+
+    options = dict(arg.split("=", 1) for arg in args if "=" in arg)
+    days = int(options.get("days", 7))
+    date = options.get("date", datetime.now().strftime("%Y-%m-%d"))
+
+    analysis = window(scope, date, days)
+    report = {
+        "date": date,
+        "date_range": days,
+        "type": scope,
+        "generated_at": datetime.now().isoformat(),
+        "analysis": analysis,
+    }
+
+    # 窗口报告与日报放在同一月份目录, 经对象存储写入
+    report_file = OUTPUT_DIRS[scope] / date[:7] / f"window_{days}d_{date}.json"
+    with output_store.OutputStore() as store:
+        store.put(report_file, json.dumps(report, ensure_ascii=False, indent=2))
+
+    print(f"📊 {scope} {days} 日窗口 (截至 {date}): {analysis['total']} 条, 覆盖 {len(analysis['date_stats'])} 天")
+    for cat, count in list(analysis["category_stats"].items())[:10]:
+        print(f"   {cat}: {count} 条")
+    print(f"📁 保存至: {report_file}")
+
+if __name__ == "__main__":
+    main()
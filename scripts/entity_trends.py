@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+实体提及量异动检测
+- 每个实体只保存一条状态: [最近日期, 当天提及数, 基线均值, 基线方差, 基线天数],
+  基线是按日提及数的指数加权均值/方差 (约 14 天), 每次更新只改动当天提到的实体, 与历史长度无关
+- 当天提及数在同一天重复运行时直接替换; 换日时才把前一天并入基线, 中间没有提及的日子按 0 计入
+- 当天提及数明显高于基线 (倍数与 z 分数都超过阈值) 时标记为异动, 写入处理结果供报告展示
+- 状态文件与日汇总放在同一处理目录, 可从日汇总 (daily_rollup) 按日期顺序重建
+- 处理早于最近日期的某一天 (如 date= 重跑) 时不改动当前基线, 按该日之前的日汇总重放后计算当天异动
+
+用法:
+  python3 scripts/entity_trends.py tech              # 最近一天的异动实体与提及最多的实体
+  python3 scripts/entity_trends.py finance rebuild   # 从日汇总重建基线
+"""
+
+import json
+import math
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import daily_rollup
+import output_store
+
+# 基线约为最近 14 天
+BASELINE_DAYS = 14
+ALPHA = 2 / (BASELINE_DAYS + 1)
+# 标记异动: 至少有几天基线、当天至少几次提及、相对基线的倍数与 z 分数
+MIN_HISTORY = 3
+MIN_COUNT = 3
+SPIKE_RATIO = 3.0
+SPIKE_Z = 3.0
+SPIKE_LIMIT = 10
+# 补入没有提及的日子最多按这么多天计算 (之后基线已接近 0)
+MAX_GAP = 4 * BASELINE_DAYS
+# 超过这么多天没有提及的实体在保存时清理
+PRUNE_DAYS = 90
+
+TRENDS_NAME = "entity_trends.json"
+
+
+def _days_between(start, end):
+    return (datetime.strptime(end, "%Y-%m-%d") - datetime.strptime(start, "%Y-%m-%d")).days
+
+def _fold(mean, var, n, x):
+    """把一天的提及数并入指数加权基线"""
+    if n == 0:
+        return float(x), 0.0, 1
+    diff = x - mean
+    incr = ALPHA * diff
+    return mean + incr, (1 - ALPHA) * (var + diff * incr), n + 1
+
+def score(count, mean, var):
+    """(相对基线的倍数, z 分数); 方差至少取均值 (泊松) 与 1, 避免稀有实体一次提及就被放大"""
+    ratio = count / max(mean, 0.5)
+    z = (count - mean) / math.sqrt(max(var, mean, 1.0))
+    return ratio, z
+
+def spike(name, state):
+    """实体状态达到异动阈值时返回异动记录, 否则返回 None"""
+    _, count, mean, var, n = state
+    ratio, z = score(count, mean, var)
+    if n >= MIN_HISTORY and count >= MIN_COUNT and ratio >= SPIKE_RATIO and z >= SPIKE_Z:
+        return {"entity": name, "count": count, "baseline": round(mean, 2),
+                "ratio": round(ratio, 1), "z": round(z, 1)}
+    return None
+
+
+class EntityTrends:
+    """一个范围 (科技/财经) 的实体基线, 退出 with 时保存"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entities = json.load(f).get("entities", {})
+        except (OSError, ValueError):
+            self.entities = {}
+        self.date = max((state[0] for state in self.entities.values()), default=None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+    def save(self):
+        if self.date:
+            self.entities = {name: state for name, state in self.entities.items()
+                             if _days_between(state[0], self.date) <= PRUNE_DAYS}
+        output_store.atomic_write(self.path, json.dumps({"date": self.date, "entities": self.entities},
+                                                        ensure_ascii=False, separators=(",", ":")))
+
+    def update(self, date, counts):
+        """登记某天各实体的提及数, 返回当天的异动列表
+
+        早于已登记日期时基线不变, 异动由该日之前的日汇总重放得到
+        """
+        if self.date and date < self.date:
+            trends, _ = _replay(self.path.parent, before=date)
+            return trends.update(date, counts)
+        self.date = date
+
+        spikes = []
+        for name, count in counts.items():
+            state = self.entities.get(name)
+            if state is None:
+                state = [date, count, 0.0, 0.0, 0]
+            elif state[0] != date:
+                last, last_count, mean, var, n = state
+                mean, var, n = _fold(mean, var, n, last_count)
+                for _ in range(min(_days_between(last, date) - 1, MAX_GAP)):
+                    mean, var, n = _fold(mean, var, n, 0)
+                state = [date, count, mean, var, n]
+            else:
+                state[1] = count
+            self.entities[name] = state
+
+            record = spike(name, state)
+            if record:
+                spikes.append(record)
+
+        spikes.sort(key=lambda x: x["z"], reverse=True)
+        return spikes[:SPIKE_LIMIT]
+
+    def top(self, limit=10):
+        """最近一天提及最多的实体: [(实体, 状态)]"""
+        today = [(name, state) for name, state in self.entities.items() if state[0] == self.date]
+        return sorted(today, key=lambda x: x[1][1], reverse=True)[:limit]
+
+
+def trends_path(scope):
+    return daily_rollup.PROCESSED_DIRS[scope] / TRENDS_NAME
+
+def _replay(directory, before=None):
+    """按日期顺序重放 directory/rollups/ 下的日汇总 (before 为止, 不含), 返回 (基线, {日期: 当天的异动列表}); 不保存"""
+    trends = EntityTrends(directory / TRENDS_NAME)
+    trends.entities, trends.date = {}, None
+    spikes = {}
+    for path in sorted((directory / "rollups").glob("rollup_*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            rollup = json.load(f)
+        if before and rollup["date"] >= before:
+            break
+        spikes[rollup["date"]] = trends.update(rollup["date"], rollup.get("entity_stats", {}))
+    return trends, spikes
+
+def rebuild(scope, directory=None):
+    """按日期顺序从日汇总重建基线, 返回 {日期: 当天的异动列表}
+
+    directory: 处理目录 (含 rollups/), 默认为该范围的处理目录
+    """
+    directory = Path(directory) if directory else daily_rollup.PROCESSED_DIRS[scope]
+    trends, spikes = _replay(directory)
+    trends.save()
+    return spikes
+
+def main():
+    args = sys.argv[1:]
+    scope = args[0] if args and args[0] in daily_rollup.PROCESSED_DIRS else "tech"
+    if "rebuild" in args:
+        print(f"✅ 已按 {len(rebuild(scope))} 天的日汇总重建实体基线")
+        return
+
+    trends = EntityTrends(trends_path(scope))
+    print(f"📈 {scope} 实体基线: {len(trends.entities)} 个实体, 最近日期 {trends.date}")
+    for name, state in trends.top():
+        ratio, z = score(*state[1:4])
+        flag = " ⚠️ 异动" if spike(name, state) else ""
+        print(f"   {name}: {state[1]} 次 (基线 {state[2]:.1f}, {ratio:.1f}×, z={z:.1f}){flag}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+RSS 条件请求缓存
+- 按订阅源 URL 持久化 ETag / Last-Modified
+- 下次请求携带 If-None-Match / If-Modified-Since
+- 服务端返回 304 时直接视为"无新内容", 跳过下载与 XML 解析
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
+CACHE_FILE = PROJECT_ROOT / "data" / "cache" / "feed_validators.json"
+
+# fetch_rss 收到 304 时的返回值, 与"获取失败"的空列表区分开,
+# crawl_source 据此跳过 HTML 回退
+NOT_MODIFIED = object()
+
+
+class ValidatorStore:
+    """订阅源校验信息 (ETag / Last-Modified) 存储, 线程安全"""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = Path(path)
+        self._validators = None
+        self._dirty = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._validators is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._validators = json.load(f)
+            except (OSError, ValueError):
+                self._validators = {}
+        return self._validators
+
+    def headers_for(self, url):
+        """返回该订阅源的条件请求头"""
+        with self._lock:
+            entry = self._load().get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url, resp):
+        """记录响应中的校验信息 (应在内容成功解析后调用)"""
+        entry = {}
+        if resp.header("ETag"):
+            entry["etag"] = resp.header("ETag")
+        if resp.header("Last-Modified"):
+            entry["last_modified"] = resp.header("Last-Modified")
+        if not entry:
+            return
+        with self._lock:
+            self._load()[url] = entry
+            self._dirty[url] = entry
+
+    def forget(self, url):
+        """丢弃校验信息, 下次强制完整下载"""
+        with self._lock:
+            self._load().pop(url, None)
+            self._dirty[url] = None
+
+    def save(self):
+        """合并写回磁盘 (科技/财经爬虫可能先后写同一文件)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    merged = json.load(f)
+            except (OSError, ValueError):
+                merged = {}
+            for url, entry in self._dirty.items():
+                if entry is None:
+                    merged.pop(url, None)
+                else:
+                    merged[url] = entry
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+            self._dirty = {}
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+def default_store():
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ValidatorStore()
+        return _default_store
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+流式 RSS / Atom 解析
+- 基于 XMLPullParser 边下载边解析, 不构建完整文档树
+- 支持 RSS 2.0 <item>、RSS 1.0 (RDF) <item> 与 Atom <entry>
+- 每个条目解析完即从树中移除, 达到条目上限后立即停止读取
+"""
+
+import codecs
+import re
+import xml.etree.ElementTree as ET
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+DC_DATE = "{http://purl.org/dc/elements/1.1/}date"
+
+ITEM_TAGS = ("item", "entry")
+# 发布时间字段, 按优先级排列
+DATE_TAGS = ("pubDate", ATOM_NS + "published", ATOM_NS + "updated", DC_DATE)
+
+# expat 原生支持的编码, 其余 (如 GBK) 需先转码再送入解析器
+EXPAT_ENCODINGS = ("utf-8", "utf8", "utf-16", "utf16", "iso-8859-1", "latin-1", "us-ascii", "ascii")
+# 判断编码前最多缓存的字节数 (XML 声明应在其中)
+DECL_PEEK = 1024
+XML_DECL_ENCODING = re.compile(rb'^\s*<\?xml[^>]*encoding=["\']([A-Za-z0-9._-]+)["\']')
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+def _text(elem):
+    return "".join(elem.itertext()) if elem is not None else ""
+
+def _item_link(item):
+    """RSS 取 <link> 文本, Atom 取 rel=alternate (或无 rel) 的 href"""
+    link = item.find("link")
+    if link is None:
+        link = item.find("{http://purl.org/rss/1.0/}link")
+    if link is not None and link.text:
+        return link.text.strip()
+
+    fallback = ""
+    for link in item.iter(ATOM_NS + "link"):
+        href = link.get("href", "").strip()
+        if not href:
+            continue
+        if link.get("rel", "alternate") == "alternate":
+            return href
+        fallback = fallback or href
+    return fallback
+
+def _item_fields(item):
+    title = None
+    for child in item:
+        if _local_name(child.tag) == "title":
+            title = child
+            break
+
+    pub_date = None
+    for tag in DATE_TAGS:
+        elem = item.find(tag)
+        if elem is not None and elem.text:
+            pub_date = elem.text.strip()
+            break
+
+    return {
+        "title": _text(title),
+        "link": _item_link(item),
+        "pub_date": pub_date,
+    }
+
+
+def _transcoded(chunks):
+    """XML 声明的编码 expat 不支持时, 按块解码为 str 再交给解析器
+
+    声明可能跨块: 先缓存开头的块, 直到读到 "?>" 或满 DECL_PEEK 字节再判断编码
+    """
+    chunks = iter(chunks)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if b"?>" in head or len(head) >= DECL_PEEK:
+            break
+    if not head:
+        return
+
+    match = XML_DECL_ENCODING.match(head)
+    encoding = match.group(1).decode("ascii").lower() if match else "utf-8"
+    if encoding in EXPAT_ENCODINGS:
+        yield head
+        yield from chunks
+        return
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    yield decoder.decode(head)
+    for chunk in chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def iter_feed_items(chunks, limit=50):
+    """逐条产出订阅源条目 {"title", "link", "pub_date"}
+
+    chunks: 字节块的可迭代对象 (如 Response.iter_content()), 编码由 XML 声明决定
+    limit:  最多产出的条目数, 达到后不再读取剩余内容
+    文档中途出现格式错误时, 已解析出的条目照常返回。
+    """
+    if limit <= 0:
+        return
+
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    item_depth = 0
+    count = 0
+
+    for chunk in _transcoded(chunks):
+        try:
+            parser.feed(chunk)
+            events = parser.read_events()
+            for event, elem in events:
+                is_item = _local_name(elem.tag) in ITEM_TAGS
+                if event == "start":
+                    stack.append(elem)
+                    if is_item:
+                        item_depth += 1
+                    continue
+
+                stack.pop()
+                if not is_item:
+                    continue
+                item_depth -= 1
+                if item_depth:
+                    continue  # 嵌套在条目内的同名元素
+
+                fields = _item_fields(elem)
+                # 释放已处理的条目
+                if stack:
+                    stack[-1].remove(elem)
+                elem.clear()
+
+                yield fields
+                count += 1
+                if count >= limit:
+                    return
+        except (ET.ParseError, ValueError):
+            return
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+抓取录制 / 回放存档
+- record: 把每次请求的原始响应 (状态码、响应头、响应体、耗时) 追加写入压缩存档
+- replay: 从存档返回响应, 不访问网络, 可按录制耗时模拟延迟
+- 回放不改动正式数据: 爬虫的原始文件写入 data/archive/replay/ 下的同名目录, 文章索引用内存数据库
+  (首次出现日期不写入), 条件请求与字符集缓存不保存
+- 响应体是合法 UTF-8 时按文本 (body_text) 保存, 否则 (如 GBK 页面) 按 base64 (body) 保存
+用于离线复现抓取, 以及性能分析和回归测试
+
+环境变量:
+  FETCH_ARCHIVE_MODE     record | replay (未设置则正常联网)
+  FETCH_ARCHIVE          存档路径 (录制默认 data/archive/fetch_YYYYMMDD_HHMMSS.jsonl.gz, 回放默认取最新的一个)
+  FETCH_REPLAY_LATENCY   回放延迟倍数, 1 为按录制耗时等待, 默认 0 (全速)
+
+用法:
+  FETCH_ARCHIVE_MODE=record python3 scripts/tech_crawler.py
+  FETCH_ARCHIVE_MODE=replay FETCH_ARCHIVE=data/archive/fetch_20260315_080000.jsonl.gz python3 scripts/tech_crawler.py
+  python3 scripts/fetch_archive.py data/archive/fetch_20260315_080000.jsonl.gz   # 查看存档内容
+"""
+
+import base64
+import gzip
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+
+import http_client
+
+PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
+ARCHIVE_DIR = PROJECT_ROOT / "data" / "archive"
+# 回放时爬虫写出的原始文件
+REPLAY_DIR = ARCHIVE_DIR / "replay"
+
+# 录制时不发送条件请求头, 保证存档中是完整响应体
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+class ArchiveMiss(ConnectionError):
+    """回放模式下存档中没有该 URL"""
+
+
+def _encode_record(url, resp):
+    record = {
+        "url": url,
+        "final_url": resp.url,
+        "status": resp.status,
+        "headers": list(resp.headers.items()) if resp.headers is not None else [],
+        "elapsed": round(resp.elapsed, 4),
+        "time": datetime.now().isoformat(),
+    }
+    # UTF-8 文本原样保存 (base64 会使体积增大约 1/3), 其他编码按 base64 保存字节
+    try:
+        record["body_text"] = resp.content.decode("utf-8")
+    except UnicodeDecodeError:
+        record["body"] = base64.b64encode(resp.content).decode("ascii")
+    return record
+
+def _body(record):
+    if "body_text" in record:
+        return record["body_text"].encode("utf-8")
+    return base64.b64decode(record["body"])
+
+def _decode_record(record):
+    headers = http.client.HTTPMessage()
+    for name, value in record.get("headers", []):
+        headers[name] = value
+    return http_client.Response(record.get("final_url") or record["url"], record["status"],
+                                headers, _body(record), record.get("elapsed", 0.0))
+
+def iter_records(path):
+    """逐条读取存档 (容忍录制中断导致的不完整尾部)"""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except EOFError:
+        return
+
+
+class FetchRecorder:
+    """把响应追加写入存档, 每条记录是一个独立的 gzip 成员, 中途崩溃也不影响已写入内容"""
+
+    mode = "record"
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def fetch(self, client, url, headers, connect_timeout, max_time):
+        headers = {k: v for k, v in (headers or {}).items() if k not in CONDITIONAL_HEADERS}
+        resp = client._fetch(url, headers, connect_timeout, max_time)
+        line = json.dumps(_encode_record(url, resp), ensure_ascii=False) + "\n"
+        data = gzip.compress(line.encode("utf-8"))
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(data)
+        return resp
+
+
+class FetchReplayer:
+    """从存档回放响应; 同一 URL 多次录制时按顺序返回, 用尽后重复最后一条"""
+
+    mode = "replay"
+
+    def __init__(self, path, latency=0.0):
+        self.path = Path(path)
+        self.latency = latency
+        self._records = defaultdict(deque)
+        for record in iter_records(self.path):
+            self._records[record["url"]].append(record)
+        self._lock = threading.Lock()
+
+    def fetch(self, client, url, headers, connect_timeout, max_time):
+        with self._lock:
+            queue = self._records.get(url)
+            if not queue:
+                raise ArchiveMiss(f"存档中无此请求: {url}")
+            record = queue.popleft() if len(queue) > 1 else queue[0]
+        resp = _decode_record(record)
+        if self.latency > 0:
+            time.sleep(min(resp.elapsed * self.latency, max_time or resp.elapsed))
+        return resp
+
+
+def replaying():
+    """是否处于回放模式"""
+    return os.environ.get("FETCH_ARCHIVE_MODE", "").strip().lower() == "replay"
+
+def raw_dir(path):
+    """爬虫原始数据目录; 回放时改为 REPLAY_DIR 下的同名目录"""
+    if not replaying():
+        return path
+    path = Path(path)
+    try:
+        return REPLAY_DIR / path.relative_to(PROJECT_ROOT)
+    except ValueError:
+        return REPLAY_DIR / path.name
+
+def index_path(path):
+    """文章索引路径; 回放时用内存数据库, 不把存档中的文章记为今天首次出现"""
+    return ":memory:" if replaying() else path
+
+def save_caches(*caches):
+    """保存条件请求/字符集缓存; 回放的响应不代表站点现状, 不保存"""
+    if not replaying():
+        for cache in caches:
+            cache.save()
+
+
+def from_env():
+    """按环境变量创建录制/回放器, 未启用时返回 None"""
+    mode = os.environ.get("FETCH_ARCHIVE_MODE", "").strip().lower()
+    if not mode:
+        return None
+
+    path = os.environ.get("FETCH_ARCHIVE")
+    if mode == "record":
+        if not path:
+            path = ARCHIVE_DIR / f"fetch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl.gz"
+        return FetchRecorder(path)
+    if mode == "replay":
+        if not path:
+            archives = sorted(ARCHIVE_DIR.glob("fetch_*.jsonl.gz"), reverse=True)
+            if not archives:
+                raise FileNotFoundError(f"未找到回放存档: {ARCHIVE_DIR}")
+            path = archives[0]
+        latency = float(os.environ.get("FETCH_REPLAY_LATENCY", "0") or 0)
+        return FetchReplayer(path, latency)
+    raise ValueError(f"未知的 FETCH_ARCHIVE_MODE: {mode}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+
+    total_bytes = 0
+    total_time = 0.0
+    count = 0
+    for record in iter_records(sys.argv[1]):
+        size = len(_body(record))
+        total_bytes += size
+        total_time += record.get("elapsed", 0.0)
+        count += 1
+        print(f"{record['status']}  {size:>9,d} B  {record.get('elapsed', 0.0):6.2f}s  {record['url']}")
+
+    print(f"\n共 {count} 条记录, {total_bytes / 1024 / 1024:.1f} MB, 录制耗时合计 {total_time:.1f}s")
+
+if __name__ == "__main__":
+    main()
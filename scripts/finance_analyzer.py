@@ -17,23 +17,35 @@ from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
 
+import output_store
+import processed_format
+import report_template
+
 PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
 PROCESSED_DIR = PROJECT_ROOT / "data" / "finance" / "processed"
 OUTPUT_DIR = PROJECT_ROOT / "output" / "finance"
 
-def load_processed_data():
-    """加载处理后的数据"""
-    today = datetime.now().strftime("%Y-%m-%d")
+# 报告用到的文章列表 (政策影响分析需要宏观政策全部标题) 与字段
+REPORT_SECTIONS = {
+    "top_articles": None,
+    "risk_articles": None,
+    "categorized_articles": {"宏观政策": (10, ("title",)), "行业板块": 5, "A股市场": 8, "美股市场": 5, "商品期货": 8},
+}
+REPORT_FIELDS = ("title", "url", "source", "pub_date", "market_signal")
+
+def load_processed_data(date=None):
+    """加载处理后的数据 (默认当天, 没有时取最近一天; 指定日期时只取该日)"""
+    today = date or datetime.now().strftime("%Y-%m-%d")
     file_path = PROCESSED_DIR / f"processed_{today}.json"
     
-    if not file_path.exists():
+    if not file_path.exists() and not date:
         files = sorted(PROCESSED_DIR.glob("processed_*.json"), reverse=True)
         if files:
             file_path = files[0]
     
     if file_path.exists():
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # 逐行读取, 只加载报告用到的分类、文章和字段
+        return processed_format.load(file_path, REPORT_SECTIONS, REPORT_FIELDS)
     
     return None
 
@@ -68,378 +80,409 @@ def get_signal_emoji(signal):
     else:
         return "➖"
 
-def generate_summary(data):
-    """生成投资摘要 - 投资者视角"""
-    date = data.get("date", datetime.now().strftime("%Y-%m-%d"))
-    total = data.get("total_articles", 0)
-    signal_stats = data.get("signal_stats", {})
-    categories = data.get("categories", {})
-    top_articles = data.get("top_articles", [])[:10]
-    sector_stats = data.get("sector_stats", {})
-    
-    # 计算市场情绪指数
-    bullish = signal_stats.get("bullish", 0)
-    bearish = signal_stats.get("bearish", 0)
-    neutral = signal_stats.get("neutral", 0)
-    total_signals = bullish + bearish + neutral
-    
-    if total_signals > 0:
-        sentiment_ratio = (bullish - bearish) / total_signals
-        if sentiment_ratio > 0.2:
-            sentiment = "偏多 📈"
-            sentiment_desc = "市场情绪乐观，利好消息占优"
-        elif sentiment_ratio < -0.2:
-            sentiment = "偏空 📉"
-            sentiment_desc = "市场情绪谨慎，需注意风险"
-        else:
-            sentiment = "中性 ➖"
-            sentiment_desc = "市场多空平衡，观望为主"
-    else:
-        sentiment = "中性 ➖"
-        sentiment_desc = "数据不足"
-    
-    summary = f"""# 财经资讯日报 - {date}
-
-## 📊 市场情绪概览
-
-| 指标 | 数值 | 解读 |
-|------|------|------|
-| **情绪指数** | {sentiment} | {sentiment_desc} |
-| **利好消息** | {bullish} 条 | 📈 做多信号 |
-| **利空消息** | {bearish} 条 | 📉 风险提示 |
-| **中性消息** | {neutral} 条 | ➖ 观望信号 |
-
-### 📈 热门板块 TOP 5
-
-| 排名 | 板块 | 新闻数 | 信号 |
-|------|------|--------|------|
-"""
-    
-    for i, (sector, count) in enumerate(list(sector_stats.items())[:5], 1):
-        summary += f"| {i} | **{sector}** | {count} 条 | {'🔥' if count > 10 else '📈'} |\n"
-    
-    summary += f"""
----
-
-## 🔥 今日热点 TOP 10
-
-"""
-    
-    for i, article in enumerate(top_articles[:10], 1):
-        title = article.get("title", "")[:55]
-        url = article.get("url", "")
-        source = article.get("source", "")
-        signal = article.get("market_signal", {}).get("overall", "neutral")
-        signal_icon = get_signal_emoji(signal)
-        pub_time = format_pub_date(article.get("pub_date", ""))
-        
-        summary += f"{i}. {signal_icon} **[{title}]({url})**\n"
-        summary += f"   - 📰 {source} | ⏰ {pub_time}\n\n"
-    
-    # 分类要点
-    categorized = data.get("categorized_articles", {})
-    
-    # 宏观政策
-    macro_articles = categorized.get("宏观政策", [])[:5]
-    if macro_articles:
-        summary += "## 🏛️ 宏观政策\n\n"
-        for a in macro_articles:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            summary += f"- [{title}]({url}) *{source}*\n"
-        summary += "\n"
-    
-    # 行业板块
-    sector_articles = categorized.get("行业板块", [])[:5]
-    if sector_articles:
-        summary += "## 🏭 行业动态\n\n"
-        for a in sector_articles:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            summary += f"- [{title}]({url}) *{source}*\n"
-        summary += "\n"
-    
-    # 风险预警
-    risk_articles = data.get("risk_articles", [])[:5]
-    if risk_articles:
-        summary += "## ⚠️ 风险提示\n\n"
-        for a in risk_articles:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            summary += f"- 🚨 [{title}]({url}) *{source}*\n"
-        summary += "\n"
-    
-    summary += f"""
----
-
-*报告生成时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}*  
-*🍄 蒜宝财经分析*
-"""
-    
-    return summary
+# 报告片段模板: {名称: (markdown, html)}
+TEMPLATES = report_template.compile_templates({
+    "summary_head": (
+        "# 财经资讯日报 - {date}\n\n"
+        "## 📊 市场情绪概览\n\n"
+        "| 指标 | 数值 | 解读 |\n"
+        "|------|------|------|\n"
+        "| **情绪指数** | {sentiment} | {sentiment_desc} |\n"
+        "| **利好消息** | {bullish} 条 | 📈 做多信号 |\n"
+        "| **利空消息** | {bearish} 条 | 📉 风险提示 |\n"
+        "| **中性消息** | {neutral} 条 | ➖ 观望信号 |\n\n"
+        "### 📈 热门板块 TOP 5\n\n"
+        "| 排名 | 板块 | 新闻数 | 信号 |\n"
+        "|------|------|--------|------|\n",
+        "<h1>财经资讯日报 - {date}</h1>\n"
+        "<h2>📊 市场情绪概览</h2>\n<table>\n"
+        "<tr><th>指标</th><th>数值</th><th>解读</th></tr>\n"
+        "<tr><td><strong>情绪指数</strong></td><td>{sentiment}</td><td>{sentiment_desc}</td></tr>\n"
+        "<tr><td><strong>利好消息</strong></td><td>{bullish} 条</td><td>📈 做多信号</td></tr>\n"
+        "<tr><td><strong>利空消息</strong></td><td>{bearish} 条</td><td>📉 风险提示</td></tr>\n"
+        "<tr><td><strong>中性消息</strong></td><td>{neutral} 条</td><td>➖ 观望信号</td></tr>\n"
+        "</table>\n"
+        "<h3>📈 热门板块 TOP 5</h3>\n<table>\n"
+        "<tr><th>排名</th><th>板块</th><th>新闻数</th><th>信号</th></tr>\n"),
+    "summary_sector": (
+        "| {i} | **{sector}** | {count} 条 | {icon} |\n",
+        "<tr><td>{i}</td><td><strong>{sector}</strong></td><td>{count} 条</td><td>{icon}</td></tr>\n"),
+    "summary_top_head": (
+        "\n---\n\n## 🔥 今日热点 TOP 10\n\n",
+        "</table>\n<hr>\n<h2>🔥 今日热点 TOP 10</h2>\n<ol>\n"),
+    "summary_hot": (
+        "{i}. {signal_icon} **[{title}]({url})**\n"
+        "   - 📰 {source} | ⏰ {pub_time}\n\n",
+        '<li>{signal_icon} <strong><a href="{url}">{title}</a></strong><br>📰 {source} | ⏰ {pub_time}</li>\n'),
+    "summary_top_end": (
+        "",
+        "</ol>\n"),
+    "summary_section": (
+        "## {heading}\n\n",
+        "<h2>{heading}</h2>\n<ul>\n"),
+    "list_item": (
+        "- [{title}]({url}) *{source}*\n",
+        '<li><a href="{url}">{title}</a> <em>{source}</em></li>\n'),
+    "summary_risk_item": (
+        "- 🚨 [{title}]({url}) *{source}*\n",
+        '<li>🚨 <a href="{url}">{title}</a> <em>{source}</em></li>\n'),
+    "summary_section_end": (
+        "\n",
+        "</ul>\n"),
+    "summary_foot": (
+        "\n---\n\n*报告生成时间: {now}*  \n*🍄 蒜宝财经分析*\n",
+        "<hr>\n<p><em>报告生成时间: {now}</em><br>\n<em>🍄 蒜宝财经分析</em></p>\n"),
+
+    "detailed_head": (
+        "# 财经资讯深度分析报告\n## {date}\n\n---\n\n"
+        "## 一、市场情绪分析\n\n"
+        "### 1.1 情绪指数\n\n"
+        "本日共收集财经资讯 **{total}** 条，多空信号分布如下：\n\n"
+        "| 信号类型 | 数量 | 占比 | 解读 |\n"
+        "|----------|------|------|------|\n"
+        "| 📈 利好 | {bullish} | {bullish_pct:.1f}% | 做多信号 |\n"
+        "| 📉 利空 | {bearish} | {bearish_pct:.1f}% | 风险信号 |\n"
+        "| ➖ 中性 | {neutral} | {neutral_pct:.1f}% | 观望信号 |\n\n"
+        "### 1.2 情绪判断\n\n",
+        "<h1>财经资讯深度分析报告</h1>\n<h2>{date}</h2>\n<hr>\n"
+        "<h2>一、市场情绪分析</h2>\n"
+        "<h3>1.1 情绪指数</h3>\n"
+        "<p>本日共收集财经资讯 <strong>{total}</strong> 条，多空信号分布如下：</p>\n<table>\n"
+        "<tr><th>信号类型</th><th>数量</th><th>占比</th><th>解读</th></tr>\n"
+        "<tr><td>📈 利好</td><td>{bullish}</td><td>{bullish_pct:.1f}%</td><td>做多信号</td></tr>\n"
+        "<tr><td>📉 利空</td><td>{bearish}</td><td>{bearish_pct:.1f}%</td><td>风险信号</td></tr>\n"
+        "<tr><td>➖ 中性</td><td>{neutral}</td><td>{neutral_pct:.1f}%</td><td>观望信号</td></tr>\n"
+        "</table>\n"
+        "<h3>1.2 情绪判断</h3>\n"),
+    "sentiment_view": (
+        "**市场情绪: {label}**\n\n{desc}\n- {tip1}\n- {tip2}\n- {tip3}\n\n",
+        "<p><strong>市场情绪: {label}</strong></p>\n<p>{desc}</p>\n"
+        "<ul>\n<li>{tip1}</li>\n<li>{tip2}</li>\n<li>{tip3}</li>\n</ul>\n"),
+    "sector_head": (
+        "---\n\n## 二、板块轮动分析\n\n### 2.1 热门板块\n\n",
+        "<hr>\n<h2>二、板块轮动分析</h2>\n<h3>2.1 热门板块</h3>\n<table>\n"),
+    "sector_row": (
+        "| {i} | **{sector}** | {count} 条 | {percentage:.1f}% | {heat} |\n",
+        "<tr><td>{i}</td><td><strong>{sector}</strong></td><td>{count} 条</td>"
+        "<td>{percentage:.1f}%</td><td>{heat}</td></tr>\n"),
+    "sector_notes_head": (
+        "\n\n### 2.2 板块解读\n\n",
+        "</table>\n<h3>2.2 板块解读</h3>\n"),
+    "sector_note": (
+        "**{label}**: {text}\n\n",
+        "<p><strong>{label}</strong>: {text}</p>\n"),
+    "spike_head": (
+        "### 2.3 提及异动\n\n今日提及量明显高于近两周基线的公司/板块：\n\n",
+        "<h3>2.3 提及异动</h3>\n<p>今日提及量明显高于近两周基线的公司/板块：</p>\n<ul>\n"),
+    "spike_item": (
+        "- **{entity}**: 今日 {count} 次，近两周日均 {baseline:.1f} 次 ({ratio:.1f}×)\n",
+        "<li><strong>{entity}</strong>: 今日 {count} 次，近两周日均 {baseline:.1f} 次 ({ratio:.1f}×)</li>\n"),
+    "macro_head": (
+        "---\n\n## 三、宏观政策解读\n\n",
+        "<hr>\n<h2>三、宏观政策解读</h2>\n"),
+    "macro_count": (
+        "本日宏观政策相关资讯共 **{count}** 条：\n\n",
+        "<p>本日宏观政策相关资讯共 <strong>{count}</strong> 条：</p>\n<ol>\n"),
+    "macro_item": (
+        "{i}. {signal_icon} [{title}]({url})\n"
+        "   - 来源: {source} | 时间: {pub_time}\n\n",
+        '<li>{signal_icon} <a href="{url}">{title}</a><br>来源: {source} | 时间: {pub_time}</li>\n'),
+    "macro_impact_head": (
+        "### 政策影响分析\n\n",
+        "</ol>\n<h3>政策影响分析</h3>\n<ul>\n"),
+    "macro_impact": (
+        "- **{label}**: {text}\n",
+        "<li><strong>{label}</strong>: {text}</li>\n"),
+    "stock_head": (
+        "---\n\n## 四、股市动态\n\n### 4.1 A股市场\n\n",
+        "<hr>\n<h2>四、股市动态</h2>\n<h3>4.1 A股市场</h3>\n"),
+    "a_stock_count": (
+        "A股相关资讯 **{count}** 条：\n\n",
+        "<p>A股相关资讯 <strong>{count}</strong> 条：</p>\n<ul>\n"),
+    "us_stock_count": (
+        "### 4.2 美股市场\n\n美股相关资讯 **{count}** 条：\n\n",
+        "<h3>4.2 美股市场</h3>\n<p>美股相关资讯 <strong>{count}</strong> 条：</p>\n<ul>\n"),
+    "futures_count": (
+        "---\n\n## 五、商品期货\n\n期货相关资讯 **{count}** 条：\n\n",
+        "<hr>\n<h2>五、商品期货</h2>\n<p>期货相关资讯 <strong>{count}</strong> 条：</p>\n<ul>\n"),
+    "list_end": (
+        "\n",
+        "</ul>\n"),
+    "risk_head": (
+        "---\n\n## 六、风险预警\n\n",
+        "<hr>\n<h2>六、风险预警</h2>\n"),
+    "risk_count": (
+        "⚠️ 本日风险相关资讯 **{count}** 条，请重点关注：\n\n",
+        "<p>⚠️ 本日风险相关资讯 <strong>{count}</strong> 条，请重点关注：</p>\n<ol>\n"),
+    "risk_item": (
+        "{i}. 🚨 [{title}]({url})\n   - 来源: {source}\n\n",
+        '<li>🚨 <a href="{url}">{title}</a><br>来源: {source}</li>\n'),
+    "risk_end": (
+        "",
+        "</ol>\n"),
+    "risk_none": (
+        "✅ 本日无明显风险预警信号。\n\n",
+        "<p>✅ 本日无明显风险预警信号。</p>\n"),
+    "advice": (
+        "---\n\n"
+        "## 七、投资建议\n\n"
+        "### 7.1 仓位建议\n\n"
+        "| 投资者类型 | 建议仓位 | 理由 |\n"
+        "|------------|----------|------|\n"
+        "| **激进型** | 60-70% | 市场情绪{sentiment_ratio:+.1%}，可适当参与 |\n"
+        "| **稳健型** | 40-50% | 保持灵活，等待机会 |\n"
+        "| **保守型** | 20-30% | 控制风险为主 |\n\n"
+        "### 7.2 关注方向\n\n",
+        "<hr>\n<h2>七、投资建议</h2>\n"
+        "<h3>7.1 仓位建议</h3>\n<table>\n"
+        "<tr><th>投资者类型</th><th>建议仓位</th><th>理由</th></tr>\n"
+        "<tr><td><strong>激进型</strong></td><td>60-70%</td><td>市场情绪{sentiment_ratio:+.1%}，可适当参与</td></tr>\n"
+        "<tr><td><strong>稳健型</strong></td><td>40-50%</td><td>保持灵活，等待机会</td></tr>\n"
+        "<tr><td><strong>保守型</strong></td><td>20-30%</td><td>控制风险为主</td></tr>\n"
+        "</table>\n"
+        "<h3>7.2 关注方向</h3>\n<ol>\n"),
+    "focus_sectors": (
+        "1. **热点板块**: {sectors}\n",
+        "<li><strong>热点板块</strong>: {sectors}</li>\n"),
+    "focus_strategy": (
+        "2. **策略**: {text}\n",
+        "<li><strong>策略</strong>: {text}</li>\n"),
+    "focus_risk": (
+        "3. **风控**: 设置止损位，严格执行纪律\n",
+        "<li><strong>风控</strong>: 设置止损位，严格执行纪律</li>\n</ol>\n"),
+    "sources_head": (
+        "\n\n---\n\n## 八、数据来源\n\n本报告数据来源于国内外主流财经媒体：\n\n",
+        "<hr>\n<h2>八、数据来源</h2>\n<p>本报告数据来源于国内外主流财经媒体：</p>\n<ul>\n"),
+    "source_item": (
+        "- {source}\n",
+        "<li>{source}</li>\n"),
+    "detailed_foot": (
+        "\n\n---\n\n*报告生成时间: {now}*  \n*由 Finance News Analyzer v1 自动生成*  \n"
+        "*🍄 蒜宝财经分析 | 投资有风险，入市需谨慎*\n",
+        "</ul>\n<hr>\n<p><em>报告生成时间: {now}</em><br>\n<em>由 Finance News Analyzer v1 自动生成</em><br>\n"
+        "<em>🍄 蒜宝财经分析 | 投资有风险，入市需谨慎</em></p>\n"),
+})
+
+# 情绪判断: (标签, 说明, 建议)
+SENTIMENT_VIEWS = {
+    "bullish": ("偏多 📈", "利好消息明显占优，市场信心较强。建议关注：",
+                ("顺势布局强势板块", "关注业绩超预期个股", "注意获利了结时机")),
+    "bearish": ("偏空 📉", "利空消息较多，市场谨慎情绪升温。建议：",
+                ("控制仓位，规避风险", "关注防御性板块", "等待市场企稳信号")),
+    "neutral": ("中性 ➖", "多空力量相对平衡，市场处于观望状态。建议：",
+                ("保持中性仓位", "关注政策信号", "精选结构性机会")),
+}
+
+# 板块解读: (板块, 标签, 说明)
+SECTOR_NOTES = (
+    (("半导体", "芯片"), "半导体板块", "科技自主主线持续，关注国产替代机会"),
+    (("新能源",), "新能源板块", "政策支持力度大，但需注意估值风险"),
+    (("医药",), "医药板块", "创新药政策回暖，可逢低布局"),
+    (("银行", "券商"), "金融板块", "关注利率政策变化带来的机会"),
+)
+
+# 政策影响分析: (标题关键词, 标签, 说明)
+MACRO_IMPACTS = (
+    (("降息", "降准"), "货币政策宽松信号", "利好股市、债市，关注高弹性品种"),
+    (("加息", "收紧"), "货币政策收紧信号", "利空高估值成长股，关注防御品种"),
+    (("美联储",), "美联储动态", "关注对全球资产配置的影响"),
+    (("房地产", "楼市"), "房地产政策", "关注地产链及相关金融股"),
+)
+
+# 股市/期货板块: (分类, 数量片段, 篇数); 板块标题在数量片段中
+MARKET_SECTIONS = (
+    ("A股市场", "a_stock_count", 8),
+    ("美股市场", "us_stock_count", 5),
+    ("商品期货", "futures_count", 8),
+)
+
+def _row(article):
+    """一篇文章在报告中用到的字段, 每篇只计算一次"""
+    return (article.get("title", ""), article.get("url", ""), article.get("source", ""),
+            get_signal_emoji(article.get("market_signal", {}).get("overall", "neutral")))
+
+def render_reports(data, formats=None):
+    """一次遍历数据, 同时生成投资摘要和详细报告 (各输出格式)"""
+    report = report_template.Report(TEMPLATES, ("summary", "detailed"), formats)
+    summary, detailed = report["summary"], report["detailed"]
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-def generate_detailed_report(data):
-    """生成详细投资报告"""
     date = data.get("date", datetime.now().strftime("%Y-%m-%d"))
     total = data.get("total_articles", 0)
     signal_stats = data.get("signal_stats", {})
-    categories = data.get("categories", {})
     top_articles = data.get("top_articles", [])
     categorized = data.get("categorized_articles", {})
     sector_stats = data.get("sector_stats", {})
-    entity_stats = data.get("entity_stats", {})
+    entity_spikes = data.get("entity_spikes", [])
     risk_articles = data.get("risk_articles", [])
-    
-    # 市场情绪分析
+
+    # 市场情绪 (摘要按信号总数, 详细报告按资讯总数)
     bullish = signal_stats.get("bullish", 0)
     bearish = signal_stats.get("bearish", 0)
     neutral = signal_stats.get("neutral", 0)
-    
-    report = f"""# 财经资讯深度分析报告
-## {date}
-
----
-
-## 一、市场情绪分析
-
-### 1.1 情绪指数
-
-本日共收集财经资讯 **{total}** 条，多空信号分布如下：
-
-| 信号类型 | 数量 | 占比 | 解读 |
-|----------|------|------|------|
-| 📈 利好 | {bullish} | {bullish/total*100:.1f}% | 做多信号 |
-| 📉 利空 | {bearish} | {bearish/total*100:.1f}% | 风险信号 |
-| ➖ 中性 | {neutral} | {neutral/total*100:.1f}% | 观望信号 |
-
-### 1.2 情绪判断
+    total_signals = bullish + bearish + neutral
 
-"""
-    
-    sentiment_ratio = (bullish - bearish) / total if total > 0 else 0
-    
-    if sentiment_ratio > 0.3:
-        report += "**市场情绪: 偏多 📈**\n\n利好消息明显占优，市场信心较强。建议关注：\n"
-        report += "- 顺势布局强势板块\n- 关注业绩超预期个股\n- 注意获利了结时机\n\n"
-    elif sentiment_ratio < -0.3:
-        report += "**市场情绪: 偏空 📉**\n\n利空消息较多，市场谨慎情绪升温。建议：\n"
-        report += "- 控制仓位，规避风险\n- 关注防御性板块\n- 等待市场企稳信号\n\n"
+    if total_signals > 0:
+        ratio = (bullish - bearish) / total_signals
+        if ratio > 0.2:
+            sentiment, sentiment_desc = "偏多 📈", "市场情绪乐观，利好消息占优"
+        elif ratio < -0.2:
+            sentiment, sentiment_desc = "偏空 📉", "市场情绪谨慎，需注意风险"
+        else:
+            sentiment, sentiment_desc = "中性 ➖", "市场多空平衡，观望为主"
     else:
-        report += "**市场情绪: 中性 ➖**\n\n多空力量相对平衡，市场处于观望状态。建议：\n"
-        report += "- 保持中性仓位\n- 关注政策信号\n- 精选结构性机会\n\n"
-    
-    # 板块分析
-    report += """---
+        sentiment, sentiment_desc = "中性 ➖", "数据不足"
+    summary.emit("summary_head", date=date, sentiment=sentiment, sentiment_desc=sentiment_desc,
+                 bullish=bullish, bearish=bearish, neutral=neutral)
 
-## 二、板块轮动分析
-
-### 2.1 热门板块
+    share = lambda count: count / total * 100 if total > 0 else 0
+    detailed.emit("detailed_head", date=date, total=total, bullish=bullish, bearish=bearish, neutral=neutral,
+                  bullish_pct=share(bullish), bearish_pct=share(bearish), neutral_pct=share(neutral))
+    sentiment_ratio = (bullish - bearish) / total if total > 0 else 0
+    view = "bullish" if sentiment_ratio > 0.3 else "bearish" if sentiment_ratio < -0.3 else "neutral"
+    label, desc, tips = SENTIMENT_VIEWS[view]
+    detailed.emit("sentiment_view", label=label, desc=desc, tip1=tips[0], tip2=tips[1], tip3=tips[2])
 
-"""
-    
+    # 热门板块 (摘要前 5, 详细报告前 8)
+    detailed.emit("sector_head")
     for i, (sector, count) in enumerate(list(sector_stats.items())[:8], 1):
-        percentage = count / total * 100 if total > 0 else 0
+        if i <= 5:
+            summary.emit("summary_sector", i=i, sector=sector, count=count, icon="🔥" if count > 10 else "📈")
         heat = "🔥🔥🔥" if count > 15 else "🔥🔥" if count > 8 else "🔥"
-        report += f"| {i} | **{sector}** | {count} 条 | {percentage:.1f}% | {heat} |\n"
-    
-    report += """
-
-### 2.2 板块解读
-
-"""
-    
-    # 根据热门板块给出投资建议
-    if "半导体" in sector_stats or "芯片" in sector_stats:
-        report += "**半导体板块**: 科技自主主线持续，关注国产替代机会\n\n"
-    if "新能源" in sector_stats:
-        report += "**新能源板块**: 政策支持力度大，但需注意估值风险\n\n"
-    if "医药" in sector_stats:
-        report += "**医药板块**: 创新药政策回暖，可逢低布局\n\n"
-    if "银行" in sector_stats or "券商" in sector_stats:
-        report += "**金融板块**: 关注利率政策变化带来的机会\n\n"
-    
-    # 宏观政策
-    report += """---
-
-## 三、宏观政策解读
-
-"""
-    
+        detailed.emit("sector_row", i=i, sector=sector, count=count, percentage=share(count), heat=heat)
+    detailed.emit("sector_notes_head")
+    for sectors, label, text in SECTOR_NOTES:
+        if any(sector in sector_stats for sector in sectors):
+            detailed.emit("sector_note", label=label, text=text)
+    
+    # 提及异动 (详细报告全部, 摘要在热点之后取前 5 个)
+    if entity_spikes:
+        detailed.emit("spike_head")
+        for spike in entity_spikes:
+            detailed.emit("spike_item", **spike)
+        detailed.emit("list_end")
+
+    # 今日热点 (摘要前 10 条; 详细报告的数据来源取前 30 条)
+    summary.emit("summary_top_head")
+    sources = set()
+    for i, article in enumerate(top_articles[:30], 1):
+        sources.add(article.get("source", ""))
+        if i <= 10:
+            title, url, source, signal_icon = _row(article)
+            pub_time = format_pub_date(article.get("pub_date", ""))
+            summary.emit("summary_hot", i=i, signal_icon=signal_icon, title=title[:55], url=url,
+                         source=source, pub_time=pub_time)
+    summary.emit("summary_top_end")
+    if entity_spikes:
+        summary.emit("summary_section", heading="📈 提及异动")
+        for spike in entity_spikes[:5]:
+            summary.emit("spike_item", **spike)
+        summary.emit("summary_section_end")
+
+    # 宏观政策 (摘要前 5 条, 详细报告前 10 条; 政策影响分析取全部标题)
     macro_articles = categorized.get("宏观政策", [])
+    detailed.emit("macro_head")
     if macro_articles:
-        report += f"本日宏观政策相关资讯共 **{len(macro_articles)}** 条：\n\n"
-        
-        for i, a in enumerate(macro_articles[:10], 1):
-            title = a.get("title", "")
-            url = a.get("url", "")
-            source = a.get("source", "")
-            pub_time = format_pub_date(a.get("pub_date", ""))
-            signal = a.get("market_signal", {}).get("overall", "neutral")
-            signal_icon = get_signal_emoji(signal)
-            
-            report += f"{i}. {signal_icon} [{title}]({url})\n"
-            report += f"   - 来源: {source} | 时间: {pub_time}\n\n"
-        
-        # 政策影响分析
-        report += "### 政策影响分析\n\n"
-        
+        summary.emit("summary_section", heading="🏛️ 宏观政策")
+        detailed.emit("macro_count", count=len(macro_articles))
+        for i, article in enumerate(macro_articles[:10], 1):
+            title, url, source, signal_icon = _row(article)
+            if i <= 5:
+                summary.emit("list_item", title=title[:50], url=url, source=source)
+            detailed.emit("macro_item", i=i, signal_icon=signal_icon, title=title, url=url, source=source,
+                          pub_time=format_pub_date(article.get("pub_date", "")))
+        summary.emit("summary_section_end")
+
+        detailed.emit("macro_impact_head")
         macro_text = " ".join([a.get("title", "") for a in macro_articles])
-        
-        if "降息" in macro_text or "降准" in macro_text:
-            report += "- **货币政策宽松信号**: 利好股市、债市，关注高弹性品种\n"
-        if "加息" in macro_text or "收紧" in macro_text:
-            report += "- **货币政策收紧信号**: 利空高估值成长股，关注防御品种\n"
-        if "美联储" in macro_text:
-            report += "- **美联储动态**: 关注对全球资产配置的影响\n"
-        if "房地产" in macro_text or "楼市" in macro_text:
-            report += "- **房地产政策**: 关注地产链及相关金融股\n"
-        
-        report += "\n"
-    
-    # 股市动态
-    report += """---
-
-## 四、股市动态
-
-### 4.1 A股市场
-
-"""
-    
-    a_stock_articles = categorized.get("A股市场", [])
-    if a_stock_articles:
-        report += f"A股相关资讯 **{len(a_stock_articles)}** 条：\n\n"
-        
-        for a in a_stock_articles[:8]:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            report += f"- [{title}]({url}) *{source}*\n"
-        report += "\n"
-    
-    # 美股市场
-    us_stock_articles = categorized.get("美股市场", [])
-    if us_stock_articles:
-        report += f"""### 4.2 美股市场
-
-美股相关资讯 **{len(us_stock_articles)}** 条：
-
-"""
-        for a in us_stock_articles[:5]:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            report += f"- [{title}]({url}) *{source}*\n"
-        report += "\n"
-    
-    # 商品期货
-    futures_articles = categorized.get("商品期货", [])
-    if futures_articles:
-        report += f"""---
-
-## 五、商品期货
-
-期货相关资讯 **{len(futures_articles)}** 条：
+        for words, label, text in MACRO_IMPACTS:
+            if any(word in macro_text for word in words):
+                detailed.emit("macro_impact", label=label, text=text)
+        detailed.emit("list_end")
 
-"""
-        for a in futures_articles[:8]:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            report += f"- [{title}]({url}) *{source}*\n"
-        report += "\n"
-    
-    # 风险预警
-    report += """---
-
-## 六、风险预警
-
-"""
-    
+    # 行业动态 (仅摘要)
+    sector_articles = categorized.get("行业板块", [])[:5]
+    if sector_articles:
+        summary.emit("summary_section", heading="🏭 行业动态")
+        for article in sector_articles:
+            title, url, source, _ = _row(article)
+            summary.emit("list_item", title=title[:50], url=url, source=source)
+        summary.emit("summary_section_end")
+
+    # 股市动态、商品期货 (仅详细报告)
+    detailed.emit("stock_head")
+    for cat, head, limit in MARKET_SECTIONS:
+        articles = categorized.get(cat, [])
+        if articles:
+            detailed.emit(head, count=len(articles))
+            for article in articles[:limit]:
+                title, url, source, _ = _row(article)
+                detailed.emit("list_item", title=title[:50], url=url, source=source)
+            detailed.emit("list_end")
+
+    # 风险预警 (摘要前 5 条, 详细报告前 8 条)
+    detailed.emit("risk_head")
     if risk_articles:
-        report += f"⚠️ 本日风险相关资讯 **{len(risk_articles)}** 条，请重点关注：\n\n"
-        
-        for i, a in enumerate(risk_articles[:8], 1):
-            title = a.get("title", "")
-            url = a.get("url", "")
-            source = a.get("source", "")
-            
-            report += f"{i}. 🚨 [{title}]({url})\n"
-            report += f"   - 来源: {source}\n\n"
+        summary.emit("summary_section", heading="⚠️ 风险提示")
+        detailed.emit("risk_count", count=len(risk_articles))
+        for i, article in enumerate(risk_articles[:8], 1):
+            title, url, source, _ = _row(article)
+            if i <= 5:
+                summary.emit("summary_risk_item", title=title[:50], url=url, source=source)
+            detailed.emit("risk_item", i=i, title=title, url=url, source=source)
+        summary.emit("summary_section_end")
+        detailed.emit("risk_end")
     else:
-        report += "✅ 本日无明显风险预警信号。\n\n"
-    
-    # 投资建议
-    report += f"""---
-
-## 七、投资建议
+        detailed.emit("risk_none")
 
-### 7.1 仓位建议
-
-| 投资者类型 | 建议仓位 | 理由 |
-|------------|----------|------|
-| **激进型** | 60-70% | 市场情绪{sentiment_ratio:+.1%}，可适当参与 |
-| **稳健型** | 40-50% | 保持灵活，等待机会 |
-| **保守型** | 20-30% | 控制风险为主 |
-
-### 7.2 关注方向
-
-"""
-    
-    # 根据数据给出关注方向
+    # 投资建议
+    detailed.emit("advice", sentiment_ratio=sentiment_ratio)
     top_sectors = list(sector_stats.keys())[:5]
     if top_sectors:
-        report += f"1. **热点板块**: {', '.join(top_sectors[:3])}\n"
-    
+        detailed.emit("focus_sectors", sectors=", ".join(top_sectors[:3]))
     if bullish > bearish * 1.5:
-        report += "2. **策略**: 利好占优，可适当加仓\n"
+        strategy = "利好占优，可适当加仓"
     elif bearish > bullish * 1.5:
-        report += "2. **策略**: 风险偏大，控制仓位\n"
+        strategy = "风险偏大，控制仓位"
     else:
-        report += "2. **策略**: 观望为主，精选个股\n"
-    
-    report += "3. **风控**: 设置止损位，严格执行纪律\n"
-    
-    # 数据来源
-    report += f"""
-
----
-
-## 八、数据来源
-
-本报告数据来源于国内外主流财经媒体：
+        strategy = "观望为主，精选个股"
+    detailed.emit("focus_strategy", text=strategy)
+    detailed.emit("focus_risk")
 
-"""
-    
-    sources = set(a.get("source", "") for a in top_articles[:30])
+    # 结尾
+    summary.emit("summary_foot", now=now)
+    detailed.emit("sources_head")
     for source in sorted(sources)[:15]:
-        report += f"- {source}\n"
-    
-    report += f"""
-
----
+        detailed.emit("source_item", source=source)
+    detailed.emit("detailed_foot", now=now)
 
-*报告生成时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}*  
-*由 Finance News Analyzer v1 自动生成*  
-*🍄 蒜宝财经分析 | 投资有风险，入市需谨慎*
-"""
-    
     return report
 
-def main():
-    """主函数"""
+def generate_summary(data):
+    """生成投资摘要 - 投资者视角"""
+    return render_reports(data, ("md",))["summary"].render()
+
+def generate_detailed_report(data):
+    """生成详细投资报告"""
+    return render_reports(data, ("md",))["detailed"].render()
+
+def main(date=None, data=None):
+    """主函数 (date: 为指定日期重新生成报告; data: 处理器刚返回的处理结果, 流水线中直接传入, 不再读文件)"""
     print(f"[{datetime.now().isoformat()}] 开始生成财经分析报告...")
     
-    data = load_processed_data()
+    if data is None:
+        data = load_processed_data(date)
+    else:
+        data = processed_format.resolve(data)
     
     if not data:
         print("错误: 未找到处理后的数据")
         return
     
-    summary = generate_summary(data)
-    detailed = generate_detailed_report(data)
+    # 一次渲染得到全部文档和格式
+    report = render_reports(data)
+    summary = report["summary"].render()
+    detailed = report["detailed"].render()
     
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     date = data.get("date", datetime.now().strftime("%Y-%m-%d"))
@@ -448,16 +491,17 @@ def main():
     day_dir = OUTPUT_DIR / year_month
     day_dir.mkdir(parents=True, exist_ok=True)
     
+    # 每份内容只在对象存储中保存一次, 按日期的路径为硬链接
+    store = output_store.OutputStore()
+    
     # 保存摘要
     summary_file = day_dir / f"summary_{date}.md"
-    with open(summary_file, "w", encoding="utf-8") as f:
-        f.write(summary)
+    store.put(summary_file, summary)
     print(f"✅ 摘要已保存: {summary_file}")
     
     # 保存详细报告
     detailed_file = day_dir / f"detailed_{date}.md"
-    with open(detailed_file, "w", encoding="utf-8") as f:
-        f.write(detailed)
+    store.put(detailed_file, detailed)
     print(f"✅ 详细报告已保存: {detailed_file}")
     
     # 保存JSON
@@ -465,8 +509,8 @@ def main():
     report_data = {
         "date": date,
         "generated_at": datetime.now().isoformat(),
-        "summary": summary,
-        "detailed_report": detailed,
+        # 摘要和详细报告引用同目录下的 .md 文件, 不再内嵌全文 (output_store.load_report 可还原)
+        "files": {"summary": summary_file.name, "detailed_report": detailed_file.name},
         "stats": {
             "total_articles": data.get("total_articles", 0),
             "signal_stats": data.get("signal_stats", {}),
@@ -474,8 +518,16 @@ def main():
             "categories": data.get("categories", {})
         }
     }
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(report_data, f, ensure_ascii=False, indent=2)
+    store.put(json_file, json.dumps(report_data, ensure_ascii=False, indent=2))
+    
+    # 保存HTML (REPORT_HTML=1)
+    if "html" in report.formats:
+        for name, title in (("summary", f"财经资讯日报 - {date}"), ("detailed", f"财经资讯深度分析报告 - {date}")):
+            html_file = day_dir / f"{name}_{date}.html"
+            store.put(html_file, report[name].render("html", title))
+            print(f"✅ HTML已保存: {html_file}")
+    
+    store.save()
     
     print(f"\n🎉 财经报告生成完成!")
     
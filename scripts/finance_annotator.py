@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+财经资讯单遍标注
+所有词库 (多空信号、指数/板块/公司实体、投资分类、核心关键词、要点板块)
+统一编译为一个 Aho–Corasick 自动机, 对每篇文章的 标题+URL 只扫描一次,
+同时得到 market_signal / entities / investment_categories / investment_score / key_points,
+结果与原先逐词库循环的实现完全一致
+"""
+
+import re
+
+from keyword_automaton import KeywordAutomaton
+
+# ===== 爬取阶段: 市场信号 =====
+
+# 利好关键词
+BULLISH_KEYWORDS = [
+    "上涨", "大涨", "暴涨", "新高", "突破", "利好", "盈利", "增长", "超预期",
+    "降息", "宽松", "刺激", "反弹", "回暖", "恢复", "并购", "收购",
+    "增持", "回购", "分红", "业绩大增", "扭亏", "订单", "中标",
+    "surge", "rally", "gain", "profit", "growth", "beat", "rise"
+]
+
+# 利空关键词
+BEARISH_KEYWORDS = [
+    "下跌", "大跌", "暴跌", "新低", "破位", "利空", "亏损", "下滑", "不及预期",
+    "加息", "收紧", "萎缩", "衰退", "裁员", "破产", "违约", "暴雷",
+    "减持", "抛售", "退市", "调查", "处罚", "诉讼", "罚款",
+    "plunge", "crash", "drop", "loss", "down", "recession", "fear"
+]
+
+# ===== 爬取阶段: 实体 =====
+
+# 主要指数 (任一别名出现即命中)
+INDEX_ALIASES = [
+    (("上证指数", "沪指", "上证"), "上证指数"),
+    (("深证成指", "深成指"), "深证成指"),
+    (("创业板指", "创业板"), "创业板指"),
+    (("科创50", "科创板"), "科创50"),
+    (("恒生指数", "恒指"), "恒生指数"),
+    (("道琼斯", "道指"), "道琼斯"),
+    (("纳斯达克", "纳指"), "纳斯达克"),
+    (("标普500", "S&P"), "标普500"),
+]
+
+# 行业板块
+SECTORS = [
+    "半导体", "芯片", "新能源", "光伏", "锂电池", "储能", "风电",
+    "白酒", "医药", "生物制药", "医疗器械", "中药",
+    "银行", "券商", "保险", "地产", "房地产",
+    "汽车", "新能源汽车", "智能驾驶",
+    "消费电子", "苹果产业链", "消费", "食品饮料",
+    "军工", "航天", "通信", "5G", "人工智能", "AI",
+    "互联网", "电商", "游戏", "传媒", "教育",
+    "有色", "煤炭", "石油", "化工", "钢铁"
+]
+
+# 大公司
+COMPANIES = [
+    "茅台", "宁德时代", "比亚迪", "腾讯", "阿里", "字节", "美团",
+    "华为", "小米", "蔚来", "理想", "小鹏", "中芯国际",
+    "苹果", "特斯拉", "英伟达", "微软", "谷歌", "Meta", "亚马逊"
+]
+
+# ===== 处理阶段: 投资分类 =====
+
+# 投资领域分类关键词
+INVESTMENT_CATEGORIES = {
+    "宏观政策": [
+        "央行", "美联储", "利率", "降息", "加息", "货币政策", "财政政策",
+        "GDP", "CPI", "PMI", "通胀", "通缩", "经济数据", "统计局",
+        "国常会", "政治局", "发改委", "商务部", "财政部",
+        "Fed", "FOMC", "ECB", "利率决议", "缩表", "QE"
+    ],
+    "A股市场": [
+        "A股", "上证", "深证", "创业板", "科创板", "北交所",
+        "沪指", "深成指", "两市", "成交额", "北向资金", "南向资金",
+        "涨停", "跌停", "龙虎榜", "机构", "游资", "融资", "融券"
+    ],
+    "美股市场": [
+        "美股", "纳指", "道指", "标普", "纳斯达克", "纽交所",
+        "道琼斯", "S&P", "NYSE", "NASDAQ", "华尔街", "美联储",
+        "科技股", "中概股", "ADR", "FAANG", "七巨头"
+    ],
+    "港股市场": [
+        "港股", "恒指", "恒生指数", "港交所", "HKEX",
+        "港股通", "恒生科技", "腾讯", "阿里", "美团", "小米"
+    ],
+    "行业板块": [
+        "半导体", "芯片", "新能源", "光伏", "锂电池", "储能", "风电",
+        "白酒", "医药", "生物制药", "医疗器械", "中药",
+        "银行", "券商", "保险", "地产", "房地产",
+        "汽车", "新能源汽车", "智能驾驶", "汽车零部件",
+        "消费电子", "苹果产业链", "消费", "食品饮料",
+        "军工", "航天", "通信", "5G", "人工智能", "AI",
+        "有色", "煤炭", "石油", "化工", "钢铁", "水泥"
+    ],
+    "商品期货": [
+        "期货", "商品", "原油", "黄金", "白银", "铜", "铝",
+        "螺纹钢", "铁矿石", "焦炭", "动力煤",
+        "农产品", "大豆", "玉米", "小麦", "棉花", "白糖",
+        "OPEC", "减产", "增产", "库存", "供需"
+    ],
+    "外汇市场": [
+        "汇率", "美元", "人民币", "欧元", "日元", "英镑",
+        "USD", "CNY", "EUR", "JPY", "GBP",
+        "外汇储备", "贬值", "升值", "汇率波动"
+    ],
+    "基金理财": [
+        "基金", "公募", "私募", "ETF", "LOF", "QDII",
+        "基金经理", "净值", "申购", "赎回", "定投",
+        "权益基金", "债券基金", "货币基金", "指数基金"
+    ],
+    "财报业绩": [
+        "财报", "年报", "季报", "业绩", "营收", "净利润",
+        "毛利率", "净利率", "ROE", "EPS", "每股收益",
+        "业绩预告", "业绩快报", "分析师", "评级", "研报"
+    ],
+    "并购重组": [
+        "并购", "重组", "收购", "借壳", "定增", "配股",
+        "IPO", "上市", "退市", "私有化", "分拆",
+        "股权转让", "要约收购", "合并"
+    ],
+    "风险预警": [
+        "暴雷", "违约", "退市", "风险", "调查", "处罚",
+        "诉讼", "仲裁", "亏损", "减值", "坏账",
+        "质押", "冻结", "破产", "清算"
+    ]
+}
+
+# 来源预定义分类 -> 投资分类
+SOURCE_CATEGORY_MAPPING = {
+    "宏观": "宏观政策", "政策": "宏观政策",
+    "股市": "A股市场", "A股": "A股市场",
+    "美股": "美股市场", "港股": "港股市场",
+    "期货": "商品期货", "商品": "商品期货",
+    "基金": "基金理财", "外汇": "外汇市场",
+    "财报": "财报业绩", "业绩": "财报业绩",
+    "能源": "商品期货", "原油": "商品期货"
+}
+
+# 重要公司/股票关键词
+KEY_ENTITIES = {
+    "科技巨头": ["苹果", "微软", "谷歌", "Meta", "亚马逊", "特斯拉", "英伟达", "Netflix"],
+    "中国科技": ["腾讯", "阿里", "字节", "美团", "京东", "拼多多", "百度", "小米", "快手", "B站"],
+    "新能源": ["宁德时代", "比亚迪", "蔚来", "理想", "小鹏", "隆基", "阳光电源"],
+    "半导体": ["台积电", "中芯国际", "华虹", "北方华创", "韦尔股份"],
+    "金融": ["工商银行", "建设银行", "中国平安", "招商银行", "中信证券", "东方财富"],
+    "消费": ["茅台", "五粮液", "伊利", "海天", "美的", "格力"]
+}
+
+# 实体类型 -> 加分的投资分类
+ENTITY_CATEGORY = {
+    "科技巨头": "A股市场", "中国科技": "A股市场",
+    "新能源": "行业板块", "半导体": "行业板块",
+}
+
+# 市场影响关键词
+MARKET_IMPACT = {
+    "高影响": [
+        "降息", "加息", "QE", "缩表", "利率决议",
+        "贸易战", "制裁", "地缘政治", "战争",
+        "疫情", "封锁", "衰退", "危机",
+        "财报超预期", "业绩暴雷", "重大并购"
+    ],
+    "中影响": [
+        "政策", "规划", "补贴", "监管",
+        "业绩", "营收", "利润", "订单",
+        "产能", "扩张", "投资"
+    ],
+    "低影响": [
+        "观点", "分析", "预测", "展望",
+        "日常", "常规", "一般"
+    ]
+}
+
+# 风险预警关键词 (标题中每命中一个 +5)
+RISK_KEYWORDS = MARKET_IMPACT["高影响"] + ["暴雷", "违约", "退市", "调查", "处罚"]
+
+# ===== 处理阶段: 投资价值评分 =====
+
+SOURCE_WEIGHTS = {
+    # 高权威媒体
+    "证券时报": 5, "上海证券报": 5, "中国证券报": 5, "第一财经": 5,
+    "财新网": 5, "21世纪经济报道": 5, "经济观察报": 4,
+    # 国际权威
+    "Bloomberg": 5, "Reuters": 5, "WSJ": 5, "FT": 5, "CNBC": 4,
+    # 门户网站
+    "新浪财经": 4, "东方财富": 4, "同花顺": 3,
+    # 专业媒体
+    "期货日报": 4, "中国基金报": 4,
+    # 社区
+    "雪球": 2, "淘股吧": 2
+}
+
+CORE_KEYWORDS = [
+    # 政策类 (最高权重)
+    ("降息", 5), ("加息", 5), ("利率决议", 5), ("货币政策", 4),
+    ("国常会", 4), ("政治局会议", 4), ("美联储", 5), ("央行", 4),
+
+    # 业绩类
+    ("财报", 4), ("业绩", 3), ("超预期", 4), ("暴雷", 5),
+
+    # 市场类
+    ("北向资金", 3), ("机构", 2), ("龙虎榜", 2),
+
+    # 公司类
+    ("茅台", 3), ("宁德时代", 3), ("比亚迪", 3), ("腾讯", 3),
+    ("英伟达", 3), ("特斯拉", 3), ("苹果", 2),
+
+    # 风险类
+    ("风险", 3), ("调查", 3), ("处罚", 3), ("违约", 4),
+
+    # 国际类
+    ("贸易战", 4), ("制裁", 4), ("地缘", 3)
+]
+
+# 时间敏感词
+URGENT_WORDS = ["今日", "刚刚", "突发", "重磅", "紧急"]
+
+PERCENT_PATTERN = re.compile(r'\d+(\.\d+)?%')
+AMOUNT_PATTERN = re.compile(r'\d+亿')
+
+# ===== 处理阶段: 关键要点 =====
+
+EASING_WORDS = ["降息", "降准", "宽松"]
+TIGHTENING_WORDS = ["加息", "收紧", "缩表"]
+
+POINT_SECTORS = {
+    "半导体": ["半导体", "芯片", "集成电路"],
+    "新能源": ["新能源", "光伏", "储能", "锂电池"],
+    "医药": ["医药", "创新药", "医疗器械"],
+    "消费": ["消费", "零售", "白酒"],
+    "金融": ["银行", "券商", "保险"],
+    "地产": ["地产", "房地产", "物业"]
+}
+
+
+# ===== 词库编译 =====
+#
+# 每个词条编译为 (词库, 值, 序号, 原词, 区分大小写, 词条转小写):
+# - 词库: 结果归属 (bullish / sector / category / core ...)
+# - 序号: 词条在原词库中的位置, 用于还原输出顺序
+# - 区分大小写: 原实现在原文中查找的词条, 按小写模式匹配, 命中后再核对原文对应位置
+# - 词条转小写: 原实现用 keyword.lower() 在小写文本中查找 (投资分类)
+# 其余词条按原样在小写文本中查找 (多空信号; 含大写的词原实现永远不会命中, 这里同样不会)
+
+_automaton = None
+_exact_entries = []
+
+def _lexicon():
+    entries = []
+
+    def add(kind, value, word, exact, lowered=False):
+        entries.append((kind, value, len(entries), word, exact, lowered))
+
+    for kw in BULLISH_KEYWORDS:
+        add("bullish", kw, kw, False)
+    for kw in BEARISH_KEYWORDS:
+        add("bearish", kw, kw, False)
+    for aliases, name in INDEX_ALIASES:
+        for alias in aliases:
+            add("index", name, alias, True)
+    for sector in SECTORS:
+        add("sector", sector, sector, True)
+    for company in COMPANIES:
+        add("company", company, company, True)
+    for category, keywords in INVESTMENT_CATEGORIES.items():
+        for kw in keywords:
+            add("category", category, kw, False, lowered=True)
+    for entity_type, entities in KEY_ENTITIES.items():
+        for entity in entities:
+            add("entity", entity_type, entity, True)
+    for kw in RISK_KEYWORDS:
+        add("risk", 5, kw, True)
+    for kw, weight in CORE_KEYWORDS:
+        add("core", weight, kw, True)
+    for kw in URGENT_WORDS:
+        add("urgent", kw, kw, True)
+    for kw in EASING_WORDS:
+        add("easing", kw, kw, True)
+    for kw in TIGHTENING_WORDS:
+        add("tightening", kw, kw, True)
+    for sector, keywords in POINT_SECTORS.items():
+        for kw in keywords:
+            add("point_sector", sector, kw, True)
+    return entries
+
+def _compiled():
+    """编译统一词库 (进程内只编译一次)"""
+    global _automaton, _exact_entries
+    if _automaton is None:
+        automaton = KeywordAutomaton()
+        exact_entries = []
+        for entry in _lexicon():
+            kind, value, rank, word, exact, lowered = entry
+            automaton.add(word.lower() if exact or lowered else word, entry)
+            if exact:
+                exact_entries.append(entry)
+        _exact_entries = exact_entries
+        _automaton = automaton.build()
+    return _automaton
+
+def warm():
+    """预先编译词库 (如进程池的每个工作进程启动时)"""
+    _compiled()
+
+
+def _scan(title, url):
+    """单遍扫描, 返回 (全文命中词条, 标题命中词条)"""
+    automaton = _compiled()
+    title_lower = title.lower()
+    title_end = len(title_lower)
+    # 小写后长度不变时, 小写文本与原文位置一一对应, 可直接核对原文
+    aligned = title_end == len(title)
+
+    anywhere = set()
+    in_title = set()
+    for start, end, pid in automaton.iter_matches(title_lower + " " + url.lower()):
+        for entry in automaton.payloads[pid]:
+            if entry[4]:
+                # 区分大小写的词条只在标题原文中查找
+                if end > title_end or not aligned or title[start:end] != entry[3]:
+                    continue
+            anywhere.add(entry)
+            if end <= title_end:
+                in_title.add(entry)
+
+    if not aligned:
+        in_title.update(entry for entry in _exact_entries if entry[3] in title)
+
+    return anywhere, in_title
+
+
+def _market_signal(hits):
+    signals = {
+        "bullish": [e[1] for e in hits if e[0] == "bullish"],
+        "bearish": [e[1] for e in hits if e[0] == "bearish"],
+        "neutral": []
+    }
+
+    if len(signals["bullish"]) > len(signals["bearish"]):
+        signals["overall"] = "bullish"
+    elif len(signals["bearish"]) > len(signals["bullish"]):
+        signals["overall"] = "bearish"
+    else:
+        signals["overall"] = "neutral"
+
+    return signals
+
+def _entities(hits):
+    entities = {
+        "stocks": [],
+        "companies": [e[1] for e in hits if e[0] == "company"],
+        "sectors": [e[1] for e in hits if e[0] == "sector"],
+        "indices": []
+    }
+    # 同一指数的多个别名只记一次
+    for e in hits:
+        if e[0] == "index" and e[1] not in entities["indices"]:
+            entities["indices"].append(e[1])
+    return entities
+
+def _investment_categories(article, anywhere, in_title):
+    match_scores = {}
+
+    # 1. 来源预分类加分
+    for cat in article.get("categories", []):
+        mapped = SOURCE_CATEGORY_MAPPING.get(cat, cat)
+        if mapped in INVESTMENT_CATEGORIES:
+            match_scores[mapped] = match_scores.get(mapped, 0) + 3
+
+    # 2. 关键词匹配: 标题中 +2, 仅 URL 中 +1
+    keyword_scores = {}
+    title_entries = set(in_title)
+    for e in anywhere:
+        if e[0] == "category":
+            keyword_scores[e[1]] = keyword_scores.get(e[1], 0) + (2 if e in title_entries else 1)
+    for category in INVESTMENT_CATEGORIES:
+        if category in keyword_scores:
+            match_scores[category] = match_scores.get(category, 0) + keyword_scores[category]
+
+    # 3. 实体匹配 + 4. 风险预警
+    for e in in_title:
+        if e[0] == "entity" and e[1] in ENTITY_CATEGORY:
+            target = ENTITY_CATEGORY[e[1]]
+            match_scores[target] = match_scores.get(target, 0) + 1
+        elif e[0] == "risk":
+            match_scores["风险预警"] = match_scores.get("风险预警", 0) + e[1]
+
+    sorted_cats = sorted(match_scores.items(), key=lambda x: x[1], reverse=True)
+    result = [cat for cat, score in sorted_cats[:3] if score >= 2]
+
+    return result if result else ["其他"]
+
+def _investment_score(article, title, in_title):
+    score = SOURCE_WEIGHTS.get(article.get("source", ""), 1)
+
+    # 市场信号沿用文章已有的 market_signal (与处理阶段读取爬取结果一致)
+    overall = article.get("market_signal", {}).get("overall", "neutral")
+    if overall in ("bullish", "bearish"):
+        score += 2  # 利空也同样重要
+
+    urgent = False
+    for e in in_title:
+        if e[0] == "core":
+            score += e[1]
+        elif e[0] == "urgent":
+            urgent = True
+    if urgent:
+        score += 2
+
+    if PERCENT_PATTERN.search(title):
+        score += 1
+    if AMOUNT_PATTERN.search(title):
+        score += 1
+
+    if len(title) < 10 or len(title) > 80:
+        score -= 1
+
+    return max(score, 1)
+
+def _key_points(in_title):
+    points = []
+    kinds = {e[0] for e in in_title}
+
+    # 1. 政策影响
+    if "easing" in kinds:
+        points.append("货币政策宽松信号")
+    if "tightening" in kinds:
+        points.append("货币政策收紧信号")
+
+    # 2. 行业机会
+    sectors = []
+    for e in in_title:
+        if e[0] == "point_sector" and e[1] not in sectors:
+            sectors.append(e[1])
+    if sectors:
+        points.append(f"涉及板块: {', '.join(sectors)}")
+
+    # 3. 公司动态: 每个实体类型取第一个命中的标的
+    seen_types = set()
+    for e in in_title:
+        if e[0] == "entity" and e[1] not in seen_types:
+            seen_types.add(e[1])
+            points.append(f"关注标的: {e[3]}")
+
+    return points[:3]
+
+
+def annotate(article):
+    """单遍标注一篇财经资讯
+
+    返回 {"market_signal", "entities", "investment_categories", "investment_score", "key_points"}。
+    market_signal / entities 只看标题; 分类看标题和 URL;
+    投资价值评分沿用文章已有的 market_signal (爬取阶段写入), 没有则按中性计。
+    """
+    title = article.get("title", "")
+    anywhere, in_title = _scan(title, article.get("url", ""))
+
+    # 按词库顺序排列, 使输出列表顺序与逐词库循环一致
+    anywhere = sorted(anywhere, key=lambda e: e[2])
+    in_title = sorted(in_title, key=lambda e: e[2])
+
+    return {
+        "market_signal": _market_signal(in_title),
+        "entities": _entities(in_title),
+        "investment_categories": _investment_categories(article, anywhere, in_title),
+        "investment_score": _investment_score(article, title, in_title),
+        "key_points": _key_points(in_title),
+    }
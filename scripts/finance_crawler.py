@@ -12,16 +12,23 @@ Finance News Crawler v1
 - 国际市场: 美联储、地缘政治、汇率
 """
 
-import json
 import re
 import time
 import random
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 import hashlib
-import subprocess
 import html
-import xml.etree.ElementTree as ET
+
+import article_index
+import charset
+import feed_cache
+import fetch_archive
+import feed_parser
+import finance_annotator
+import http_client
+import link_extractor
+import raw_store
 
 PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
 DATA_DIR = PROJECT_ROOT / "data" / "finance" / "raw"
@@ -140,103 +147,13 @@ def parse_pub_date(date_str):
 
 def extract_market_signal(title, content=""):
     """提取市场信号 - 投资者视角"""
-    text = (title + " " + content).lower()
-    
-    signals = {
-        "bullish": [],  # 利好信号
-        "bearish": [],  # 利空信号
-        "neutral": []   # 中性/观望
-    }
-    
-    # 利好关键词
-    bullish_keywords = [
-        "上涨", "大涨", "暴涨", "新高", "突破", "利好", "盈利", "增长", "超预期",
-        "降息", "宽松", "刺激", "反弹", "回暖", "恢复", "并购", "收购",
-        "增持", "回购", "分红", "业绩大增", "扭亏", "订单", "中标",
-        "surge", "rally", "gain", "profit", "growth", "beat", "rise"
-    ]
-    
-    # 利空关键词
-    bearish_keywords = [
-        "下跌", "大跌", "暴跌", "新低", "破位", "利空", "亏损", "下滑", "不及预期",
-        "加息", "收紧", "萎缩", "衰退", "裁员", "破产", "违约", "暴雷",
-        "减持", "抛售", "退市", "调查", "处罚", "诉讼", "罚款",
-        "plunge", "crash", "drop", "loss", "down", "recession", "fear"
-    ]
-    
-    for kw in bullish_keywords:
-        if kw in text:
-            signals["bullish"].append(kw)
-    
-    for kw in bearish_keywords:
-        if kw in text:
-            signals["bearish"].append(kw)
-    
-    # 确定整体信号
-    if len(signals["bullish"]) > len(signals["bearish"]):
-        signals["overall"] = "bullish"
-    elif len(signals["bearish"]) > len(signals["bullish"]):
-        signals["overall"] = "bearish"
-    else:
-        signals["overall"] = "neutral"
-    
-    return signals
+    text = title + " " + content if content else title
+    return finance_annotator.annotate({"title": text})["market_signal"]
 
 def extract_entities(title, content=""):
     """提取关键实体 - 股票、公司、行业"""
-    text = title + " " + content
-    
-    entities = {
-        "stocks": [],
-        "companies": [],
-        "sectors": [],
-        "indices": []
-    }
-    
-    # 主要指数
-    indices_patterns = [
-        (r"上证指数|沪指|上证", "上证指数"),
-        (r"深证成指|深成指", "深证成指"),
-        (r"创业板指|创业板", "创业板指"),
-        (r"科创50|科创板", "科创50"),
-        (r"恒生指数|恒指", "恒生指数"),
-        (r"道琼斯|道指", "道琼斯"),
-        (r"纳斯达克|纳指", "纳斯达克"),
-        (r"标普500|S&P", "标普500"),
-    ]
-    
-    for pattern, name in indices_patterns:
-        if re.search(pattern, text):
-            entities["indices"].append(name)
-    
-    # 行业板块
-    sectors = [
-        "半导体", "芯片", "新能源", "光伏", "锂电池", "储能", "风电",
-        "白酒", "医药", "生物制药", "医疗器械", "中药",
-        "银行", "券商", "保险", "地产", "房地产",
-        "汽车", "新能源汽车", "智能驾驶",
-        "消费电子", "苹果产业链", "消费", "食品饮料",
-        "军工", "航天", "通信", "5G", "人工智能", "AI",
-        "互联网", "电商", "游戏", "传媒", "教育",
-        "有色", "煤炭", "石油", "化工", "钢铁"
-    ]
-    
-    for sector in sectors:
-        if sector in text:
-            entities["sectors"].append(sector)
-    
-    # 大公司
-    companies = [
-        "茅台", "宁德时代", "比亚迪", "腾讯", "阿里", "字节", "美团",
-        "华为", "小米", "蔚来", "理想", "小鹏", "中芯国际",
-        "苹果", "特斯拉", "英伟达", "微软", "谷歌", "Meta", "亚马逊"
-    ]
-    
-    for company in companies:
-        if company in text:
-            entities["companies"].append(company)
-    
-    return entities
+    text = title + " " + content if content else title
+    return finance_annotator.annotate({"title": text})["entities"]
 
 def fetch_rss(source):
     """通过 RSS 获取数据"""
@@ -247,65 +164,55 @@ def fetch_rss(source):
     log(f"RSS 获取: {source['name']}")
     
     try:
-        cmd = ["curl", "-s", "-L",
-               "--connect-timeout", "15",
-               "--max-time", "30",
-               "-H", f"User-Agent: {random.choice(USER_AGENTS)}",
-               rss_url]
-        
-        result = subprocess.run(cmd, capture_output=True, timeout=45)
-        
-        if not result.stdout or len(result.stdout) < 100:
-            return []
-        
-        content = result.stdout.decode('utf-8', errors='replace')
+        validators = feed_cache.default_store()
+        headers = {"User-Agent": random.choice(USER_AGENTS)}
+        headers.update(validators.headers_for(rss_url))
         
-        articles = []
-        root = ET.fromstring(content)
-        
-        for item in root.findall('.//item')[:50]:
-            try:
-                title_elem = item.find('title')
-                link_elem = item.find('link')
-                pub_date_elem = item.find('pubDate')
-                desc_elem = item.find('description')
-                
-                if title_elem is None or link_elem is None:
-                    continue
-                
-                title = clean_text(title_elem.text) if title_elem.text else ""
-                url = link_elem.text.strip() if link_elem.text else ""
-                pub_date = parse_pub_date(pub_date_elem.text) if pub_date_elem is not None else None
-                
-                if not title or len(title) < 5 or not url:
+        with http_client.get(rss_url, headers=headers, connect_timeout=15, max_time=30,
+                             stream=True) as resp:
+            if resp.status == 304:
+                log(f"{source['name']} (RSS): 无更新 (304)")
+                return feed_cache.NOT_MODIFIED
+            
+            # 流式解析 RSS 2.0 / Atom, 取前 50 条后停止读取
+            articles = []
+            for item in feed_parser.iter_feed_items(resp.iter_content(), limit=50):
+                try:
+                    title = clean_text(item["title"])
+                    url = item["link"]
+                    pub_date = parse_pub_date(item["pub_date"])
+                    
+                    if not title or len(title) < 5 or not url:
+                        continue
+                    
+                    # 单遍提取市场信号和实体
+                    annotation = finance_annotator.annotate({"title": title})
+                    
+                    article = {
+                        "id": generate_id(url + title),
+                        "title": title,
+                        "url": url,
+                        "source": source["name"],
+                        "categories": source.get("category", []),
+                        "pub_date": pub_date,
+                        "crawl_time": datetime.now().isoformat(),
+                        "date": datetime.now().strftime("%Y-%m-%d"),
+                        "market_signal": annotation["market_signal"],
+                        "entities": annotation["entities"]
+                    }
+                    
+                    articles.append(article)
+                    
+                except Exception as e:
                     continue
-                
-                # 提取市场信号
-                signals = extract_market_signal(title)
-                entities = extract_entities(title)
-                
-                article = {
-                    "id": generate_id(url + title),
-                    "title": title,
-                    "url": url,
-                    "source": source["name"],
-                    "categories": source.get("category", []),
-                    "pub_date": pub_date,
-                    "crawl_time": datetime.now().isoformat(),
-                    "date": datetime.now().strftime("%Y-%m-%d"),
-                    "market_signal": signals,
-                    "entities": entities
-                }
-                
-                articles.append(article)
-                
-            except Exception as e:
-                continue
+        
+        if articles:
+            validators.update(rss_url, resp)
         
         log(f"{source['name']} (RSS): {len(articles)} 条")
         return articles
         
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         log(f"RSS 超时: {source['name']}", "WARN")
         return []
     except Exception as e:
@@ -320,51 +227,29 @@ def fetch_html(source):
     log(f"HTML 获取: {name}")
     
     try:
-        cmd = ["curl", "-s", "-L",
-               "--connect-timeout", "10",
-               "--max-time", "25",
-               "-H", f"User-Agent: {random.choice(USER_AGENTS)}",
-               "-H", "Accept: text/html,*/*",
-               url]
-        
-        result = subprocess.run(cmd, capture_output=True, timeout=35)
+        resp = http_client.get(url,
+                               headers={"User-Agent": random.choice(USER_AGENTS),
+                                        "Accept": "text/html,*/*"},
+                               connect_timeout=10, max_time=25)
         
-        if not result.stdout or len(result.stdout) < 500:
+        if not resp.content or len(resp.content) < 500:
             return []
         
-        for enc in ['utf-8', 'gbk', 'gb2312', 'latin-1']:
-            try:
-                content = result.stdout.decode(enc)
-                break
-            except:
-                continue
-        else:
-            content = result.stdout.decode('utf-8', errors='replace')
-        
-        pattern = r'<a[^>]*href=["\']([^"\']+)["\'][^>]*>([^<]+)</a>'
-        links = re.findall(pattern, content, re.IGNORECASE)
-        
-        base_domain = re.match(r'https?://([^/]+)', url)
-        base_domain = base_domain.group(1) if base_domain else ""
+        # 按响应头 / meta / 站点缓存确定编码, 按需分块解码
+        content = charset.iter_decoded(resp)
         
         articles = []
         seen_urls = set()
         
-        for href, title in links[:150]:
-            href = href.strip()
-            if href.startswith("/"):
-                href = f"https://{base_domain}{href}"
-            elif not href.startswith("http"):
-                continue
-            
+        # 逐个提取链接, 收集够有效文章后即停止解析
+        for href, title in link_extractor.iter_links(content, resp.url or url, max_links=150):
             if href in seen_urls:
                 continue
             seen_urls.add(href)
             
             title = clean_text(title)
             
-            signals = extract_market_signal(title)
-            entities = extract_entities(title)
+            annotation = finance_annotator.annotate({"title": title})
             
             article = {
                 "id": generate_id(href + title),
@@ -375,8 +260,8 @@ def fetch_html(source):
                 "pub_date": None,
                 "crawl_time": datetime.now().isoformat(),
                 "date": datetime.now().strftime("%Y-%m-%d"),
-                "market_signal": signals,
-                "entities": entities
+                "market_signal": annotation["market_signal"],
+                "entities": annotation["entities"]
             }
             
             if validate_article(article):
@@ -388,7 +273,7 @@ def fetch_html(source):
         log(f"{name} (HTML): {len(articles)} 条")
         return articles
         
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         log(f"HTML 超时: {name}", "WARN")
         return []
     except Exception as e:
@@ -429,78 +314,95 @@ def crawl_source(source):
     """爬取单个数据源"""
     if source.get("rss"):
         articles = fetch_rss(source)
+        if articles is feed_cache.NOT_MODIFIED:
+            return []  # 订阅源自上次抓取后无变化, 无需回退 HTML
         if articles:
             return articles
     return fetch_html(source)
 
-def main():
+def main(sink=None):
+    """抓取全部数据源, 返回原始数据文件路径
+    
+    sink: 流式模式下每个数据源去重后的新文章 (写入原始文件之后) 交给 sink(articles)
+    """
     log("=" * 60)
     log("财经资讯爬虫 v1 启动 (投资者视角)")
     log("=" * 60)
     
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    data_dir = fetch_archive.raw_dir(DATA_DIR)
+    data_dir.mkdir(parents=True, exist_ok=True)
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
     
-    all_articles = []
-    
-    log("\n📍 爬取国内财经数据源...")
-    for source in CN_SOURCES:
-        try:
-            articles = crawl_source(source)
-            all_articles.extend(articles)
-            time.sleep(random.uniform(0.3, 0.8))
-        except Exception as e:
-            log(f"爬取 {source['name']} 异常: {e}", "ERROR")
-    
-    log("\n🌍 爬取国际财经数据源...")
-    for source in INTL_SOURCES:
-        try:
-            articles = crawl_source(source)
-            all_articles.extend(articles)
-            time.sleep(random.uniform(0.5, 1.0))
-        except Exception as e:
-            log(f"爬取 {source['name']} 异常: {e}", "ERROR")
-    
-    # 去重
-    seen = set()
-    unique = []
-    for a in all_articles:
-        key = a["id"] + a["title"][:20]
-        if key not in seen:
-            seen.add(key)
-            unique.append(a)
-    
-    # 统计
-    source_stats = {}
-    signal_stats = {"bullish": 0, "bearish": 0, "neutral": 0}
-    
-    for a in unique:
-        src = a.get("source", "未知")
-        source_stats[src] = source_stats.get(src, 0) + 1
-        
-        signal = a.get("market_signal", {}).get("overall", "neutral")
-        signal_stats[signal] = signal_stats.get(signal, 0) + 1
-    
-    # 保存
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = DATA_DIR / f"finance_{timestamp}.json"
-    
-    output_data = {
+    output_file = raw_store.raw_path(data_dir, "finance", timestamp)
+    meta = {
         "crawl_time": datetime.now().isoformat(),
         "version": "v1",
-        "total_articles": len(unique),
         "cn_sources": [s["name"] for s in CN_SOURCES],
         "intl_sources": [s["name"] for s in INTL_SOURCES],
-        "source_stats": source_stats,
-        "signal_stats": signal_stats,
-        "articles": unique
     }
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    seen = set()
+    source_stats = {}
+    signal_stats = {"bullish": 0, "bearish": 0, "neutral": 0}
+    known_before = 0
+    
+    with raw_store.RawWriter(output_file, meta) as writer, article_index.ArticleIndex(fetch_archive.index_path(article_index.INDEX_FILE)) as index:
+        
+        def save_batch(articles):
+            """去重后追加写入一个数据源的结果"""
+            nonlocal known_before
+            
+            # 按规范化 URL 去重 (标题改动不算新文章)
+            batch = []
+            for a in articles:
+                key = article_index.article_key(a)
+                if key not in seen:
+                    seen.add(key)
+                    batch.append(a)
+            
+            # 跳过往日已抓取过的文章
+            fresh = article_index.unseen_today(index, "finance", batch)
+            known_before += len(batch) - len(fresh)
+            writer.write(fresh)
+            
+            for a in fresh:
+                src = a.get("source", "未知")
+                source_stats[src] = source_stats.get(src, 0) + 1
+                
+                signal = a.get("market_signal", {}).get("overall", "neutral")
+                signal_stats[signal] = signal_stats.get(signal, 0) + 1
+            
+            if sink:
+                sink(fresh)
+        
+        log("\n📍 爬取国内财经数据源...")
+        for source in CN_SOURCES:
+            try:
+                save_batch(crawl_source(source))
+                time.sleep(random.uniform(0.3, 0.8))
+            except Exception as e:
+                log(f"爬取 {source['name']} 异常: {e}", "ERROR")
+        
+        log("\n🌍 爬取国际财经数据源...")
+        for source in INTL_SOURCES:
+            try:
+                save_batch(crawl_source(source))
+                time.sleep(random.uniform(0.5, 1.0))
+            except Exception as e:
+                log(f"爬取 {source['name']} 异常: {e}", "ERROR")
+        
+        writer.close({
+            "total_articles": writer.count,
+            "source_stats": source_stats,
+            "signal_stats": signal_stats,
+        })
+    
+    fetch_archive.save_caches(feed_cache.default_store(), charset.default_cache())
     
     log("\n" + "=" * 60)
-    log(f"✅ 完成! 共 {len(unique)} 条资讯")
+    log(f"📇 文章索引: 往日已出现 {known_before} 条, 已跳过")
+    log(f"✅ 完成! 共 {writer.count} 条资讯")
     log(f"📁 保存: {output_file}")
     log("\n📊 市场情绪信号:")
     log(f"   利好: {signal_stats['bullish']} 条")
@@ -510,7 +412,7 @@ def main():
     for src, count in sorted(source_stats.items(), key=lambda x: x[1], reverse=True)[:10]:
         log(f"   {src}: {count} 条")
     
-    return unique
+    return output_file
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -11,9 +11,14 @@ import random
 from datetime import datetime
 from pathlib import Path
 import hashlib
-import subprocess
 import html
 
+import article_index
+import charset
+import fetch_archive
+import http_client
+import link_extractor
+
 PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
 DATA_DIR = PROJECT_ROOT / "data" / "raw"
 LOGS_DIR = PROJECT_ROOT / "logs"
@@ -113,17 +118,12 @@ def validate_article(article):
 
 def fetch_fast(url, timeout=30):
     try:
-        cmd = ["curl", "-s", "-L", "--connect-timeout", "15", "--max-time", str(timeout),
-               "-H", f"User-Agent: {random.choice(USER_AGENTS)}",
-               "-H", "Accept: text/html,*/*", url]
-        result = subprocess.run(cmd, capture_output=True, timeout=timeout + 10)
+        resp = http_client.get(url,
+                               headers={"User-Agent": random.choice(USER_AGENTS),
+                                        "Accept": "text/html,*/*"},
+                               connect_timeout=15, max_time=timeout)
         
-        for enc in ['utf-8', 'gbk', 'gb2312', 'latin-1']:
-            try:
-                return result.stdout.decode(enc)
-            except:
-                continue
-        return result.stdout.decode('utf-8', errors='replace')
+        return charset.decode(resp)
     except:
         return None
 
@@ -139,22 +139,10 @@ def crawl_source(source):
         log(f"{name}: 获取失败", "WARN")
         return []
     
-    pattern = r'<a[^>]*href=["\']([^"\']+)["\'][^>]*>([^<]+)</a>'
-    links = re.findall(pattern, content, re.IGNORECASE)
-    
-    base_domain = re.match(r'https?://([^/]+)', url)
-    base_domain = base_domain.group(1) if base_domain else ""
-    
     articles = []
     seen_urls = set()
     
-    for href, title in links[:150]:
-        href = href.strip()
-        if href.startswith("/"):
-            href = f"https://{base_domain}{href}"
-        elif not href.startswith("http"):
-            continue
-        
+    for href, title in link_extractor.iter_links(content, url, max_links=150):
         if href in seen_urls:
             continue
         seen_urls.add(href)
@@ -191,7 +179,8 @@ def main():
     log("财经新闻爬虫启动 (A股 + 美股)")
     log("=" * 50)
     
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    data_dir = fetch_archive.raw_dir(DATA_DIR)
+    data_dir.mkdir(parents=True, exist_ok=True)
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
     
     all_articles = []
@@ -210,21 +199,27 @@ def main():
         all_articles.extend(articles)
         time.sleep(random.uniform(0.5, 1.5))
     
-    # 去重
+    # 按规范化 URL 去重 (标题改动不算新文章)
     seen = set()
     unique = []
     for a in all_articles:
-        key = a["id"] + a["title"][:20]
+        key = article_index.article_key(a)
         if key not in seen:
             seen.add(key)
             unique.append(a)
     
+    # 跳过往日已抓取过的文章
+    with article_index.ArticleIndex(fetch_archive.index_path(article_index.INDEX_FILE)) as index:
+        fresh = article_index.unseen_today(index, "finance", unique)
+    log(f"文章索引: 本次 {len(unique)} 条, 其中往日已出现 {len(unique) - len(fresh)} 条")
+    unique = fresh
+    
     # 按影响力排序
     unique.sort(key=lambda x: x.get("impact_score", 0), reverse=True)
     
     # 保存
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = DATA_DIR / f"finance_news_{timestamp}.json"
+    output_file = data_dir / f"finance_news_{timestamp}.json"
     
     output_data = {
         "crawl_time": datetime.now().isoformat(),
@@ -238,6 +233,8 @@ def main():
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(output_data, f, ensure_ascii=False, indent=2)
     
+    fetch_archive.save_caches(charset.default_cache())
+    
     log("-" * 50)
     log(f"完成! 共 {len(unique)} 条")
     log(f"  A股: {output_data['a_stock_count']} 条")
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+共享 HTTP 客户端
+- 按主机维护 keep-alive 连接池, 同一主机的后续请求复用 TCP/TLS 连接
+- DNS 解析结果缓存 (带 TTL)
+- 可配置连接超时 / 总超时, 自动跟随重定向, 支持 gzip/deflate
+替代各爬虫中逐请求启动 curl 子进程的做法
+"""
+
+import gzip
+import http.client
+import socket
+import ssl
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit, urljoin
+
+DEFAULT_CONNECT_TIMEOUT = 15
+DEFAULT_MAX_TIME = 30
+MAX_REDIRECTS = 10          # 对应 curl -L 的默认上限
+MAX_IDLE_PER_HOST = 4       # 每个主机最多保留的空闲连接数
+DNS_TTL = 300               # DNS 缓存有效期 (秒)
+READ_CHUNK = 64 * 1024
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+
+class FetchTimeout(TimeoutError):
+    """请求超过总超时时间"""
+
+
+class Response:
+    """一次请求的结果"""
+
+    def __init__(self, url, status, headers, content, elapsed):
+        self.url = url              # 跟随重定向后的最终地址
+        self.status = status
+        self.headers = headers      # http.client.HTTPMessage, 大小写不敏感
+        self.content = content      # 已解压的响应体 (bytes)
+        self.elapsed = elapsed
+
+    def header(self, name, default=None):
+        return self.headers.get(name, default) if self.headers is not None else default
+
+    def iter_content(self, chunk_size=READ_CHUNK):
+        """按块返回响应体"""
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamingResponse(Response):
+    """未读取响应体的响应, 由调用方通过 iter_content 边下载边处理
+
+    响应体读完后连接归还连接池; 提前 close (如只需要前 N 条) 则直接断开连接。
+    """
+
+    def __init__(self, client, key, conn, resp, url, start, deadline):
+        self.url = url
+        self.status = resp.status
+        self.headers = resp.headers
+        self.elapsed = 0.0
+        self._client = client
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self._start = start
+        self._deadline = deadline
+        self._decoder = _Decoder(resp.getheader("Content-Encoding"))
+        self._content = None
+        self._consumed = False
+
+    def iter_content(self, chunk_size=READ_CHUNK):
+        if self._content is not None:
+            yield from Response.iter_content(self, chunk_size)
+            return
+        if self._conn is None:
+            raise RuntimeError("响应已关闭")
+        try:
+            while True:
+                remaining = self._deadline - time.monotonic()
+                if remaining <= 0:
+                    raise FetchTimeout("超过总超时时间")
+                if self._conn.sock is not None:
+                    self._conn.sock.settimeout(remaining)
+                chunk = self._resp.read(chunk_size)
+                if not chunk:
+                    break
+                data = self._decoder.decompress(chunk)
+                if data:
+                    yield data
+            tail = self._decoder.flush()
+            if tail:
+                yield tail
+            self._consumed = True
+        except socket.timeout as e:
+            raise FetchTimeout(str(e) or "读取超时") from e
+        finally:
+            self.elapsed = time.monotonic() - self._start
+
+    @property
+    def content(self):
+        if self._content is None:
+            try:
+                self._content = b"".join(self.iter_content())
+            finally:
+                self.close()
+        return self._content
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        if self._consumed or self._resp.length == 0:
+            self._client._finish(self._key, conn, self._resp)
+        else:
+            conn.close()
+
+
+class DNSCache:
+    """线程安全的 getaddrinfo 结果缓存"""
+
+    def __init__(self, ttl=DNS_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, infos)
+        return infos
+
+    def create_connection(self, address, timeout=None, source_address=None):
+        """socket.create_connection 的替代实现, 使用缓存的解析结果"""
+        host, port = address
+        last_error = None
+        for family, socktype, proto, _, sockaddr in self.resolve(host, port):
+            sock = None
+            try:
+                sock = socket.socket(family, socktype, proto)
+                if timeout is not None:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sockaddr)
+                return sock
+            except OSError as e:
+                last_error = e
+                if sock is not None:
+                    sock.close()
+        # 缓存的地址全部不可用时丢弃缓存, 下次重新解析
+        with self._lock:
+            self._entries.pop((host, port), None)
+        raise last_error or OSError(f"无法连接 {host}:{port}")
+
+
+class HTTPClient:
+    """带连接池的 HTTP 客户端, 可在多线程间共享"""
+
+    def __init__(self, connect_timeout=DEFAULT_CONNECT_TIMEOUT, max_time=DEFAULT_MAX_TIME,
+                 max_idle_per_host=MAX_IDLE_PER_HOST, dns_ttl=DNS_TTL, archive=None):
+        self.archive = archive      # fetch_archive 的录制/回放器, None 表示直接联网
+        self.connect_timeout = connect_timeout
+        self.max_time = max_time
+        self.max_idle_per_host = max_idle_per_host
+        self.dns = DNSCache(dns_ttl)
+        self._ssl_context = ssl.create_default_context()
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    # ---- 连接池 ----
+
+    def _new_connection(self, scheme, host, port):
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=self.connect_timeout,
+                                               context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.connect_timeout)
+        conn._create_connection = self.dns.create_connection
+        return conn
+
+    def _acquire(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(*key), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """关闭所有空闲连接"""
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for idle in pools.values():
+            for conn in idle:
+                conn.close()
+
+    # ---- 请求 ----
+
+    def _request_once(self, url, headers, connect_timeout, deadline):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"不支持的协议: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        request_headers = {
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+        request_headers.update(headers or {})
+
+        for attempt in range(2):
+            conn, reused = self._acquire(key)
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise FetchTimeout("超过总超时时间")
+                conn.timeout = min(connect_timeout, remaining)
+                if conn.sock is not None:
+                    conn.sock.settimeout(remaining)
+                conn.request("GET", path, headers=request_headers)
+                conn.sock.settimeout(max(deadline - time.monotonic(), 0.001))
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # 复用的连接可能已被服务端关闭, 换新连接重试一次
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            return key, conn, resp
+
+    def _finish(self, key, conn, resp):
+        """响应体读完后归还连接"""
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+    def _read_body(self, conn, resp, deadline):
+        chunks = []
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise FetchTimeout("超过总超时时间")
+                if conn.sock is not None:
+                    conn.sock.settimeout(remaining)
+                chunk = resp.read(READ_CHUNK)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except BaseException:
+            conn.close()
+            raise
+        return b"".join(chunks)
+
+    def get(self, url, headers=None, connect_timeout=None, max_time=None, stream=False):
+        """GET 请求, 跟随重定向, 返回 Response; 超时抛出 FetchTimeout
+
+        stream=True 时返回 StreamingResponse, 响应体由调用方按块读取,
+        使用完毕需 close (或用 with 语句)。
+        """
+        connect_timeout = connect_timeout or self.connect_timeout
+        max_time = max_time or self.max_time
+        if self.archive is not None:
+            return self.archive.fetch(self, url, headers, connect_timeout, max_time)
+        return self._fetch(url, headers, connect_timeout, max_time, stream)
+
+    def _fetch(self, url, headers, connect_timeout, max_time, stream=False):
+        start = time.monotonic()
+        deadline = start + max_time
+
+        for _ in range(MAX_REDIRECTS + 1):
+            try:
+                key, conn, resp = self._request_once(url, headers, connect_timeout, deadline)
+                location = resp.getheader("Location")
+                redirect = resp.status in REDIRECT_CODES and location
+                if stream and not redirect:
+                    return StreamingResponse(self, key, conn, resp, url, start, deadline)
+                body = self._read_body(conn, resp, deadline)
+            except socket.timeout as e:
+                raise FetchTimeout(str(e) or "连接超时") from e
+            self._finish(key, conn, resp)
+
+            if redirect:
+                url = urljoin(url, location)
+                continue
+
+            return Response(url, resp.status, resp.headers, _decompress(body, resp),
+                            time.monotonic() - start)
+
+        raise http.client.HTTPException(f"重定向次数过多: {url}")
+
+
+class _Decoder:
+    """按块解压 gzip / deflate 响应体"""
+
+    def __init__(self, encoding):
+        encoding = (encoding or "").lower()
+        self._obj = zlib.decompressobj(32 + zlib.MAX_WBITS) if encoding in ("gzip", "deflate") else None
+        self._raw_fallback = encoding == "deflate"
+        self._started = False
+
+    def decompress(self, chunk):
+        if self._obj is None:
+            return chunk
+        try:
+            data = self._obj.decompress(chunk)
+        except zlib.error:
+            # 部分服务端的 deflate 不带 zlib 头
+            if self._started or not self._raw_fallback:
+                raise
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            data = self._obj.decompress(chunk)
+        self._started = True
+        return data
+
+    def flush(self):
+        return self._obj.flush() if self._obj is not None else b""
+
+
+def _decompress(body, resp):
+    encoding = (resp.getheader("Content-Encoding") or "").lower()
+    try:
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+    except (OSError, EOFError, zlib.error):
+        pass
+    return body
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+def default_client():
+    """进程内共享的客户端, 科技/财经爬虫在同一进程运行时复用同一连接池"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            import fetch_archive
+            _default_client = HTTPClient(archive=fetch_archive.from_env())
+        return _default_client
+
+def get(url, headers=None, connect_timeout=None, max_time=None, stream=False):
+    return default_client().get(url, headers=headers, connect_timeout=connect_timeout,
+                                max_time=max_time, stream=stream)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+原始数据增量摄取
+- 清单 (manifest) 记录已摄取的原始文件及其大小/修改时间, 每次运行只解析新增或变化的文件
+- 按原始文件名中的日期分区, 每天一个 JSONL 状态文件, 保存当天去重后的文章 (含处理阶段的标注),
+  新文章直接追加, 不重写已有内容
+- 处理器只需对新文章做分类/评分, 再与当天已有状态合并
+处理耗时随新增数据增长, 与历史归档的总量无关
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import raw_store
+
+MANIFEST_NAME = "manifest.json"
+# news_20260315_080000.json / finance_20260315_080000.jsonl(.gz)
+FILE_DATE = re.compile(r"_(\d{4})(\d{2})(\d{2})(?:_\d+)?\.jsonl?(?:\.gz)?$")
+
+
+def file_date(path):
+    """原始文件所属日期 (YYYY-MM-DD), 文件名中没有日期时按修改时间"""
+    match = FILE_DATE.search(path.name)
+    if match:
+        return "-".join(match.groups())
+    return datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d")
+
+def _signature(path):
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class IngestState:
+    """一个处理器 (科技/财经) 的增量摄取状态
+
+    raw_dir:   原始数据目录
+    pattern:   原始文件通配符, 如 "news_*.json", 或多个通配符的元组
+    state_dir: 状态目录, 存放 manifest.json 和按日的 day_YYYY-MM-DD.jsonl
+    key:       文章去重键, 默认为文章 id
+    """
+
+    def __init__(self, raw_dir, pattern, state_dir, key=None):
+        self.raw_dir = Path(raw_dir)
+        self.patterns = (pattern,) if isinstance(pattern, str) else tuple(pattern)
+        self.state_dir = Path(state_dir)
+        self.key = key or (lambda article: article.get("id"))
+        self.manifest_path = self.state_dir / MANIFEST_NAME
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def _day_path(self, date):
+        return self.state_dir / f"day_{date}.jsonl"
+
+    def iter_day(self, date):
+        """逐篇读取某天已摄取的文章"""
+        path = self._day_path(date)
+        if path.exists():
+            yield from raw_store.iter_articles(path)
+            return
+        # 旧版整文件状态
+        legacy = path.with_suffix(".json")
+        if legacy.exists():
+            with open(legacy, "r", encoding="utf-8") as f:
+                yield from json.load(f).get("articles", [])
+
+    def rewrite_day(self, date, articles):
+        """整体替换某天的状态 (如按新词库重新标注后), 原子写入"""
+        path = self._day_path(date)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.unlink(missing_ok=True)
+        with raw_store.RawWriter(tmp) as writer:
+            writer.write(articles)
+        os.replace(tmp, path)
+        path.with_suffix(".json").unlink(missing_ok=True)
+
+    def pending(self):
+        """新增或内容有变化的原始文件, 按文件名 (即抓取时间) 排序"""
+        files = []
+        paths = {path for pattern in self.patterns for path in self.raw_dir.glob(pattern)}
+        for path in sorted(paths):
+            entry = self.manifest.get(path.name) or {}
+            signature = _signature(path)
+            if entry.get("size") != signature["size"] or entry.get("mtime") != signature["mtime"]:
+                files.append(path)
+        return files
+
+    def ingest(self, prepare=None, accept=None, annotate=None, loaded=None):
+        """摄取所有待处理文件, 新文章追加到各自日期的状态文件
+
+        prepare:  对每篇新文章调用一次 (如分类、评分), 结果随状态一起保存;
+                  已在状态中的文章不会重复处理
+        accept:   accept(article, date) 返回 False 的文章不计入该日 (如往日已出现过的文章)
+        annotate: 批量标注, 对同一天的全部新文章 (列表) 调用一次, 原地写入标注字段,
+                  在 prepare 之前执行; 可交给进程池并行
+        loaded:   {原始文件名: 文章列表}, 内容已在内存中的原始文件 (如流式模式刚写完的文件) 不再重新读取
+        返回本次有更新的日期集合
+        """
+        pending = self.pending()
+        loaded = loaded or {}
+        by_date = {}
+        for path in pending:
+            by_date.setdefault(file_date(path), []).append(path)
+
+        for date, paths in sorted(by_date.items()):
+            day_path = self._day_path(date)
+            names = {path.name for path in paths}
+
+            if any(name in self.manifest for name in names) or not day_path.exists():
+                # 已摄取过的文件内容有变化 (或旧版状态): 该日按全部文件重建, 只影响这一天
+                known = [self.raw_dir / name for name, entry in self.manifest.items()
+                         if entry.get("date") == date and name not in names]
+                paths = sorted([path for path in known if path.exists()] + paths)
+                day_path.unlink(missing_ok=True)
+                day_path.with_suffix(".json").unlink(missing_ok=True)
+
+            seen_keys = {self.key(article) for article in self.iter_day(date)}
+            batches = []
+            for path in paths:
+                new_articles = []
+                try:
+                    # 逐篇读取, 不把整个原始文件载入内存
+                    articles = loaded.get(path.name)
+                    for article in raw_store.iter_articles(path) if articles is None else articles:
+                        key = self.key(article)
+                        if key in seen_keys:
+                            continue
+                        seen_keys.add(key)
+                        if accept and not accept(article, date):
+                            continue
+                        new_articles.append(article)
+                except Exception as e:
+                    # 不记入清单, 下次运行重试
+                    print(f"读取文件失败 {path}: {e}")
+                    continue
+                batches.append((path, new_articles))
+
+            # 当天的新文章一起标注, 再按文件追加
+            if annotate:
+                annotate([article for _, new_articles in batches for article in new_articles])
+            with raw_store.RawWriter(day_path) as writer:
+                for path, new_articles in batches:
+                    if prepare:
+                        for article in new_articles:
+                            prepare(article)
+                    writer.write(new_articles)
+                    self.manifest[path.name] = dict(_signature(path), date=date, articles=len(new_articles))
+
+        if pending:
+            _write_json(self.manifest_path, self.manifest)
+        return set(by_date)
+
+    def articles(self, date, prepare=None, accept=None, record=None, annotate=None):
+        """先增量摄取, 再返回某天去重后的全部文章
+
+        record: 逐篇转换函数 (如 ArticleRecord.from_dict), 边读边转换, 不保留原始字典
+        """
+        self.ingest(prepare, accept, annotate)
+        if record is None:
+            return list(self.iter_day(date))
+        return [record(article) for article in self.iter_day(date)]
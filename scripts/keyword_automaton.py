@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Aho–Corasick 多模式关键词匹配
+词库编译一次, 之后对每段文本单遍扫描即可得到全部命中 (含位置),
+单篇文章的匹配成本与词库大小无关
+"""
+
+from collections import deque
+
+
+class KeywordAutomaton:
+    """多模式匹配自动机
+
+    每个模式可以附带任意多个 payload (同一个词出现在多个分类中时各记一份),
+    build() 之后模式集不可再修改。
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]        # 节点 -> ((模式编号, 模式长度), ...), 含 fail 链上的输出
+        self.patterns = []      # 模式编号 -> 模式串
+        self.payloads = []      # 模式编号 -> [payload, ...]
+        self._index = {}
+        self._built = False
+
+    def add(self, pattern, payload=None):
+        if self._built:
+            raise RuntimeError("自动机已编译, 不能再添加模式")
+        if not pattern:
+            return
+
+        pid = self._index.get(pattern)
+        if pid is None:
+            pid = len(self.patterns)
+            self._index[pattern] = pid
+            self.patterns.append(pattern)
+            self.payloads.append([])
+
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] = ((pid, len(pattern)),)
+
+        self.payloads[pid].append(payload)
+
+    def build(self):
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if goto[f].get(ch, 0) != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._built = True
+        return self
+
+    def iter_matches(self, text):
+        """产出 (起始位置, 结束位置, 模式编号), 包括重叠命中"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid, length in out[node]:
+                yield i + 1 - length, i + 1, pid
+
+    def first_positions(self, text):
+        """{模式编号: 首次命中的结束位置}"""
+        first = {}
+        for _, end, pid in self.iter_matches(text):
+            if pid not in first:
+                first[pid] = end
+        return first
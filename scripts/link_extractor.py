@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+单遍 HTML 链接提取
+- 基于 HTMLParser 的增量分词, 按块喂入, 边解析边产出 (href, text)
+- 与原有规则一样只接受以 / 或 http 开头的链接, 按页面地址 (及 <base href>) 解析为绝对地址, 只保留 http/https;
+  页内锚点 (#、#comments 等) 与指回页面本身的链接跳过
+- 支持锚文本中嵌套标签, 如 <a href="..."><span>标题</span></a>
+- 调用方取够所需条数后停止迭代即可, 剩余文档不再解析
+"""
+
+from collections import deque
+from html.parser import HTMLParser
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+FEED_CHUNK = 16 * 1024
+
+
+class _AnchorParser(HTMLParser):
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.links = deque()
+        self._href = None
+        self._text = []
+
+    def _close_anchor(self):
+        if self._href is not None:
+            self.links.append((self._href, "".join(self._text)))
+            self._href = None
+            self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            # <a> 不允许嵌套, 未闭合的前一个锚点到此结束
+            self._close_anchor()
+            href = dict(attrs).get("href")
+            if href:
+                self._href = href
+        elif tag == "base" and self.base_url:
+            href = dict(attrs).get("href")
+            if href:
+                self.base_url = urljoin(self.base_url, href.strip())
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._close_anchor()
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+
+def _chunks(content):
+    if isinstance(content, str):
+        for i in range(0, len(content), FEED_CHUNK):
+            yield content[i:i + FEED_CHUNK]
+    else:
+        yield from content
+
+
+def _raw_links(parser, content):
+    for chunk in _chunks(content):
+        parser.feed(chunk)
+        while parser.links:
+            yield parser.links.popleft()
+    parser.close()
+    parser._close_anchor()
+    while parser.links:
+        yield parser.links.popleft()
+
+
+def iter_links(content, base_url, max_links=None):
+    """逐个产出页面中的 (绝对链接, 锚文本)
+
+    content:   HTML 字符串或字符串块的可迭代对象
+    base_url:  页面地址, 用于解析相对链接
+    max_links: 最多产出的带文本链接数 (None 为不限)
+    """
+    parser = _AnchorParser(base_url)
+    page = urldefrag(base_url or "")[0]
+    count = 0
+
+    for href, text in _raw_links(parser, content):
+        href = href.strip()
+        if not text.strip() or not href.startswith(("/", "http")):
+            continue
+
+        href = urljoin(parser.base_url, href)
+        if urlsplit(href).scheme not in ("http", "https") or urldefrag(href)[0] == page:
+            continue
+
+        yield href, text
+        count += 1
+        if max_links is not None and count >= max_links:
+            return
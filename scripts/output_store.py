@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+报告输出的内容寻址存储
+- 每份内容按 sha256 只在 output/.store/objects/ 下保存一次
+- 按日期的报告路径 (如 output/2026-03/summary_2026-03-15.md) 是指向对象的硬链接,
+  原有路径照常读取; 文件系统不支持硬链接时退回为普通文件
+- output/.store/manifest.json 记录 路径 -> 内容哈希; 路径已指向相同内容时不再写入
+- 写入均为原子写 (临时文件 + os.replace), 读者不会看到写了一半的文件
+- 报告 JSON 不再内嵌摘要/详细报告全文, 改为引用同目录下的 .md 文件 (load_report 可还原)
+- dedupe 只合并清单中的路径和按日期命名的报告文件 (REPORT_NAME), output/ 下的其他文件不动
+注意: 硬链接共享同一份数据, 修改报告请整体替换文件 (本模块的 put), 不要原地改写
+
+用法:
+  python3 scripts/output_store.py           # 文件数、去重后占用
+  python3 scripts/output_store.py dedupe    # 把已有的重复报告 (含历史报告) 合并为硬链接
+  python3 scripts/output_store.py gc        # 删除不再被任何路径引用的对象
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
+OUTPUT_ROOT = PROJECT_ROOT / "output"
+STORE_NAME = ".store"
+# 分析器与窗口汇总写出的报告文件名; 临时摘要 (.partial.md) 不在其中
+REPORT_NAME = re.compile(r"(summary|detailed|report|window_\d+d)_\d{4}-\d{2}-\d{2}\.(md|json|html)")
+
+
+def atomic_write(path, data):
+    """原子写入 (str 按 UTF-8 编码)"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OutputStore:
+    """输出目录的对象存储, 退出 with 时保存清单"""
+
+    def __init__(self, root=None):
+        self.root = Path(root or OUTPUT_ROOT)
+        self.store_dir = self.root / STORE_NAME
+        self.objects_dir = self.store_dir / "objects"
+        self.manifest_path = self.store_dir / "manifest.json"
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        self._dirty = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+    def save(self):
+        if self._dirty:
+            atomic_write(self.manifest_path, json.dumps(self.manifest, ensure_ascii=False, indent=1, sort_keys=True))
+            self._dirty = False
+
+    def _key(self, path):
+        path = Path(path).absolute()
+        try:
+            return str(path.relative_to(self.root.absolute()))
+        except ValueError:
+            return str(path)
+
+    def object_path(self, digest):
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def _link(self, obj, path, data=None):
+        """path 原子地替换为 obj 的硬链接; 不支持硬链接时写入副本"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.unlink(missing_ok=True)
+            os.link(obj, tmp)
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            atomic_write(path, data if data is not None else obj.read_bytes())
+
+    def put(self, path, content):
+        """保存一份输出, 返回内容哈希"""
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        obj = self.object_path(digest)
+        if not obj.exists():
+            atomic_write(obj, data)
+
+        path = Path(path)
+        key = self._key(path)
+        if self.manifest.get(key) == digest and path.exists() and os.path.samefile(obj, path):
+            return digest  # 内容未变, 不再写入
+        self._link(obj, path, data)
+        self.manifest[key] = digest
+        self._dirty = True
+        return digest
+
+    def _files(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d != STORE_NAME]
+            for name in filenames:
+                if not name.startswith("."):
+                    yield Path(dirpath) / name
+
+    def _managed(self, path):
+        """由存储管理的路径: 已在清单中, 或是按日期命名的报告"""
+        return self._key(path) in self.manifest or REPORT_NAME.fullmatch(path.name) is not None
+
+    def dedupe(self):
+        """已有报告按内容合并到对象存储, 返回 (文件数, 节省字节数); 其他文件不会被链接"""
+        count = saved = 0
+        for path in self._files():
+            if path.is_symlink() or not path.is_file() or not self._managed(path):
+                continue
+            count += 1
+            digest = _file_hash(path)
+            obj = self.object_path(digest)
+            if not obj.exists():
+                # 第一次出现的内容: 该文件本身成为对象, 不复制数据
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(path, obj)
+                except OSError:
+                    atomic_write(obj, path.read_bytes())
+            elif not os.path.samefile(obj, path):
+                saved += path.stat().st_size
+                self._link(obj, path)
+            key = self._key(path)
+            if self.manifest.get(key) != digest:
+                self.manifest[key] = digest
+                self._dirty = True
+        return count, saved
+
+    def gc(self):
+        """删除没有路径引用的对象 (链接数为 1), 并清理清单中已不存在的路径, 返回删除的对象数"""
+        for key in list(self.manifest):
+            path = Path(key) if os.path.isabs(key) else self.root / key
+            if not path.exists():
+                del self.manifest[key]
+                self._dirty = True
+
+        referenced = set(self.manifest.values())
+        removed = 0
+        if self.objects_dir.exists():
+            for obj in self.objects_dir.glob("*/*"):
+                if obj.stat().st_nlink == 1 and obj.parent.name + obj.name not in referenced:
+                    obj.unlink()
+                    removed += 1
+        return removed
+
+    def stats(self):
+        """(文件数, 文件总大小, 实际占用)"""
+        files = total = used = 0
+        inodes = set()
+        for path in self._files():
+            stat = path.stat()
+            files += 1
+            total += stat.st_size
+            if (stat.st_dev, stat.st_ino) not in inodes:
+                inodes.add((stat.st_dev, stat.st_ino))
+                used += stat.st_size
+        return files, total, used
+
+
+def load_report(path):
+    """读取报告 JSON, 把引用的 .md 文件还原为 summary / detailed_report 全文"""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    for key, name in report.pop("files", {}).items():
+        with open(path.parent / name, "r", encoding="utf-8") as f:
+            report[key] = f.read()
+    return report
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    with OutputStore() as store:
+        if command == "dedupe":
+            count, saved = store.dedupe()
+            print(f"检查 {count} 个文件, 合并重复内容节省 {saved / 1024:.1f} KB")
+        elif command == "gc":
+            print(f"删除 {store.gc()} 个无引用对象")
+        files, total, used = store.stats()
+        print(f"{files} 个文件, 共 {total / 1024:.1f} KB, 实际占用 {used / 1024:.1f} KB")
+
+if __name__ == "__main__":
+    main()
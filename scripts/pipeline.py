@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+进程内流水线: 爬取 → 处理 → 报告, 科技与财经两条链并发执行 (代替 run_all.sh 中依次启动的 6 个进程)
+- 阶段按依赖执行, 两条链互不等待: 一条链抓取网络时, 另一条链可以处理和生成报告
+- 处理阶段与报告阶段各自同一时间只运行一个 (处理共用全文检索库且受 GIL 限制; 报告共用对象存储清单)
+- 处理器的结果在进程内直接交给分析器, 不再写出后重新读取
+- 输入自上次成功运行后没有变化的阶段直接跳过 (处理: 原始文件与词库; 报告: 处理结果与报告模板);
+  每个阶段的输入指纹、状态与耗时记入 data/pipeline_state.json
+- 结束时打印各阶段耗时; 有阶段失败时依赖它的阶段不运行, 退出码为 1
+- stream=1 为流式模式: 每条链的抓取、标注、报告重叠执行 (见 stream_chain.py), 抓取中途即有临时摘要
+
+用法:
+  python3 scripts/pipeline.py
+  python3 scripts/pipeline.py crawl=0                # 不抓取, 只处理已有原始数据并生成报告
+  python3 scripts/pipeline.py only=finance force=1   # 只运行财经链, 不跳过任何阶段
+  python3 scripts/pipeline.py date=2026-03-15 crawl=0 workers=4
+  python3 scripts/pipeline.py stream=1               # 流式模式 (处理抓取当天)
+"""
+
+import hashlib
+import json
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from pathlib import Path
+
+import backfill
+import finance_analyzer
+import finance_crawler
+import finance_processor
+import output_store
+import report_template
+import stream_chain
+import tech_analyzer
+import tech_crawler
+import tech_processor
+
+PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
+STATE_FILE = PROJECT_ROOT / "data" / "pipeline_state.json"
+
+CRAWLERS = {"tech": tech_crawler, "finance": finance_crawler}
+PROCESSORS = {"tech": tech_processor, "finance": finance_processor}
+ANALYZERS = {"tech": tech_analyzer, "finance": finance_analyzer}
+
+# (阶段名, 范围, 类型, 依赖的阶段)
+STAGES = (
+    ("tech_crawl", "tech", "crawl", ()),
+    ("tech_process", "tech", "process", ("tech_crawl",)),
+    ("tech_analyze", "tech", "analyze", ("tech_process",)),
+    ("finance_crawl", "finance", "crawl", ()),
+    ("finance_process", "finance", "process", ("finance_crawl",)),
+    ("finance_analyze", "finance", "analyze", ("finance_process",)),
+)
+# 流式模式: 每条链一个阶段
+STREAM_STAGES = (
+    ("tech_stream", "tech", "stream", ()),
+    ("finance_stream", "finance", "stream", ()),
+)
+# 同一时间只运行一个的阶段类型
+EXCLUSIVE_KINDS = ("process", "analyze")
+
+OK = "ok"
+SKIPPED = "skipped"
+FAILED = "failed"
+BLOCKED = "blocked"
+STATUS_LABELS = {OK: "✅ 完成", SKIPPED: "⏭️ 跳过", FAILED: "❌ 失败", BLOCKED: "⛔ 未运行"}
+
+
+def _digest(paths, extra=()):
+    """文件名、大小、修改时间 (及附加字符串) 的哈希; 不存在的文件也计入"""
+    digest = hashlib.sha256()
+    for value in extra:
+        digest.update(f"{value}\n".encode())
+    for path in sorted(Path(p) for p in paths):
+        try:
+            stat = path.stat()
+            digest.update(f"{path.name} {stat.st_size} {stat.st_mtime_ns}\n".encode())
+        except OSError:
+            digest.update(f"{path.name} -\n".encode())
+    return digest.hexdigest()[:16]
+
+def _processed_file(scope, date):
+    return PROCESSORS[scope].PROCESSED_DIR / f"processed_{date}.json"
+
+def _summary_file(scope, date):
+    return ANALYZERS[scope].OUTPUT_DIR / date[:7] / f"summary_{date}.md"
+
+def inputs_fingerprint(scope, kind, date):
+    """阶段输入的指纹; 爬取 (及流式) 阶段的输入是网络, 返回 None (始终运行)"""
+    if kind == "process":
+        state = PROCESSORS[scope].open_state()
+        raw_files = [path for pattern in state.patterns for path in state.raw_dir.glob(pattern)]
+        return _digest(raw_files, (date, backfill.fingerprint(scope)))
+    if kind == "analyze":
+        code = hashlib.sha256()
+        for module in (ANALYZERS[scope], report_template):
+            with open(module.__file__, "rb") as f:
+                code.update(f.read())
+        return _digest([_processed_file(scope, date)], (date, code.hexdigest()))
+    return None
+
+def output_exists(scope, kind, date):
+    if kind == "process":
+        return _processed_file(scope, date).exists()
+    if kind == "analyze":
+        return _summary_file(scope, date).exists()
+    return True
+
+def run_stage(scope, kind, date, results, workers, lock=None):
+    """执行一个阶段, 返回该阶段的结果 (爬取: 原始文件路径; 处理: 处理结果; 报告/流式: 报告数据)
+
+    lock: 流式阶段写出处理结果和报告时持有的锁
+    """
+    if kind == "stream":
+        return stream_chain.StreamChain(scope, workers).run(lock)
+    if kind == "crawl":
+        return CRAWLERS[scope].main()
+    if kind == "process":
+        return PROCESSORS[scope].process_data(date, workers)
+    # 本次运行中处理过的, 直接使用内存中的处理结果
+    return ANALYZERS[scope].main(date, results.get(f"{scope}_process"))
+
+
+class Pipeline:
+    """一次流水线运行; 阶段在线程中执行, 状态只在主线程中读写"""
+
+    def __init__(self, date=None, crawl=True, force=False, only=None, workers=None, stream=False):
+        self.date = date or datetime.now().strftime("%Y-%m-%d")
+        self.crawl = crawl
+        self.force = force
+        self.stages = [stage for stage in (STREAM_STAGES if stream else STAGES) if only in (None, stage[1])]
+        self.workers = workers
+        self.locks = {kind: threading.Lock() for kind in EXCLUSIVE_KINDS}
+        self.results = {}
+        self.records = {}
+        try:
+            with open(STATE_FILE, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+        self.state.setdefault("stages", {})
+
+    def _up_to_date(self, name, scope, kind, fingerprint):
+        if self.force:
+            return False
+        if kind in ("crawl", "stream"):
+            return not self.crawl
+        last = self.state["stages"].get(name) or {}
+        return (last.get("status") == OK and last.get("fingerprint") == fingerprint
+                and output_exists(scope, kind, self.date))
+
+    def _execute(self, name, scope, kind):
+        """在工作线程中运行一个阶段, 返回 (状态, 输入指纹, 结果, 耗时秒数); 耗时不含等待锁的时间"""
+        lock = self.locks.get(kind)
+        if lock:
+            lock.acquire()
+        started = time.perf_counter()
+        try:
+            fingerprint = inputs_fingerprint(scope, kind, self.date)
+            if self._up_to_date(name, scope, kind, fingerprint):
+                return SKIPPED, fingerprint, None, time.perf_counter() - started
+            print(f"\n▶️ [{name}] 开始")
+            result = run_stage(scope, kind, self.date, self.results, self.workers, self.locks["process"])
+            return OK, fingerprint, result, time.perf_counter() - started
+        except Exception:
+            print(f"\n❌ [{name}] 失败:\n{traceback.format_exc()}")
+            return FAILED, None, None, time.perf_counter() - started
+        finally:
+            if lock:
+                lock.release()
+
+    def _record(self, name, status, fingerprint, seconds):
+        self.records[name] = (status, seconds)
+        if status == OK:
+            self.state["stages"][name] = {
+                "date": self.date,
+                "status": status,
+                "fingerprint": fingerprint,
+                "seconds": round(seconds, 2),
+                "finished": datetime.now().isoformat(),
+            }
+        elif status == FAILED:
+            self.state["stages"].setdefault(name, {})["status"] = FAILED
+        output_store.atomic_write(STATE_FILE, json.dumps(self.state, ensure_ascii=False, indent=2))
+
+    def run(self):
+        """运行全部阶段, 返回 {阶段名: (状态, 耗时秒数)}"""
+        started = time.perf_counter()
+        pending = list(self.stages)
+        running = {}
+        with ThreadPoolExecutor(len(self.stages) or 1) as pool:
+            while pending or running:
+                # 依赖都已结束的阶段: 依赖成功 (或跳过) 则提交, 否则不运行
+                for stage in list(pending):
+                    name, scope, kind, deps = stage
+                    if any(dep not in self.records for dep in deps):
+                        continue
+                    pending.remove(stage)
+                    if any(self.records[dep][0] not in (OK, SKIPPED) for dep in deps):
+                        self._record(name, BLOCKED, None, 0.0)
+                        continue
+                    running[pool.submit(self._execute, name, scope, kind)] = name
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    status, fingerprint, result, seconds = future.result()
+                    if result is not None:
+                        self.results[name] = result
+                    self._record(name, status, fingerprint, seconds)
+
+        self.elapsed = time.perf_counter() - started
+        return self.records
+
+    def print_summary(self):
+        print("\n" + "=" * 42)
+        print(f"  流水线耗时 ({self.date})")
+        print("=" * 42)
+        for name, _, _, _ in self.stages:
+            status, seconds = self.records[name]
+            print(f"  {name:<16} {STATUS_LABELS[status]:<8} {seconds:7.1f} 秒")
+        total = sum(seconds for _, seconds in self.records.values())
+        print(f"  总耗时 {self.elapsed:.1f} 秒 (各阶段合计 {total:.1f} 秒)")
+
+
+def main():
+    options = dict(arg.split("=", 1) for arg in sys.argv[1:] if "=" in arg)
+    only = options.get("only")
+    stream = options.get("stream") == "1"
+    if (only is not None and only not in CRAWLERS) or (stream and "date" in options):
+        print(__doc__)
+        return
+
+    pipeline = Pipeline(
+        date=options.get("date"),
+        crawl=options.get("crawl") != "0",
+        force=options.get("force") == "1",
+        only=only,
+        workers=int(options["workers"]) if "workers" in options else None,
+        stream=stream,
+    )
+    records = pipeline.run()
+    pipeline.print_summary()
+    if any(status in (FAILED, BLOCKED) for status, _ in records.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
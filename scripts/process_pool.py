@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+批量标注的进程池
+- 文章按块 (CHUNK_SIZE 篇) 分给工作进程, 每个工作进程启动时执行一次 initializer (编译词库),
+  之后每块只传文章、回传标注字段
+- 结果按输入顺序返回, 合并进文章后与串行处理完全一致, 分类列表和统计不受并行影响
+- PROCESS_WORKERS 控制进程数: 1 (默认) 为串行, 0 为 CPU 核数; 文章数少于 PARALLEL_MIN 时始终串行
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+PROCESS_WORKERS = int(os.environ.get("PROCESS_WORKERS", "1"))
+CHUNK_SIZE = 500
+# 少于该数量时进程启动和序列化的开销大于收益
+PARALLEL_MIN = 2000
+
+
+def worker_count(workers=None):
+    workers = PROCESS_WORKERS if workers is None else workers
+    return workers if workers > 0 else os.cpu_count() or 1
+
+def map_chunks(func, items, initializer=None, initargs=(), workers=None):
+    """func(块) -> 与块等长的结果列表; 返回与 items 同序的全部结果"""
+    items = list(items)
+    workers = min(worker_count(workers), -(-len(items) // CHUNK_SIZE))
+    if workers <= 1 or len(items) < PARALLEL_MIN:
+        if initializer:
+            initializer(*initargs)
+        return func(items) if items else []
+
+    chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+    with ProcessPoolExecutor(workers, initializer=initializer, initargs=initargs) as pool:
+        return [result for chunk in pool.map(func, chunks) for result in chunk]
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+处理结果的规范化格式
+- 每篇文章只在 "articles" 表中保存一份 (以文章 id 为键)
+- categorized_articles / top_articles / risk_articles 只保存 [id, 得分] 引用列表
+- 分析器读取时用 ArticleRefs 包装引用列表, 访问到哪篇才从表中取哪篇;
+  切片、len、迭代、下标的用法与原来的文章列表相同
+- 按行写出 (dump): 顶层每个键一行, categorized_articles 每个分类一行, 文章表在最后且每篇一行;
+  load 逐行读取, 只解析报告需要的分类和文章, 并只保留需要的字段, 取齐后即停止读取
+- 旧格式 (每个分类一份完整拷贝 / 整体缩进的 JSON) 整体读取
+"""
+
+import json
+from collections.abc import Sequence
+
+# 2: 文章表 + 引用; 3: 同上, 按行布局可流式读取
+FORMAT_VERSION = 3
+ARTICLE_LISTS = ("top_articles", "risk_articles")
+# 每项单独一行的字典
+LINE_KEYS = ("categorized_articles", "articles")
+
+_decoder = json.JSONDecoder()
+
+
+class ArticleTable:
+    """写入端: 收集被引用的文章, 生成引用列表"""
+
+    def __init__(self, score_key):
+        self.score_key = score_key
+        self.articles = {}
+        self._ids = {}
+
+    def ref(self, article):
+        article_id = self._ids.get(id(article))
+        if article_id is None:
+            article_id = base = str(article.get("id") or len(self.articles))
+            n = 1
+            while article_id in self.articles:
+                # 不同文章 id 相同时加后缀区分
+                n += 1
+                article_id = f"{base}-{n}"
+            self._ids[id(article)] = article_id
+            self.articles[article_id] = article.to_dict() if hasattr(article, "to_dict") else article
+        return [article_id, article.get(self.score_key, 0)]
+
+    def refs(self, articles):
+        return [self.ref(article) for article in articles]
+
+
+class ArticleRefs(Sequence):
+    """读取端: 引用列表的惰性视图"""
+
+    def __init__(self, table, refs):
+        self._table = table
+        self._refs = refs
+
+    def __len__(self):
+        return len(self._refs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ArticleRefs(self._table, self._refs[index])
+        return self._table[self._refs[index][0]]
+
+    def ids(self):
+        return [ref[0] for ref in self._refs]
+
+    def scores(self):
+        return [ref[1] for ref in self._refs]
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+def dump(data, f):
+    """按行写出处理结果 (仍是合法 JSON), 文章表放在最后"""
+    keys = [key for key in data if key != "articles"]
+    if "articles" in data:
+        keys.append("articles")
+    f.write("{\n")
+    for n, key in enumerate(keys):
+        value = data[key]
+        sep = "," if n < len(keys) - 1 else ""
+        if key in LINE_KEYS and isinstance(value, dict) and value:
+            f.write(f"  {_dumps(key)}: {{\n")
+            last = len(value) - 1
+            for i, (item_key, item) in enumerate(value.items()):
+                f.write(f"    {_dumps(item_key)}: {_dumps(item)}{',' if i < last else ''}\n")
+            f.write(f"  }}{sep}\n")
+        else:
+            f.write(f"  {_dumps(key)}: {_dumps(value)}{sep}\n")
+    f.write("}\n")
+
+
+def _split(line, indent):
+    """'  "key": value,' -> (key, value 文本)"""
+    key, end = _decoder.raw_decode(line, indent)
+    value = line[end + 1:].strip()
+    if value.endswith(","):
+        value = value[:-1]
+    return key, value
+
+def _project(article, fields):
+    if fields is None:
+        return article
+    return {k: article[k] for k in fields if k in article}
+
+def load(path, sections=None, fields=None):
+    """读取处理结果, 返回与 json.load + resolve 相同结构的字典
+
+    sections: 需要的文章列表及各自需要的文章数 (None 为全部), 如
+              {"top_articles": 10, "categorized_articles": {"AI": (10, ("title",)), "芯片": 8}};
+              (数量, 字段) 表示前若干篇取 fields, 其余只取给出的字段 (如只需全部标题);
+              未列出的列表和分类不加载, 超出数量的引用不加载文章 (len 仍为全长)
+    fields:   文章保留的字段, None 为全部
+    sections 为 None 时整份读取
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        f.readline()
+        head = f.readline()
+        if sections is None or not head.startswith(f'  "format": {FORMAT_VERSION},'):
+            f.seek(0)
+            data = json.load(f)
+            return resolve(data)
+
+        data = {"format": FORMAT_VERSION}
+        wanted_cats = sections.get("categorized_articles", {})
+        needed = {}  # 文章 id -> 需要的字段
+
+        def want(refs, spec):
+            limit, rest = spec if isinstance(spec, tuple) else (spec, None)
+            for ref in refs[:limit]:
+                needed[ref[0]] = fields
+            if rest and limit is not None:
+                for ref in refs[limit:]:
+                    needed.setdefault(ref[0], rest)
+            return refs
+
+        for line in f:
+            if line.startswith("}"):
+                break
+            key, value = _split(line, 2)
+            if value != "{":
+                if key in ARTICLE_LISTS:
+                    if key in sections:
+                        data[key] = want(json.loads(value), sections[key])
+                elif key == "categorized_articles":
+                    data[key] = {cat: want(refs, wanted_cats[cat])
+                                 for cat, refs in json.loads(value).items() if cat in wanted_cats}
+                else:
+                    data[key] = json.loads(value)
+                continue
+
+            block = {}
+            data[key] = block
+            if key == "articles" and not needed:
+                break
+            for line in f:
+                if line.startswith("  }"):
+                    break
+                item_key, item = _split(line, 4)
+                if key == "categorized_articles":
+                    if item_key in wanted_cats:
+                        block[item_key] = want(json.loads(item), wanted_cats[item_key])
+                elif key == "articles":
+                    if item_key in needed:
+                        block[item_key] = _project(json.loads(item), needed[item_key])
+                        if len(block) == len(needed):
+                            break  # 需要的文章已取齐, 其余不再读取
+                else:
+                    block[item_key] = json.loads(item)
+            if key == "articles":
+                break
+    return resolve(data)
+
+
+def resolve(data):
+    """把加载的处理结果中的引用列表包装为惰性视图 (就地修改并返回)"""
+    if not data or data.get("format", 0) < 2:
+        return data
+    table = data.get("articles", {})
+    data["categorized_articles"] = {
+        cat: ArticleRefs(table, refs) for cat, refs in data.get("categorized_articles", {}).items()}
+    for key in ARTICLE_LISTS:
+        if key in data:
+            data[key] = ArticleRefs(table, data[key])
+    return data
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+原始数据 JSONL 存储
+- 每行一个 JSON 对象, 不带缩进; 爬虫每完成一个数据源就追加一批, 中途崩溃也保留已完成部分
+- 可选 gzip 压缩 (RAW_COMPRESS=1): 每批写成一个独立的 gzip 成员, 同样可以随时追加/截断
+- 元信息行以 "_meta" 为键 (文件头: 抓取时间、版本、数据源; 文件尾: 统计), 其余每行一篇文章
+- 读取端是生成器, 逐篇产出文章, 内存占用与文件大小无关
+- 兼容旧的整文件 JSON 格式 (news_*.json / finance_*.json)
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+RAW_COMPRESS = os.environ.get("RAW_COMPRESS", "0") == "1"
+META_KEY = "_meta"
+
+
+def raw_path(data_dir, prefix, timestamp, compress=None):
+    """新原始文件路径, 如 news_20260315_080000.jsonl(.gz)"""
+    compress = RAW_COMPRESS if compress is None else compress
+    suffix = ".jsonl.gz" if compress else ".jsonl"
+    return Path(data_dir) / f"{prefix}_{timestamp}{suffix}"
+
+def raw_patterns(prefix):
+    """某类原始文件 (新旧格式) 的通配符"""
+    return (f"{prefix}_*.json", f"{prefix}_*.jsonl", f"{prefix}_*.jsonl.gz")
+
+
+class RawWriter:
+    """按批追加写入原始数据"""
+
+    def __init__(self, path, meta=None):
+        self.path = Path(path)
+        self.compress = self.path.name.endswith(".gz")
+        self.count = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        if meta:
+            self._append([{META_KEY: meta}])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _append(self, records):
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data)
+        self._file.write(data)
+        self._file.flush()
+
+    def write(self, articles):
+        """追加一批文章 (一个数据源的结果)"""
+        if articles:
+            self._append(articles)
+            self.count += len(articles)
+
+    def close(self, summary=None):
+        if self._file.closed:
+            return
+        if summary:
+            self._append([{META_KEY: summary}])
+        self._file.close()
+
+
+def _iter_lines(path):
+    opener = gzip.open if path.name.endswith(".gz") else open
+    try:
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue  # 写入中断导致的不完整行
+    except EOFError:
+        return  # 不完整的 gzip 尾部
+
+def iter_records(path):
+    """逐条产出 (是否元信息, 内容)"""
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        articles = data.pop("articles", [])
+        yield True, data
+        for article in articles:
+            yield False, article
+        return
+
+    for record in _iter_lines(path):
+        if META_KEY in record:
+            yield True, record[META_KEY]
+        else:
+            yield False, record
+
+def iter_articles(path):
+    """逐篇产出原始文件中的文章"""
+    for is_meta, record in iter_records(path):
+        if not is_meta:
+            yield record
+
+def read_meta(path):
+    """合并文件中的全部元信息 (头 + 尾)"""
+    meta = {}
+    for is_meta, record in iter_records(path):
+        if is_meta:
+            meta.update(record)
+    return meta
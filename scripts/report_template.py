@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+报告模板渲染
+- 模板是 {片段名: (markdown, html)} 的字典, 载入时预编译为 format_map, 渲染时不再解析
+- Report 包含多个文档 (如 summary / detailed), 每个文档的每种输出格式各有一个列表缓冲区,
+  片段只追加到缓冲区, 最后每个文档每种格式 join 一次
+- 分析器一次遍历数据: 每篇文章的字段只计算一次, 同时写入所有文档和所有格式;
+  增加一种输出格式只是多一列模板, 不需要再遍历数据
+- html 片段中的字符串值会先转义
+"""
+
+import html
+import os
+
+# 报告同时输出 html (REPORT_HTML=1)
+REPORT_HTML = os.environ.get("REPORT_HTML", "0") == "1"
+
+HTML_PAGE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+{body}</body>
+</html>
+"""
+
+
+def compile_templates(templates):
+    """{名称: (md, html)} -> {名称: {格式: format_map}}"""
+    return {name: {"md": md.format_map, "html": page.format_map}
+            for name, (md, page) in templates.items()}
+
+def output_formats():
+    return ("md", "html") if REPORT_HTML else ("md",)
+
+
+def _escape(values):
+    return {k: html.escape(v) if isinstance(v, str) else v for k, v in values.items()}
+
+
+class Document:
+    """一个文档 (如日报摘要) 的各格式缓冲区"""
+
+    def __init__(self, templates, formats):
+        self.templates = templates
+        self.buffers = {fmt: [] for fmt in formats}
+
+    def emit(self, name, **values):
+        """按片段模板追加一段"""
+        template = self.templates[name]
+        for fmt, buffer in self.buffers.items():
+            buffer.append(template[fmt](_escape(values) if fmt == "html" else values))
+
+    def render(self, fmt="md", title=""):
+        body = "".join(self.buffers[fmt])
+        if fmt == "html":
+            return HTML_PAGE.format(title=html.escape(title), body=body)
+        return body
+
+
+class Report:
+    """一次渲染产出的多个文档"""
+
+    def __init__(self, templates, names, formats=None):
+        formats = formats or output_formats()
+        self.formats = formats
+        self.documents = {name: Document(templates, formats) for name in names}
+
+    def __getitem__(self, name):
+        return self.documents[name]
@@ -8,31 +8,16 @@ echo "  资讯爬取与分析系统"
 echo "  $(date '+%Y-%m-%d %H:%M:%S')"
 echo "=========================================="
 
-# 1. 科技资讯
-echo ""
-echo "📡 [1/6] 爬取科技资讯..."
-python3 scripts/tech_crawler.py
-
-echo ""
-echo "📊 [2/6] 处理科技资讯数据..."
-python3 scripts/tech_processor.py
-
-echo ""
-echo "📝 [3/6] 生成科技资讯报告..."
-python3 scripts/tech_analyzer.py
-
-# 2. 财经资讯
-echo ""
-echo "💰 [4/6] 爬取财经资讯..."
-python3 scripts/finance_crawler.py
-
-echo ""
-echo "📊 [5/6] 处理财经资讯数据..."
-python3 scripts/finance_processor.py
-
-echo ""
-echo "📝 [6/6] 生成财经分析报告..."
-python3 scripts/finance_analyzer.py
+# 科技与财经两条链 (爬取 → 处理 → 报告) 在同一进程内并发执行, 输入未变化的阶段自动跳过
+# 参数原样传给流水线, 如: bash scripts/run_all.sh crawl=0 force=1
+python3 scripts/pipeline.py "$@"
+status=$?
+
+if [ $status -ne 0 ]; then
+    echo ""
+    echo "⚠️ 部分阶段失败, 详见上方输出 (状态记录: data/pipeline_state.json)"
+    exit $status
+fi
 
 echo ""
 echo "=========================================="
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+近似重复报道聚类 (MinHash + LSH)
+同一条新闻常以不同链接出现在多个站点/镜像 (IT之家、驱动之家、快科技、国际源转载等),
+按标题把它们聚成"报道", 统计与排序以报道为单位, 而不是原始链接
+
+- 分词: 中文按单字, 英文/数字按单词; 相邻两个词元组成一个 shingle
+  (中文即字符 2-gram, 英文即单词 2-gram)
+- 单次置换 MinHash 签名 64 维 (每个 shingle 只哈希一次),
+  分 16 个 band x 4 行做 LSH 分桶, 只比较同桶候选, 不做两两比较
+- 候选对用真实 Jaccard 相似度复核, 通过后并查集合并; 与桶内全部成员比较 (每桶最多 BUCKET_LIMIT 个)
+- 短标题只差一个主体 ("英伟达发布新一代芯片" / "AMD发布新一代芯片") 时相似度也不低,
+  shingle 少于 SHORT_SHINGLES 的标题要求 SHORT_THRESHOLD; 两个标题都含数字但数字不同 (iOS 18 / iOS 19) 时不合并
+哈希使用 blake2b, 与进程的随机种子无关, 多次运行结果一致
+"""
+
+import re
+from hashlib import blake2b
+
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_HASHES = NUM_BANDS * ROWS_PER_BAND
+SIMILARITY_THRESHOLD = 0.5
+SHORT_SHINGLES = 12
+SHORT_THRESHOLD = 0.65
+# 每个 LSH 桶参与比较的成员上限, 大桶也保持线性
+BUCKET_LIMIT = 20
+
+_BIN_BITS = 6
+_BIN_MASK = NUM_HASHES - 1
+
+TOKEN_PATTERN = re.compile(r"[㐀-鿿豈-﫿]|[a-z0-9]+(?:['.][a-z0-9]+)*")
+
+# 标题中常见的来源/栏目前后缀, 不参与比较
+NOISE_PATTERN = re.compile(r"[【\[(（][^】\])）]{0,12}[】\])）]|\s[-|_–—]\s.{0,20}$")
+
+_hash_cache = {}
+
+
+def _shingle_hash(shingle):
+    value = _hash_cache.get(shingle)
+    if value is None:
+        value = int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        if len(_hash_cache) < 500000:
+            _hash_cache[shingle] = value
+    return value
+
+def shingles(title):
+    """标题 -> shingle 集合"""
+    text = NOISE_PATTERN.sub(" ", title or "").lower()
+    tokens = TOKEN_PATTERN.findall(text)
+    if len(tokens) < 2:
+        return set(tokens)
+    return {tokens[i] + " " + tokens[i + 1] for i in range(len(tokens) - 1)}
+
+def signature(shingle_set):
+    """MinHash 签名 (空集合返回 None)
+
+    单次置换 MinHash: 每个 shingle 只哈希一次, 按哈希低位分到 NUM_HASHES 个桶中各取最小值;
+    空桶向右 (循环) 借用最近的非空桶, 并记入借用距离, 保证不同标题之间的签名仍可比较
+    """
+    if not shingle_set:
+        return None
+
+    bins = [None] * NUM_HASHES
+    for shingle in shingle_set:
+        h = _shingle_hash(shingle)
+        b = h & _BIN_MASK
+        v = h >> _BIN_BITS
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+
+    if None in bins:
+        # 借用值的高位记录借用距离, 与原值区分
+        filled = [b for b in range(NUM_HASHES) if bins[b] is not None]
+        n = len(filled)
+        k = 0
+        for b in range(NUM_HASHES):
+            while k < n and filled[k] < b:
+                k += 1
+            if bins[b] is None:
+                src = filled[k] if k < n else filled[0]
+                bins[b] = bins[src] | (((src - b) % NUM_HASHES) << (64 - _BIN_BITS))
+
+    return tuple(bins)
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def numbers(title):
+    """标题中的数字词元 (版本号、型号、金额等)"""
+    text = NOISE_PATTERN.sub(" ", title or "").lower()
+    return {token for token in TOKEN_PATTERN.findall(text) if any(ch.isdigit() for ch in token)}
+
+def similar(a, b, numbers_a, numbers_b, threshold=SIMILARITY_THRESHOLD):
+    """两个标题是否为同一报道: 数字须一致 (一方没有数字时不要求), 短标题的相似度门槛更高"""
+    if numbers_a and numbers_b and numbers_a != numbers_b:
+        return False
+    if min(len(a), len(b)) < SHORT_SHINGLES:
+        threshold = max(threshold, SHORT_THRESHOLD)
+    return jaccard(a, b) >= threshold
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # 以较早出现的为根, 聚类编号稳定
+            if rb < ra:
+                ra, rb = rb, ra
+            self.parent[rb] = ra
+
+
+def cluster_titles(titles, threshold=SIMILARITY_THRESHOLD):
+    """对标题聚类, 返回每个标题所属聚类的编号 (即该聚类中最早出现的标题下标)"""
+    sets = [shingles(title) for title in titles]
+    nums = [numbers(title) for title in titles]
+    uf = _UnionFind(len(titles))
+
+    buckets = {}
+    exact = {}
+    for i, shingle_set in enumerate(sets):
+        if not shingle_set:
+            continue
+        # 完全相同的 shingle 集合 (如同一标题的多个链接) 直接合并, 不再计算签名
+        frozen = frozenset(shingle_set)
+        first = exact.setdefault(frozen, i)
+        if first != i:
+            uf.union(i, first)
+            continue
+
+        sig = signature(shingle_set)
+        for band in range(NUM_BANDS):
+            start = band * ROWS_PER_BAND
+            key = (band,) + sig[start:start + ROWS_PER_BAND]
+            members = buckets.get(key)
+            if members is None:
+                buckets[key] = [i]
+                continue
+            for j in members:
+                if uf.find(i) != uf.find(j) and similar(shingle_set, sets[j], nums[i], nums[j], threshold):
+                    uf.union(i, j)
+            if len(members) < BUCKET_LIMIT:
+                members.append(i)
+
+    return [uf.find(i) for i in range(len(titles))]
+
+
+def group_stories(articles, score_key, threshold=SIMILARITY_THRESHOLD):
+    """把近似重复的文章合并为报道
+
+    每个报道取 score_key 得分最高的文章作为代表 (同分取最早的), 并在代表上写入:
+      duplicate_count: 该报道包含的文章数
+      related_sources: 其他转载来源
+    返回代表文章列表, 顺序与各报道首次出现的顺序一致
+    """
+    labels = cluster_titles([a.get("title", "") for a in articles], threshold)
+
+    clusters = {}
+    for article, label in zip(articles, labels):
+        clusters.setdefault(label, []).append(article)
+
+    stories = []
+    for members in clusters.values():
+        best = max(members, key=lambda a: a.get(score_key, 0))
+        sources = []
+        for article in members:
+            source = article.get("source", "")
+            if article is not best and source and source != best.get("source") and source not in sources:
+                sources.append(source)
+        best["duplicate_count"] = len(members)
+        best["related_sources"] = sources
+        stories.append(best)
+    return stories
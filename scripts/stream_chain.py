@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+流式模式: 一条链 (科技/财经) 的抓取、标注、报告重叠执行
+- 爬虫按数据源配置顺序去重、写入原始文件, 每个源的新文章随即放入有界队列 (最多 QUEUE_BATCHES 批);
+  处理跟不上时爬虫在放入处等待, 内存占用有上限; 去重与写入顺序和批处理模式相同, 处理结果一致
+- 科技爬虫并发抓取: 排在慢源之后、已先完成的源不等去重, 立即以副本放入队列 (预览),
+  只计入临时报告; 预览在爬虫线程池中放入, 队列已满时直接丢弃, 不阻塞抓取
+- 处理线程出错退出后不再等待队列: 爬虫放入时按 PUT_TIMEOUT 轮询, 发现运行已结束即丢弃, 线程都能退出
+- 处理线程逐批标注 (分类/评分/实体) 并写入全文检索索引, 文章始终是内存中的字典, 不经过 JSON 写出和重新解析
+- 抓取进行中每隔 REPORT_INTERVAL 秒 (第一批到达后立即一次) 用已有文章生成临时摘要 summary_<日期>.partial.md,
+  顶部注明进度: 慢的数据源还在下载时已能看到第一版报告; 运行结束 (无论成功与否) 时删除,
+  正式摘要只在成功时由分析器写出, 抓取失败不会覆盖当天已有的摘要
+- 抓取结束后各写一次: 增量状态、检索索引、日汇总、处理结果 (直接使用内存中已标注的文章,
+  不重新读取原始文件) 与最终报告; 原始文件仍由爬虫逐源追加, 作为留档
+- 由 pipeline.py stream=1 调用; 报告日期为抓取当天
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+import article_index
+import article_record
+import article_search
+import finance_analyzer
+import finance_crawler
+import finance_processor
+import output_store
+import processed_format
+import tech_analyzer
+import tech_crawler
+import tech_processor
+
+CRAWLERS = {"tech": tech_crawler, "finance": finance_crawler}
+PROCESSORS = {"tech": tech_processor, "finance": finance_processor}
+ANALYZERS = {"tech": tech_analyzer, "finance": finance_analyzer}
+
+# 队列中最多积压的数据源批次
+QUEUE_BATCHES = 8
+# 爬虫放入队列时检查运行是否已结束的间隔 (秒)
+PUT_TIMEOUT = 1.0
+# 临时摘要的最短间隔 (秒)
+REPORT_INTERVAL = float(os.environ.get("STREAM_REPORT_INTERVAL", "10"))
+
+
+class StreamChain:
+    """一次流式运行: 抓取线程产出批次, 当前线程标注并生成临时报告"""
+
+    def __init__(self, scope, workers=None):
+        self.scope = scope
+        self.date = datetime.now().strftime("%Y-%m-%d")
+        self.workers = workers
+        self.crawler = CRAWLERS[scope]
+        self.processor = PROCESSORS[scope]
+        self.analyzer = ANALYZERS[scope]
+        self.sources = len(self.crawler.CN_SOURCES) + len(self.crawler.INTL_SOURCES)
+        self.queue = queue.Queue(QUEUE_BATCHES)
+        self.categories = self.processor.load_categories() if scope == "tech" else None
+
+        self.articles = []  # 本次抓取的新文章 (已标注的字典), 结束时直接交给增量摄取
+        self.done = 0       # 已处理的数据源数 (按配置顺序)
+        self.raw_file = None
+        self.error = None
+        self.closed = False  # 运行结束 (包括出错), 爬虫不再放入队列
+        self.partial = self.analyzer.OUTPUT_DIR / self.date[:7] / f"summary_{self.date}.partial.md"
+
+        # 当天已处理的文章, 临时报告在此基础上加入新文章
+        self.records = [article_record.ArticleRecord.from_dict(a)
+                        for a in self.processor.open_state().iter_day(self.date)]
+        self.keys = {article_index.article_key(record) for record in self.records}
+
+    def _put(self, item):
+        """放入队列; 队列满时等待, 运行已结束则丢弃"""
+        while not self.closed:
+            try:
+                self.queue.put(item, timeout=PUT_TIMEOUT)
+                return
+            except queue.Full:
+                continue
+
+    def _preview(self, articles):
+        try:
+            self.queue.put_nowait((False, articles))
+        except queue.Full:
+            pass
+
+    def _crawl(self):
+        sink = lambda articles: self._put((True, articles))
+        try:
+            if self.scope == "tech":
+                self.raw_file = self.crawler.main(sink, self._preview)
+            else:
+                self.raw_file = self.crawler.main(sink)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(None)
+
+    def _annotate(self, articles):
+        if self.scope == "tech":
+            self.processor.annotate_articles(articles, self.categories, self.workers)
+        else:
+            self.processor.annotate_articles(articles, self.workers)
+
+    def _remember(self, articles):
+        for article in articles:
+            key = article_index.article_key(article)
+            if key not in self.keys:
+                self.keys.add(key)
+                self.records.append(article_record.ArticleRecord.from_dict(article))
+
+    def add(self, articles, search):
+        """标注一个数据源去重后的新文章并写入检索索引"""
+        self._annotate(articles)
+        self.articles.extend(articles)
+        for article in articles:
+            search.add(self.scope, article)
+        self._remember(articles)
+        self.done += 1
+
+    def preview(self, articles):
+        """先完成的数据源 (未去重的副本): 标注后只计入临时报告"""
+        self._annotate(articles)
+        self._remember(articles)
+
+    def provisional_report(self):
+        """用目前已有的文章生成临时摘要 (不含提及异动), 返回文件路径"""
+        data = processed_format.resolve(self.processor.build_processed(self.date, self.records, []))
+        summary = self.analyzer.render_reports(data, ("md",))["summary"].render()
+        notice = f"> ⏳ 临时版本: 已完成 {self.done}/{self.sources} 个数据源, 抓取结束后自动更新\n\n"
+        output_store.atomic_write(self.partial, notice + summary)
+        return self.partial
+
+    def run(self, lock=None):
+        """抓取并边抓边处理, 结束后写出处理结果和报告, 返回报告数据
+
+        lock: 写出阶段持有的锁 (与另一条链的写出错开)
+        """
+        try:
+            return self._run(lock)
+        finally:
+            self.closed = True
+            self.partial.unlink(missing_ok=True)
+
+    def _run(self, lock):
+        fetcher = threading.Thread(target=self._crawl, name=f"{self.scope}_crawl", daemon=True)
+        fetcher.start()
+
+        reported = None
+        with article_search.SearchIndex() as search:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                committed, articles = item
+                if committed:
+                    self.add(articles, search)
+                else:
+                    self.preview(articles)
+                now = time.monotonic()
+                if self.records and self.done < self.sources and (reported is None or now - reported >= REPORT_INTERVAL):
+                    path = self.provisional_report()
+                    reported = now
+                    print(f"📝 [{self.scope}] 临时摘要 ({self.done}/{self.sources} 个数据源, {len(self.records)} 条): {path}")
+        fetcher.join()
+        if self.error:
+            raise self.error
+
+        with lock or nullcontext():
+            # 刚写完的原始文件内容就是 self.articles, 摄取时不再读取, 也不再重复标注和索引
+            data = self.processor.process_data(self.date, self.workers, {self.raw_file.name: self.articles})
+            return self.analyzer.main(self.date, data)
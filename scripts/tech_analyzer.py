@@ -12,23 +12,34 @@ from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
 
+import output_store
+import processed_format
+import report_template
+
 PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
 PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
 OUTPUT_DIR = PROJECT_ROOT / "output"
 
-def load_processed_data():
-    """加载处理后的数据"""
-    today = datetime.now().strftime("%Y-%m-%d")
+# 报告用到的文章列表 (AI 趋势洞察需要该分类全部标题) 与字段
+REPORT_SECTIONS = {
+    "top_articles": None,
+    "categorized_articles": {"AI": (10, ("title",)), "芯片": 8, "互联网": 8, "创业投资": 8, "开源": 5},
+}
+REPORT_FIELDS = ("title", "url", "source", "pub_date", "importance_score", "auto_categories")
+
+def load_processed_data(date=None):
+    """加载处理后的数据 (默认当天, 没有时取最近一天; 指定日期时只取该日)"""
+    today = date or datetime.now().strftime("%Y-%m-%d")
     file_path = PROCESSED_DIR / f"processed_{today}.json"
     
-    if not file_path.exists():
+    if not file_path.exists() and not date:
         files = sorted(PROCESSED_DIR.glob("processed_*.json"), reverse=True)
         if files:
             file_path = files[0]
     
     if file_path.exists():
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # 逐行读取, 只加载报告用到的分类、文章和字段
+        return processed_format.load(file_path, REPORT_SECTIONS, REPORT_FIELDS)
     
     return None
 
@@ -55,285 +66,275 @@ def format_pub_date(pub_date):
     
     return pub_date
 
-def generate_summary(data):
-    """生成500字摘要 - 带来源链接和发布时间"""
-    date = data.get("date", datetime.now().strftime("%Y-%m-%d"))
-    total = data.get("total_articles", 0)
-    categories = data.get("categories", {})
-    top_articles = data.get("top_articles", [])[:10]
-    
-    summary = f"""# 科技资讯日报 - {date}
-
-## 📊 今日概览
-- **总资讯数**: {total} 条
-- **主要分类**: {', '.join([f"{k}({v}条)" for k, v in list(categories.items())[:5]])}
-
-## 🔥 热点聚焦
-"""
-    
-    for i, article in enumerate(top_articles[:5], 1):
-        title = article.get("title", "")[:60]
-        source = article.get("source", "")
-        url = article.get("url", "")
-        pub_date = article.get("pub_date", "")
-        pub_time = format_pub_date(pub_date)
-        
-        summary += f"{i}. **[{title}]({url})**\n"
-        summary += f"   - 📰 {source} | ⏰ {pub_time}\n\n"
-    
-    summary += "## 💡 今日要点\n"
-    
-    categorized = data.get("categorized_articles", {})
-    
-    # AI 相关
-    ai_articles = categorized.get("AI", [])[:5]
-    if ai_articles:
-        summary += "\n### 🤖 AI/大模型\n\n"
-        for a in ai_articles:
-            title = a.get("title", "")[:55]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            pub_date = a.get("pub_date", "")
-            pub_time = format_pub_date(pub_date)
-            summary += f"- [{title}]({url})\n  *{source} · {pub_time}*\n\n"
-    
-    # 芯片相关
-    chip_articles = categorized.get("芯片", [])[:5]
-    if chip_articles:
-        summary += "\n### 💻 芯片/算力\n\n"
-        for a in chip_articles:
-            title = a.get("title", "")[:55]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            pub_date = a.get("pub_date", "")
-            pub_time = format_pub_date(pub_date)
-            summary += f"- [{title}]({url})\n  *{source} · {pub_time}*\n\n"
-    
-    # 互联网相关
-    internet_articles = categorized.get("互联网", [])[:5]
-    if internet_articles:
-        summary += "\n### 🌐 互联网\n\n"
-        for a in internet_articles:
-            title = a.get("title", "")[:55]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            pub_date = a.get("pub_date", "")
-            pub_time = format_pub_date(pub_date)
-            summary += f"- [{title}]({url})\n  *{source} · {pub_time}*\n\n"
-    
-    summary += f"""
-
----
-*报告生成时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}*
-"""
-    
-    return summary
+# 报告片段模板: {名称: (markdown, html)}
+TEMPLATES = report_template.compile_templates({
+    "summary_head": (
+        "# 科技资讯日报 - {date}\n\n"
+        "## 📊 今日概览\n"
+        "- **总资讯数**: {total} 条\n"
+        "- **主要分类**: {main_categories}\n\n"
+        "## 🔥 热点聚焦\n",
+        "<h1>科技资讯日报 - {date}</h1>\n"
+        "<h2>📊 今日概览</h2>\n"
+        "<ul>\n<li><strong>总资讯数</strong>: {total} 条</li>\n"
+        "<li><strong>主要分类</strong>: {main_categories}</li>\n</ul>\n"
+        "<h2>🔥 热点聚焦</h2>\n<ol>\n"),
+    "summary_hot": (
+        "{i}. **[{title}]({url})**\n"
+        "   - 📰 {source} | ⏰ {pub_time}\n\n",
+        '<li><strong><a href="{url}">{title}</a></strong><br>📰 {source} | ⏰ {pub_time}</li>\n'),
+    "summary_points": (
+        "## 💡 今日要点\n",
+        "</ol>\n<h2>💡 今日要点</h2>\n"),
+    "summary_section": (
+        "\n### {heading}\n\n",
+        "<h3>{heading}</h3>\n<ul>\n"),
+    "summary_item": (
+        "- [{title}]({url})\n  *{source} · {pub_time}*\n\n",
+        '<li><a href="{url}">{title}</a><br><em>{source} · {pub_time}</em></li>\n'),
+    "summary_section_end": (
+        "",
+        "</ul>\n"),
+    "summary_foot": (
+        "\n\n---\n*报告生成时间: {now}*\n",
+        "<hr>\n<p><em>报告生成时间: {now}</em></p>\n"),
+
+    "detailed_head": (
+        "# 科技资讯深度分析报告\n## {date}\n\n---\n\n"
+        "## 一、今日数据概览\n\n"
+        "本日共收集科技资讯 **{total}** 条，来源涵盖国内外主流科技媒体。\n\n"
+        "### 分类分布\n",
+        "<h1>科技资讯深度分析报告</h1>\n<h2>{date}</h2>\n<hr>\n"
+        "<h2>一、今日数据概览</h2>\n"
+        "<p>本日共收集科技资讯 <strong>{total}</strong> 条，来源涵盖国内外主流科技媒体。</p>\n"
+        "<h3>分类分布</h3>\n<ul>\n"),
+    "category_share": (
+        "- **{cat}**: {count} 条 ({percentage:.1f}%)\n",
+        "<li><strong>{cat}</strong>: {count} 条 ({percentage:.1f}%)</li>\n"),
+    "top_head": (
+        "\n\n---\n\n## 二、重点新闻深度解读\n\n",
+        "</ul>\n<hr>\n<h2>二、重点新闻深度解读</h2>\n"),
+    "top_item": (
+        "### {i}. {title}\n\n"
+        "| 属性 | 内容 |\n"
+        "|------|------|\n"
+        "| 📰 **来源** | {source} |\n"
+        "| ⏰ **时间** | {pub_time} |\n"
+        "| 🏷️ **分类** | {cats} |\n"
+        "| ⭐ **重要性** | {stars} |\n"
+        "| 🔗 **链接** | [点击查看原文]({url}) |\n\n",
+        "<h3>{i}. {title}</h3>\n<table>\n"
+        "<tr><th>属性</th><th>内容</th></tr>\n"
+        "<tr><td>📰 <strong>来源</strong></td><td>{source}</td></tr>\n"
+        "<tr><td>⏰ <strong>时间</strong></td><td>{pub_time}</td></tr>\n"
+        "<tr><td>🏷️ <strong>分类</strong></td><td>{cats}</td></tr>\n"
+        "<tr><td>⭐ <strong>重要性</strong></td><td>{stars}</td></tr>\n"
+        '<tr><td>🔗 <strong>链接</strong></td><td><a href="{url}">点击查看原文</a></td></tr>\n'
+        "</table>\n"),
+    "top_note": (
+        "> {icon} **{label}** - {text}\n\n",
+        "<blockquote>{icon} <strong>{label}</strong> - {text}</blockquote>\n"),
+    "rule": (
+        "---\n\n",
+        "<hr>\n"),
+    "trend_head": (
+        "## 三、行业趋势分析\n\n",
+        "<h2>三、行业趋势分析</h2>\n"),
+    "ai_section": (
+        "### {heading} ({count}条)\n\n本日AI相关资讯共{count}条，主要涉及：\n\n",
+        "<h3>{heading} ({count}条)</h3>\n<p>本日AI相关资讯共{count}条，主要涉及：</p>\n<ul>\n"),
+    "trend_section": (
+        "### {heading} ({count}条)\n\n",
+        "<h3>{heading} ({count}条)</h3>\n<ul>\n"),
+    "trend_item": (
+        "- [{title}]({url}) *{source} · {pub_time}*\n",
+        '<li><a href="{url}">{title}</a> <em>{source} · {pub_time}</em></li>\n'),
+    "trend_insight": (
+        "\n**趋势洞察**: {insight}\n\n",
+        "</ul>\n<p><strong>趋势洞察</strong>: {insight}</p>\n"),
+    "trend_section_end": (
+        "\n",
+        "</ul>\n"),
+    "spike_section": (
+        "### 📈 提及异动\n\n今日提及量明显高于近两周基线的公司/产品：\n\n",
+        "<h3>📈 提及异动</h3>\n<p>今日提及量明显高于近两周基线的公司/产品：</p>\n<ul>\n"),
+    "spike_item": (
+        "- **{entity}**: 今日 {count} 次，近两周日均 {baseline:.1f} 次 ({ratio:.1f}×)\n",
+        "<li><strong>{entity}</strong>: 今日 {count} 次，近两周日均 {baseline:.1f} 次 ({ratio:.1f}×)</li>\n"),
+    "detailed_tail": (
+        "---\n\n"
+        "## 四、明日关注点\n\n"
+        "基于今日数据分析，建议关注以下方向：\n\n"
+        "1. **大模型竞争格局** - 关注OpenAI、Google、Anthropic等头部玩家动态\n"
+        "2. **国产算力突破** - 芯片自主可控进程值得持续跟踪\n"
+        "3. **应用落地进展** - AI应用商业化进入关键期\n"
+        "4. **资本流向变化** - 投资热点可能预示下一波风口\n\n"
+        "---\n\n"
+        "## 五、数据来源\n\n"
+        "本报告数据来源于国内外主流科技媒体：\n\n",
+        "<hr>\n<h2>四、明日关注点</h2>\n"
+        "<p>基于今日数据分析，建议关注以下方向：</p>\n<ol>\n"
+        "<li><strong>大模型竞争格局</strong> - 关注OpenAI、Google、Anthropic等头部玩家动态</li>\n"
+        "<li><strong>国产算力突破</strong> - 芯片自主可控进程值得持续跟踪</li>\n"
+        "<li><strong>应用落地进展</strong> - AI应用商业化进入关键期</li>\n"
+        "<li><strong>资本流向变化</strong> - 投资热点可能预示下一波风口</li>\n</ol>\n"
+        "<hr>\n<h2>五、数据来源</h2>\n"
+        "<p>本报告数据来源于国内外主流科技媒体：</p>\n<ul>\n"),
+    "source_item": (
+        "- {source}\n",
+        "<li>{source}</li>\n"),
+    "detailed_foot": (
+        "\n\n---\n\n*报告生成时间: {now}*  \n*由 Tech News Aggregator v2 自动生成*\n",
+        "</ul>\n<hr>\n<p><em>报告生成时间: {now}</em><br>\n<em>由 Tech News Aggregator v2 自动生成</em></p>\n"),
+})
+
+# 分类板块: (分类, 摘要标题, 摘要篇数, 详细报告标题, 详细报告篇数)
+TREND_SECTIONS = (
+    ("AI", "🤖 AI/大模型", 5, "🤖 AI/大模型板块", 10),
+    ("芯片", "💻 芯片/算力", 5, "💻 芯片/算力板块", 8),
+    ("互联网", "🌐 互联网", 5, "🌐 互联网/巨头板块", 8),
+    ("创业投资", None, 0, "💵 投资/融资板块", 8),
+    ("开源", None, 0, "🔓 开源板块", 5),
+)
+
+# 重点新闻的简要分析: (标题关键词, 图标, 标签, 说明)
+TOP_NOTES = (
+    (("发布", "推出"), "📢", "产品发布动态", "值得关注的新产品/新功能发布"),
+    (("融资", "投资"), "💰", "资本动态", "行业资本流向值得关注"),
+    (("突破", "首次"), "🚀", "技术突破", "行业里程碑事件"),
+    (("开源",), "🔓", "开源动态", "开源社区重要进展"),
+)
+
+# AI 趋势洞察: (标题关键词, 结论)
+AI_INSIGHTS = (
+    (("开源",), "开源模型持续活跃，社区生态繁荣发展"),
+    (("Agent", "智能体"), "AI Agent成为新的竞争焦点，各大厂商加速布局"),
+    (("多模态",), "多模态技术快速演进，应用场景不断拓展"),
+    (("推理",), "推理能力成为模型竞争新战场"),
+)
+
+def _row(article):
+    """一篇文章在报告中用到的字段, 每篇只计算一次"""
+    return (article.get("title", ""), article.get("url", ""), article.get("source", ""),
+            format_pub_date(article.get("pub_date", "")))
+
+def render_reports(data, formats=None):
+    """一次遍历数据, 同时生成摘要和详细报告 (各输出格式)"""
+    report = report_template.Report(TEMPLATES, ("summary", "detailed"), formats)
+    summary, detailed = report["summary"], report["detailed"]
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-def generate_detailed_report(data):
-    """生成详细报告 - 带来源链接和发布时间"""
     date = data.get("date", datetime.now().strftime("%Y-%m-%d"))
     total = data.get("total_articles", 0)
     categories = data.get("categories", {})
     top_articles = data.get("top_articles", [])
     categorized = data.get("categorized_articles", {})
-    
-    report = f"""# 科技资讯深度分析报告
-## {date}
+    entity_spikes = data.get("entity_spikes", [])
 
----
-
-## 一、今日数据概览
-
-本日共收集科技资讯 **{total}** 条，来源涵盖国内外主流科技媒体。
-
-### 分类分布
-"""
-    
+    # 概览
+    summary.emit("summary_head", date=date, total=total,
+                 main_categories=", ".join([f"{k}({v}条)" for k, v in list(categories.items())[:5]]))
+    detailed.emit("detailed_head", date=date, total=total)
     for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
         percentage = (count / total * 100) if total > 0 else 0
-        report += f"- **{cat}**: {count} 条 ({percentage:.1f}%)\n"
-    
-    report += """
-
----
-
-## 二、重点新闻深度解读
+        detailed.emit("category_share", cat=cat, count=count, percentage=percentage)
+
+    # 热点 / 重点新闻 (摘要前 5 条, 详细报告前 12 条, 数据来源取全部)
+    detailed.emit("top_head")
+    sources = set()
+    for i, article in enumerate(top_articles, 1):
+        sources.add(article.get("source", ""))
+        if i > 12:
+            continue
+        title, url, source, pub_time = _row(article)
+        if i <= 5:
+            summary.emit("summary_hot", i=i, title=title[:60], url=url, source=source, pub_time=pub_time)
 
-"""
-    
-    for i, article in enumerate(top_articles[:12], 1):
         title = article.get("title", "未知标题")
-        source = article.get("source", "未知来源")
-        url = article.get("url", "")
         score = article.get("importance_score", 0)
-        cats = article.get("auto_categories", [])
-        pub_date = article.get("pub_date", "")
-        pub_time = format_pub_date(pub_date)
-        
-        report += f"""### {i}. {title}
-
-"""
-        report += f"| 属性 | 内容 |\n"
-        report += f"|------|------|\n"
-        report += f"| 📰 **来源** | {source} |\n"
-        report += f"| ⏰ **时间** | {pub_time} |\n"
-        report += f"| 🏷️ **分类** | {', '.join(cats)} |\n"
-        report += f"| ⭐ **重要性** | {'⭐' * min(score, 5)} |\n"
-        report += f"| 🔗 **链接** | [点击查看原文]({url}) |\n\n"
-        
-        # 添加简要分析
-        if "发布" in title or "推出" in title:
-            report += "> 📢 **产品发布动态** - 值得关注的新产品/新功能发布\n\n"
-        elif "融资" in title or "投资" in title:
-            report += "> 💰 **资本动态** - 行业资本流向值得关注\n\n"
-        elif "突破" in title or "首次" in title:
-            report += "> 🚀 **技术突破** - 行业里程碑事件\n\n"
-        elif "开源" in title:
-            report += "> 🔓 **开源动态** - 开源社区重要进展\n\n"
-        
-        report += "---\n\n"
-    
-    # 分类深度分析
-    report += """## 三、行业趋势分析
-
-"""
-    
-    # AI板块
-    ai_articles = categorized.get("AI", [])
-    if ai_articles:
-        report += f"""### 🤖 AI/大模型板块 ({len(ai_articles)}条)
-
-本日AI相关资讯共{len(ai_articles)}条，主要涉及：
-
-"""
-        for a in ai_articles[:10]:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            pub_time = format_pub_date(a.get("pub_date", ""))
-            report += f"- [{title}]({url}) *{source} · {pub_time}*\n"
-        
-        report += "\n**趋势洞察**: "
-        
-        ai_titles = " ".join([a.get("title", "") for a in ai_articles])
-        insights = []
-        if "开源" in ai_titles:
-            insights.append("开源模型持续活跃，社区生态繁荣发展")
-        if "Agent" in ai_titles or "智能体" in ai_titles:
-            insights.append("AI Agent成为新的竞争焦点，各大厂商加速布局")
-        if "多模态" in ai_titles:
-            insights.append("多模态技术快速演进，应用场景不断拓展")
-        if "推理" in ai_titles:
-            insights.append("推理能力成为模型竞争新战场")
-        
-        if insights:
-            report += "；".join(insights) + "。"
+        detailed.emit("top_item", i=i, title=title, url=url, source=article.get("source", "未知来源"),
+                      pub_time=pub_time, cats=", ".join(article.get("auto_categories", [])),
+                      stars="⭐" * min(score, 5))
+        for words, icon, label, text in TOP_NOTES:
+            if any(word in title for word in words):
+                detailed.emit("top_note", icon=icon, label=label, text=text)
+                break
+        detailed.emit("rule")
+
+    # 分类板块
+    summary.emit("summary_points")
+    detailed.emit("trend_head")
+    for cat, summary_heading, summary_limit, detailed_heading, detailed_limit in TREND_SECTIONS:
+        articles = categorized.get(cat, [])
+        if not articles:
+            continue
+        if summary_limit:
+            summary.emit("summary_section", heading=summary_heading)
+        detailed.emit("ai_section" if cat == "AI" else "trend_section",
+                      heading=detailed_heading, count=len(articles))
+
+        for i, article in enumerate(articles[:max(summary_limit, detailed_limit)]):
+            title, url, source, pub_time = _row(article)
+            if i < summary_limit:
+                summary.emit("summary_item", title=title[:55], url=url, source=source, pub_time=pub_time)
+            if i < detailed_limit:
+                detailed.emit("trend_item", title=title[:50], url=url, source=source, pub_time=pub_time)
+
+        if summary_limit:
+            summary.emit("summary_section_end")
+        if cat == "AI":
+            ai_titles = " ".join([a.get("title", "") for a in articles])
+            insights = [text for words, text in AI_INSIGHTS if any(word in ai_titles for word in words)]
+            insight = "；".join(insights) + "。" if insights else "AI领域持续快速发展，建议关注头部玩家动态。"
+            detailed.emit("trend_insight", insight=insight)
         else:
-            report += "AI领域持续快速发展，建议关注头部玩家动态。"
-        
-        report += "\n\n"
-    
-    # 芯片板块
-    chip_articles = categorized.get("芯片", [])
-    if chip_articles:
-        report += f"""### 💻 芯片/算力板块 ({len(chip_articles)}条)
-
-"""
-        for a in chip_articles[:8]:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            pub_time = format_pub_date(a.get("pub_date", ""))
-            report += f"- [{title}]({url}) *{source} · {pub_time}*\n"
-        report += "\n"
-    
-    # 互联网板块
-    internet_articles = categorized.get("互联网", [])
-    if internet_articles:
-        report += f"""### 🌐 互联网/巨头板块 ({len(internet_articles)}条)
-
-"""
-        for a in internet_articles[:8]:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            pub_time = format_pub_date(a.get("pub_date", ""))
-            report += f"- [{title}]({url}) *{source} · {pub_time}*\n"
-        report += "\n"
-    
-    # 投资板块
-    invest_articles = categorized.get("创业投资", [])
-    if invest_articles:
-        report += f"""### 💵 投资/融资板块 ({len(invest_articles)}条)
-
-"""
-        for a in invest_articles[:8]:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            pub_time = format_pub_date(a.get("pub_date", ""))
-            report += f"- [{title}]({url}) *{source} · {pub_time}*\n"
-        report += "\n"
-    
-    # 开源板块
-    open_source_articles = categorized.get("开源", [])
-    if open_source_articles:
-        report += f"""### 🔓 开源板块 ({len(open_source_articles)}条)
-
-"""
-        for a in open_source_articles[:5]:
-            title = a.get("title", "")[:50]
-            url = a.get("url", "")
-            source = a.get("source", "")
-            pub_time = format_pub_date(a.get("pub_date", ""))
-            report += f"- [{title}]({url}) *{source} · {pub_time}*\n"
-        report += "\n"
-    
-    report += f"""---
-
-## 四、明日关注点
-
-基于今日数据分析，建议关注以下方向：
-
-1. **大模型竞争格局** - 关注OpenAI、Google、Anthropic等头部玩家动态
-2. **国产算力突破** - 芯片自主可控进程值得持续跟踪
-3. **应用落地进展** - AI应用商业化进入关键期
-4. **资本流向变化** - 投资热点可能预示下一波风口
-
----
-
-## 五、数据来源
-
-本报告数据来源于国内外主流科技媒体：
-
-"""
-    
-    sources = set(a.get("source", "") for a in top_articles)
+            detailed.emit("trend_section_end")
+
+    # 提及异动 (摘要前 5 个, 详细报告全部)
+    if entity_spikes:
+        summary.emit("summary_section", heading="📈 提及异动")
+        detailed.emit("spike_section")
+        for i, spike in enumerate(entity_spikes):
+            if i < 5:
+                summary.emit("spike_item", **spike)
+            detailed.emit("spike_item", **spike)
+        summary.emit("summary_section_end")
+        detailed.emit("trend_section_end")
+    
+    # 结尾
+    summary.emit("summary_foot", now=now)
+    detailed.emit("detailed_tail")
     for source in sorted(sources):
-        report += f"- {source}\n"
-    
-    report += f"""
-
----
+        detailed.emit("source_item", source=source)
+    detailed.emit("detailed_foot", now=now)
 
-*报告生成时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}*  
-*由 Tech News Aggregator v2 自动生成*
-"""
-    
     return report
 
-def main():
-    """主函数"""
+def generate_summary(data):
+    """生成500字摘要 - 带来源链接和发布时间"""
+    return render_reports(data, ("md",))["summary"].render()
+
+def generate_detailed_report(data):
+    """生成详细报告 - 带来源链接和发布时间"""
+    return render_reports(data, ("md",))["detailed"].render()
+
+def main(date=None, data=None):
+    """主函数 (date: 为指定日期重新生成报告; data: 处理器刚返回的处理结果, 流水线中直接传入, 不再读文件)"""
     print(f"[{datetime.now().isoformat()}] 开始生成分析报告...")
     
-    data = load_processed_data()
+    if data is None:
+        data = load_processed_data(date)
+    else:
+        data = processed_format.resolve(data)
     
     if not data:
         print("错误: 未找到处理后的数据")
         return
     
-    summary = generate_summary(data)
-    detailed = generate_detailed_report(data)
+    # 一次渲染得到全部文档和格式
+    report = render_reports(data)
+    summary = report["summary"].render()
+    detailed = report["detailed"].render()
     
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     date = data.get("date", datetime.now().strftime("%Y-%m-%d"))
@@ -342,16 +343,17 @@ def main():
     day_dir = OUTPUT_DIR / year_month
     day_dir.mkdir(parents=True, exist_ok=True)
     
+    # 每份内容只在对象存储中保存一次, 按日期的路径为硬链接
+    store = output_store.OutputStore()
+    
     # 保存摘要
     summary_file = day_dir / f"summary_{date}.md"
-    with open(summary_file, "w", encoding="utf-8") as f:
-        f.write(summary)
+    store.put(summary_file, summary)
     print(f"✅ 摘要已保存: {summary_file}")
     
     # 保存详细报告
     detailed_file = day_dir / f"detailed_{date}.md"
-    with open(detailed_file, "w", encoding="utf-8") as f:
-        f.write(detailed)
+    store.put(detailed_file, detailed)
     print(f"✅ 详细报告已保存: {detailed_file}")
     
     # 保存JSON
@@ -359,15 +361,23 @@ def main():
     report_data = {
         "date": date,
         "generated_at": datetime.now().isoformat(),
-        "summary": summary,
-        "detailed_report": detailed,
+        # 摘要和详细报告引用同目录下的 .md 文件, 不再内嵌全文 (output_store.load_report 可还原)
+        "files": {"summary": summary_file.name, "detailed_report": detailed_file.name},
         "stats": {
             "total_articles": data.get("total_articles", 0),
             "categories": data.get("categories", {})
         }
     }
-    with open(json_file, "w", encoding="utf-8") as f:
-        json.dump(report_data, f, ensure_ascii=False, indent=2)
+    store.put(json_file, json.dumps(report_data, ensure_ascii=False, indent=2))
+    
+    # 保存HTML (REPORT_HTML=1)
+    if "html" in report.formats:
+        for name, title in (("summary", f"科技资讯日报 - {date}"), ("detailed", f"科技资讯深度分析报告 - {date}")):
+            html_file = day_dir / f"{name}_{date}.html"
+            store.put(html_file, report[name].render("html", title))
+            print(f"✅ HTML已保存: {html_file}")
+    
+    store.save()
     
     print(f"\n🎉 报告生成完成!")
     
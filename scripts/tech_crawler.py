@@ -6,21 +6,33 @@ Tech News Crawler v6 - 国际版
 - 支持 RSS 订阅源
 """
 
-import json
+import os
 import re
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 import hashlib
-import subprocess
 import html
-import xml.etree.ElementTree as ET
+
+import article_index
+import charset
+import feed_cache
+import fetch_archive
+import feed_parser
+import http_client
+import link_extractor
+import raw_store
 
 PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
 DATA_DIR = PROJECT_ROOT / "data" / "raw"
 LOGS_DIR = PROJECT_ROOT / "logs"
 
+# 全局并发抓取上限 (环境变量 CRAWL_CONCURRENCY 可覆盖, 设为 1 即退回顺序抓取)
+CRAWL_CONCURRENCY = int(os.environ.get("CRAWL_CONCURRENCY", "8"))
+
 # 国内科技媒体
 CN_SOURCES = [
     {"name": "IT之家", "url": "https://www.ithome.com", "type": "tech_news", "priority": "high", "category": ["科技", "数码"]},
@@ -70,14 +82,17 @@ USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
 ]
 
+_log_lock = threading.Lock()
+
 def log(msg, level="INFO"):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [{level}] {msg}")
-    try:
-        with open(LOGS_DIR / f"crawler_{datetime.now().strftime('%Y%m%d')}.log", "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] [{level}] {msg}\n")
-    except:
-        pass
+    with _log_lock:  # 并发抓取时避免日志行交错
+        print(f"[{timestamp}] [{level}] {msg}")
+        try:
+            with open(LOGS_DIR / f"crawler_{datetime.now().strftime('%Y%m%d')}.log", "a", encoding="utf-8") as f:
+                f.write(f"[{timestamp}] [{level}] {msg}\n")
+        except:
+            pass
 
 def generate_id(text):
     return hashlib.md5(text.encode()).hexdigest()[:12]
@@ -133,61 +148,50 @@ def fetch_rss(source):
     log(f"RSS 获取: {source['name']}")
     
     try:
-        cmd = ["curl", "-s", "-L",
-               "--connect-timeout", "15",
-               "--max-time", "30",
-               "-H", f"User-Agent: {random.choice(USER_AGENTS)}",
-               rss_url]
-        
-        result = subprocess.run(cmd, capture_output=True, timeout=45)
-        
-        if not result.stdout or len(result.stdout) < 100:
-            return []
-        
-        content = result.stdout.decode('utf-8', errors='replace')
-        
-        # 解析 XML
-        articles = []
-        root = ET.fromstring(content)
+        validators = feed_cache.default_store()
+        headers = {"User-Agent": random.choice(USER_AGENTS)}
+        headers.update(validators.headers_for(rss_url))
         
-        # 处理 RSS 2.0 格式
-        for item in root.findall('.//item')[:50]:
-            try:
-                title_elem = item.find('title')
-                link_elem = item.find('link')
-                pub_date_elem = item.find('pubDate')
-                desc_elem = item.find('description')
-                
-                if title_elem is None or link_elem is None:
-                    continue
-                
-                title = clean_text(title_elem.text) if title_elem.text else ""
-                url = link_elem.text.strip() if link_elem.text else ""
-                pub_date = parse_pub_date(pub_date_elem.text) if pub_date_elem is not None else None
-                
-                if not title or len(title) < 5 or not url:
+        with http_client.get(rss_url, headers=headers, connect_timeout=15, max_time=30,
+                             stream=True) as resp:
+            if resp.status == 304:
+                log(f"{source['name']} (RSS): 无更新 (304)")
+                return feed_cache.NOT_MODIFIED
+            
+            # 流式解析 RSS 2.0 / Atom, 取前 50 条后停止读取
+            articles = []
+            for item in feed_parser.iter_feed_items(resp.iter_content(), limit=50):
+                try:
+                    title = clean_text(item["title"])
+                    url = item["link"]
+                    pub_date = parse_pub_date(item["pub_date"])
+                    
+                    if not title or len(title) < 5 or not url:
+                        continue
+                    
+                    article = {
+                        "id": generate_id(url + title),
+                        "title": title,
+                        "url": url,
+                        "source": source["name"],
+                        "categories": source.get("category", []),
+                        "pub_date": pub_date,  # 发布时间
+                        "crawl_time": datetime.now().isoformat(),
+                        "date": datetime.now().strftime("%Y-%m-%d")
+                    }
+                    
+                    articles.append(article)
+                    
+                except Exception as e:
                     continue
-                
-                article = {
-                    "id": generate_id(url + title),
-                    "title": title,
-                    "url": url,
-                    "source": source["name"],
-                    "categories": source.get("category", []),
-                    "pub_date": pub_date,  # 发布时间
-                    "crawl_time": datetime.now().isoformat(),
-                    "date": datetime.now().strftime("%Y-%m-%d")
-                }
-                
-                articles.append(article)
-                
-            except Exception as e:
-                continue
+        
+        if articles:
+            validators.update(rss_url, resp)
         
         log(f"{source['name']} (RSS): {len(articles)} 条")
         return articles
         
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         log(f"RSS 超时: {source['name']}", "WARN")
         return []
     except Exception as e:
@@ -202,45 +206,22 @@ def fetch_html(source):
     log(f"HTML 获取: {name}")
     
     try:
-        cmd = ["curl", "-s", "-L",
-               "--connect-timeout", "10",
-               "--max-time", "25",
-               "-H", f"User-Agent: {random.choice(USER_AGENTS)}",
-               "-H", "Accept: text/html,*/*",
-               url]
-        
-        result = subprocess.run(cmd, capture_output=True, timeout=35)
+        resp = http_client.get(url,
+                               headers={"User-Agent": random.choice(USER_AGENTS),
+                                        "Accept": "text/html,*/*"},
+                               connect_timeout=10, max_time=25)
         
-        if not result.stdout or len(result.stdout) < 500:
+        if not resp.content or len(resp.content) < 500:
             return []
         
-        # 解码
-        for enc in ['utf-8', 'gbk', 'gb2312', 'latin-1']:
-            try:
-                content = result.stdout.decode(enc)
-                break
-            except:
-                continue
-        else:
-            content = result.stdout.decode('utf-8', errors='replace')
-        
-        # 提取链接
-        pattern = r'<a[^>]*href=["\']([^"\']+)["\'][^>]*>([^<]+)</a>'
-        links = re.findall(pattern, content, re.IGNORECASE)
-        
-        base_domain = re.match(r'https?://([^/]+)', url)
-        base_domain = base_domain.group(1) if base_domain else ""
+        # 按响应头 / meta / 站点缓存确定编码, 按需分块解码
+        content = charset.iter_decoded(resp)
         
         articles = []
         seen_urls = set()
         
-        for href, title in links[:150]:
-            href = href.strip()
-            if href.startswith("/"):
-                href = f"https://{base_domain}{href}"
-            elif not href.startswith("http"):
-                continue
-            
+        # 逐个提取链接, 收集够有效文章后即停止解析
+        for href, title in link_extractor.iter_links(content, resp.url or url, max_links=150):
             if href in seen_urls:
                 continue
             seen_urls.add(href)
@@ -278,7 +259,7 @@ def fetch_html(source):
         log(f"{name} (HTML): {len(articles)} 条")
         return articles
         
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         log(f"HTML 超时: {name}", "WARN")
         return []
     except Exception as e:
@@ -307,82 +288,124 @@ def crawl_source(source):
     # 优先使用 RSS
     if source.get("rss"):
         articles = fetch_rss(source)
+        if articles is feed_cache.NOT_MODIFIED:
+            return []  # 订阅源自上次抓取后无变化, 无需回退 HTML
         if articles:
             return articles
     
     # RSS 失败则用 HTML
     return fetch_html(source)
 
-def main():
-    log("=" * 60)
-    log("科技资讯爬虫 v6 启动 (国际增强版)")
-    log("=" * 60)
-    
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+def _crawl_source_safe(source):
+    """爬取单个数据源, 异常不向外传播"""
+    try:
+        return crawl_source(source)
+    except Exception as e:
+        log(f"爬取 {source['name']} 异常: {e}", "ERROR")
+        return []
+
+def iter_crawl(sources, concurrency=None, early=None):
+    """逐个数据源产出抓取结果
     
-    all_articles = []
+    并发模式下所有源共用一个线程池, 总耗时取决于最慢的源而非各源之和;
+    结果按 sources 顺序产出, 保证后续去重结果与顺序抓取一致。
+    early: 并发模式下, 某个源完成时排在前面的源还没有完成, 就以结果的副本调用 early(articles),
+           供流式模式提前预览; 在线程池线程中调用, 不应阻塞。顺序抓取时结果本来就按完成顺序产出, 不调用
+    """
+    concurrency = concurrency or CRAWL_CONCURRENCY
     
-    # 爬取国内源
-    log("\n📍 爬取国内数据源...")
-    for source in CN_SOURCES:
-        try:
-            articles = crawl_source(source)
-            all_articles.extend(articles)
-            time.sleep(random.uniform(0.3, 0.8))
-        except Exception as e:
-            log(f"爬取 {source['name']} 异常: {e}", "ERROR")
+    if concurrency <= 1:
+        for source in sources:
+            yield _crawl_source_safe(source)
+            time.sleep(random.uniform(0.3, 1.0))
+        return
     
-    # 爬取国际源
-    log("\n🌍 爬取国际数据源...")
-    for source in INTL_SOURCES:
-        try:
-            articles = crawl_source(source)
-            all_articles.extend(articles)
-            time.sleep(random.uniform(0.5, 1.0))
-        except Exception as e:
-            log(f"爬取 {source['name']} 异常: {e}", "ERROR")
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(sources))) as pool:
+        futures = [pool.submit(_crawl_source_safe, source) for source in sources]
+        if early:
+            def preview(future, earlier):
+                if not all(f.done() for f in earlier):
+                    early([dict(a) for a in future.result()])
+            for i, future in enumerate(futures):
+                future.add_done_callback(lambda f, earlier=futures[:i]: preview(f, earlier))
+        # 按 sources 顺序取结果: 先完成的源在此等待排在前面的源 (去重与写入顺序不变)
+        for future in futures:
+            yield future.result()
+
+def crawl_all(sources, concurrency=None):
+    """抓取全部数据源, 结果按 sources 顺序拼接"""
+    all_articles = []
+    for articles in iter_crawl(sources, concurrency):
+        all_articles.extend(articles)
+    return all_articles
+
+def main(sink=None, preview=None):
+    """抓取全部数据源, 返回原始数据文件路径
     
-    # 去重
-    seen = set()
-    unique = []
-    for a in all_articles:
-        key = a["id"] + a["title"][:20]
-        if key not in seen:
-            seen.add(key)
-            unique.append(a)
+    sink:    流式模式下每个数据源去重后的新文章 (写入原始文件之后) 交给 sink(articles), 按数据源配置顺序
+    preview: 先于排在前面的数据源完成的源, 其未去重副本交给 preview(articles) (只用于临时报告), 见 iter_crawl
+    """
+    log("=" * 60)
+    log("科技资讯爬虫 v6 启动 (国际增强版)")
+    log("=" * 60)
     
-    # 统计
-    source_stats = {}
-    for a in unique:
-        src = a.get("source", "未知")
-        source_stats[src] = source_stats.get(src, 0) + 1
+    data_dir = fetch_archive.raw_dir(DATA_DIR)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
     
-    # 保存
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = DATA_DIR / f"news_{timestamp}.json"
-    
-    output_data = {
+    output_file = raw_store.raw_path(data_dir, "news", timestamp)
+    meta = {
         "crawl_time": datetime.now().isoformat(),
         "version": "v6",
-        "total_articles": len(unique),
         "cn_sources": [s["name"] for s in CN_SOURCES],
         "intl_sources": [s["name"] for s in INTL_SOURCES],
-        "source_stats": source_stats,
-        "articles": unique
     }
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    counts = f"{len(CN_SOURCES)} 个国内源 + {len(INTL_SOURCES)} 个国际源"
+    if CRAWL_CONCURRENCY <= 1:
+        log(f"\n🚀 顺序抓取 {counts}")
+    else:
+        log(f"\n🚀 并发抓取 {counts} (并发上限 {CRAWL_CONCURRENCY})")
+    
+    seen = set()
+    source_stats = {}
+    known_before = 0
+    with raw_store.RawWriter(output_file, meta) as writer, article_index.ArticleIndex(fetch_archive.index_path(article_index.INDEX_FILE)) as index:
+        for articles in iter_crawl(CN_SOURCES + INTL_SOURCES, early=preview):
+            # 按规范化 URL 去重 (标题改动不算新文章)
+            batch = []
+            for a in articles:
+                key = article_index.article_key(a)
+                if key not in seen:
+                    seen.add(key)
+                    batch.append(a)
+            
+            # 跳过往日已抓取过的文章
+            fresh = article_index.unseen_today(index, "tech", batch)
+            known_before += len(batch) - len(fresh)
+            
+            # 每完成一个数据源即追加写入
+            writer.write(fresh)
+            for a in fresh:
+                src = a.get("source", "未知")
+                source_stats[src] = source_stats.get(src, 0) + 1
+            if sink:
+                sink(fresh)
+        
+        writer.close({"total_articles": writer.count, "source_stats": source_stats})
+    
+    fetch_archive.save_caches(feed_cache.default_store(), charset.default_cache())
     
     log("\n" + "=" * 60)
-    log(f"✅ 完成! 共 {len(unique)} 条资讯")
+    log(f"📇 文章索引: 往日已出现 {known_before} 条, 已跳过")
+    log(f"✅ 完成! 共 {writer.count} 条资讯")
     log(f"📁 保存: {output_file}")
     log("\n📊 数据源统计:")
     for src, count in sorted(source_stats.items(), key=lambda x: x[1], reverse=True)[:10]:
         log(f"   {src}: {count} 条")
     
-    return unique
+    return output_file
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
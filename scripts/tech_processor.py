@@ -6,6 +6,7 @@
 - 支持多级分类
 """
 
+import io
 import json
 import os
 from datetime import datetime
@@ -13,9 +14,23 @@ from pathlib import Path
 from collections import defaultdict
 import re
 
+import article_index
+import article_record
+import article_search
+import daily_rollup
+import entity_trends
+import ingest_state
+import output_store
+import process_pool
+import processed_format
+import raw_store
+import story_cluster
+from keyword_automaton import KeywordAutomaton
+
 PROJECT_ROOT = Path("/home/admin/.openclaw/workspace/tech-news")
 RAW_DIR = PROJECT_ROOT / "data" / "raw"
 PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+STATE_DIR = PROCESSED_DIR / "state"
 SOURCES_FILE = PROJECT_ROOT / "sources" / "media_list.json"
 
 def load_categories():
@@ -81,14 +96,126 @@ EXTENDED_KEYWORDS = {
     ]
 }
 
-def categorize_article(article, categories):
-    """对文章进行分类 - 优化版"""
+# 重要性评分的核心关键词权重（仅匹配标题）
+CORE_KEYWORDS = [
+    # AI 公司/产品（最高权重）
+    ("OpenAI", 5), ("openai", 5), ("DeepSeek", 5), ("deepseek", 5),
+    ("Anthropic", 5), ("anthropic", 5), ("Claude", 4), ("claude", 4),
+    ("GPT", 4), ("gpt", 4), ("Gemini", 4), ("gemini", 4),
+    ("ChatGPT", 4), ("chatgpt", 4), ("Sora", 4), ("sora", 4),
+    ("GLM", 4), ("智谱", 4), ("千问", 4), ("豆包", 3), ("Kimi", 3),
+    ("Llama", 3), ("Mistral", 3), ("xAI", 3),
+    
+    # 重要事件关键词
+    ("发布", 3), ("推出", 2), ("开源", 3), ("突破", 4), ("首次", 3),
+    ("融资", 3), ("收购", 3), ("上市", 2), ("IPO", 2),
+    
+    # 技术关键词
+    ("大模型", 3), ("AI", 2), ("AGI", 3), ("Agent", 3), ("智能体", 3),
+    ("多模态", 2), ("Transformer", 2), ("推理", 2),
+    
+    # 芯片公司
+    ("英伟达", 3), ("NVIDIA", 3), ("nvidia", 3), ("台积电", 2),
+    ("AMD", 2), ("Intel", 2), ("高通", 2),
+    
+    # 科技巨头
+    ("Google", 2), ("Meta", 2), ("微软", 2), ("Microsoft", 2),
+    ("苹果", 2), ("Apple", 2), ("特斯拉", 2), ("Tesla", 2),
+    ("华为", 2), ("字节", 2), ("阿里", 2), ("腾讯", 2),
+    
+    # 负面/争议（也重要）
+    ("争议", 2), ("离职", 2), ("裁员", 2), ("诉讼", 2), ("调查", 2)
+]
+
+# 跟踪提及量的公司/产品实体: {实体名: 别名} (仅匹配标题, 不区分大小写;
+# 英文别名须是完整单词, 见 _alias_in_title)
+TECH_ENTITIES = {
+    "OpenAI": ("OpenAI", "ChatGPT", "Sora"), "Anthropic": ("Anthropic", "Claude"),
+    "DeepSeek": ("DeepSeek",), "Google": ("Google", "谷歌", "Gemini"), "xAI": ("xAI", "Grok"),
+    "微软": ("微软", "Microsoft"), "苹果": ("苹果", "Apple", "iPhone"), "特斯拉": ("特斯拉", "Tesla"),
+    "英伟达": ("英伟达", "NVIDIA"), "AMD": ("AMD",), "英特尔": ("英特尔", "Intel"), "高通": ("高通",),
+    "台积电": ("台积电", "TSMC"), "中芯国际": ("中芯国际",), "华为": ("华为",), "小米": ("小米",),
+    "字节跳动": ("字节", "抖音", "豆包"), "阿里巴巴": ("阿里", "淘宝", "千问", "通义"),
+    "腾讯": ("腾讯", "微信"), "百度": ("百度", "文心"), "美团": ("美团",), "京东": ("京东",),
+    "拼多多": ("拼多多",), "智谱": ("智谱", "GLM"), "月之暗面": ("月之暗面", "Kimi"),
+    "比亚迪": ("比亚迪",), "蔚来": ("蔚来",), "理想": ("理想汽车",), "小鹏": ("小鹏",),
+}
+# 同时是普通英文单词或常见缩写的别名, 只按原大小写匹配 (apple、intel inside 等不计)
+CASE_SENSITIVE_ALIASES = ("Intel", "AMD", "GLM", "Sora", "Grok", "Apple")
+_WORD_CHAR = re.compile(r"[a-z0-9]")
+
+_automaton = None
+
+def keyword_automaton():
+    """分类关键词与核心关键词统一编译为一个自动机 (进程内只编译一次)"""
+    global _automaton
+    if _automaton is None:
+        automaton = KeywordAutomaton()
+        for category, keywords in EXTENDED_KEYWORDS.items():
+            for keyword in keywords:
+                automaton.add(keyword.lower(), ("category", category))
+        for keyword, weight in CORE_KEYWORDS:
+            automaton.add(keyword.lower(), ("core", weight))
+        for entity, aliases in TECH_ENTITIES.items():
+            for alias in aliases:
+                automaton.add(alias.lower(), ("entity", (entity, alias)))
+        _automaton = automaton.build()
+    return _automaton
+
+def _alias_in_title(title, title_lower, alias, end):
+    """别名在标题中是否成立: 英文别名前后不能紧接字母或数字 (Intelligence、Pineapple 不算),
+    CASE_SENSITIVE_ALIASES 还须大小写一致; end 为第一次出现的结束位置, 不成立时继续检查后面的出现"""
+    if not alias.isascii():
+        return True
+    needle = alias.lower()
+    start = end - len(needle)
+    while start >= 0:
+        end = start + len(needle)
+        if (not _WORD_CHAR.match(title_lower[start - 1:start] if start else " ")
+                and not _WORD_CHAR.match(title_lower[end:end + 1] or " ")
+                and (alias not in CASE_SENSITIVE_ALIASES or title[start:end] == alias)):
+            return True
+        start = title_lower.find(needle, start + 1)
+    return False
+
+def scan_keywords(title, url):
+    """单遍扫描标题+URL, 返回 (各分类关键词得分, 核心关键词加分, 标题中提到的实体)
+    
+    分类关键词: 出现在标题中 +2, 仅出现在 URL 中 +1;
+    核心关键词与实体: 仅统计标题中的命中。
+    """
+    automaton = keyword_automaton()
+    title_lower = title.lower()
+    title_end = len(title_lower)
+    
+    category_scores = {}
+    core_score = 0
+    entities = []
+    for pid, end in automaton.first_positions(title_lower + " " + url.lower()).items():
+        in_title = end <= title_end
+        for kind, value in automaton.payloads[pid]:
+            if kind == "category":
+                category_scores[value] = category_scores.get(value, 0) + (2 if in_title else 1)
+            elif not in_title:
+                continue
+            elif kind == "core":
+                core_score += value
+            elif value[0] not in entities and _alias_in_title(title, title_lower, value[1], end):
+                entities.append(value[0])
+    
+    # 按 EXTENDED_KEYWORDS 的顺序返回, 同分时的排序与逐类匹配一致
+    ordered = {cat: category_scores[cat] for cat in EXTENDED_KEYWORDS if cat in category_scores}
+    return ordered, core_score, entities
+
+def categorize_article(article, categories, hits=None):
+    """对文章进行分类 - 优化版
+    
+    hits: scan_keywords 的结果, 已扫描过时传入可避免重复扫描
+    """
     title = article.get("title", "")
     url = article.get("url", "")
     source_categories = article.get("categories", [])  # 来源预定义分类
     
-    text = (title + " " + url).lower()
-    
     matched_categories = []
     match_scores = {}  # 记录每个分类的匹配得分
     
@@ -108,20 +235,11 @@ def categorize_article(article, categories):
         if mapped_cat in EXTENDED_KEYWORDS:
             match_scores[mapped_cat] = match_scores.get(mapped_cat, 0) + 3  # 来源分类加分
     
-    # 2. 使用扩展关键词匹配标题和URL
-    for category, keywords in EXTENDED_KEYWORDS.items():
-        score = 0
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            if keyword_lower in text:
-                # 标题中的关键词权重更高
-                if keyword_lower in title.lower():
-                    score += 2
-                else:
-                    score += 1
-        
-        if score > 0:
-            match_scores[category] = match_scores.get(category, 0) + score
+    # 2. 使用扩展关键词匹配标题和URL（标题中的关键词权重更高）
+    if hits is None:
+        hits = scan_keywords(title, url)
+    for category, score in hits[0].items():
+        match_scores[category] = match_scores.get(category, 0) + score
     
     # 3. 选择得分最高的分类（最多选3个）
     sorted_cats = sorted(match_scores.items(), key=lambda x: x[1], reverse=True)
@@ -131,11 +249,10 @@ def categorize_article(article, categories):
     
     return matched_categories if matched_categories else ["其他"]
 
-def calculate_importance(article):
+def calculate_importance(article, hits=None):
     """计算文章重要性分数 - 优化版"""
     score = 0
     title = article.get("title", "")
-    title_lower = title.lower()
     source = article.get("source", "")
     
     # 1. 来源权重（权威媒体加分）
@@ -151,39 +268,7 @@ def calculate_importance(article):
     score += priority_scores.get(article.get("priority", "medium"), 1)
     
     # 3. 核心关键词权重（高权重）
-    core_keywords = [
-        # AI 公司/产品（最高权重）
-        ("OpenAI", 5), ("openai", 5), ("DeepSeek", 5), ("deepseek", 5),
-        ("Anthropic", 5), ("anthropic", 5), ("Claude", 4), ("claude", 4),
-        ("GPT", 4), ("gpt", 4), ("Gemini", 4), ("gemini", 4),
-        ("ChatGPT", 4), ("chatgpt", 4), ("Sora", 4), ("sora", 4),
-        ("GLM", 4), ("智谱", 4), ("千问", 4), ("豆包", 3), ("Kimi", 3),
-        ("Llama", 3), ("Mistral", 3), ("xAI", 3),
-        
-        # 重要事件关键词
-        ("发布", 3), ("推出", 2), ("开源", 3), ("突破", 4), ("首次", 3),
-        ("融资", 3), ("收购", 3), ("上市", 2), ("IPO", 2),
-        
-        # 技术关键词
-        ("大模型", 3), ("AI", 2), ("AGI", 3), ("Agent", 3), ("智能体", 3),
-        ("多模态", 2), ("Transformer", 2), ("推理", 2),
-        
-        # 芯片公司
-        ("英伟达", 3), ("NVIDIA", 3), ("nvidia", 3), ("台积电", 2),
-        ("AMD", 2), ("Intel", 2), ("高通", 2),
-        
-        # 科技巨头
-        ("Google", 2), ("Meta", 2), ("微软", 2), ("Microsoft", 2),
-        ("苹果", 2), ("Apple", 2), ("特斯拉", 2), ("Tesla", 2),
-        ("华为", 2), ("字节", 2), ("阿里", 2), ("腾讯", 2),
-        
-        # 负面/争议（也重要）
-        ("争议", 2), ("离职", 2), ("裁员", 2), ("诉讼", 2), ("调查", 2)
-    ]
-    
-    for keyword, weight in core_keywords:
-        if keyword in title or keyword.lower() in title_lower:
-            score += weight
+    score += hits[1] if hits is not None else scan_keywords(title, article.get("url", ""))[1]
     
     # 4. 标题特征加分
     # 疑问句/感叹句通常更吸引眼球
@@ -209,73 +294,148 @@ def calculate_importance(article):
     
     return max(score, 1)  # 最低分为1
 
-def process_data():
-    """处理当天爬取的数据"""
-    print(f"[{datetime.now().isoformat()}] 开始处理数据...")
+# 处理阶段写入文章的标注字段 (重新处理时先清除)
+ANNOTATION_FIELDS = ("auto_categories", "importance_score", "entities")
+
+def annotation(article, categories):
+    """分类、重要性与实体 (只读取文章, 返回要写入的字段)"""
+    # 关键词单遍扫描, 结果供分类和评分共用
+    hits = scan_keywords(article.get("title", ""), article.get("url", ""))
     
-    # 加载分类配置
-    categories = load_categories()
+    fields = {
+        # 自动分类
+        "auto_categories": categorize_article(article, categories, hits),
+        # 计算重要性
+        "importance_score": calculate_importance(article, hits),
+    }
+    
+    # 提到的公司/产品实体 (供提及量统计和异动检测)
+    if hits[2]:
+        fields["entities"] = {"companies": hits[2]}
+    return fields
+
+def annotate_article(article, categories):
+    """分类并计算重要性 (增量摄取时每篇新文章只处理一次)"""
+    article.update(annotation(article, categories))
+
+# 进程池工作进程中的分类配置 (由 _init_worker 设置)
+_worker_categories = None
+
+def _init_worker(categories):
+    """工作进程启动时编译一次关键词自动机"""
+    global _worker_categories
+    _worker_categories = categories
+    keyword_automaton()
+
+def _annotate_chunk(articles):
+    return [annotation(article, _worker_categories) for article in articles]
+
+def annotate_articles(articles, categories, workers=None):
+    """批量标注; 开启多进程 (PROCESS_WORKERS) 且文章较多时分块并行, 结果按原顺序写回"""
+    results = process_pool.map_chunks(_annotate_chunk, articles, _init_worker, (categories,), workers)
+    for article, fields in zip(articles, results):
+        article.update(fields)
+
+def open_state():
+    """增量摄取状态 (按规范化 URL 去重)"""
+    return ingest_state.IngestState(RAW_DIR, raw_store.raw_patterns("news"), STATE_DIR, key=article_index.article_key)
+
+def ingest_new(state, categories=None, workers=None, loaded=None):
+    """摄取新增的原始文件; 往日已出现过的文章不再计入, 新文章按天批量标注 (可多进程), 再写入全文检索索引
     
-    # 读取所有原始数据
-    all_articles = []
-    today = datetime.now().strftime("%Y-%m-%d")
-    
-    for file in RAW_DIR.glob("news_*.json"):
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                articles = data.get("articles", [])
-                all_articles.extend(articles)
-        except Exception as e:
-            print(f"读取文件失败 {file}: {e}")
-    
-    # 去重
-    seen_ids = set()
-    unique_articles = []
-    for article in all_articles:
-        aid = article.get("id")
-        if aid not in seen_ids:
-            seen_ids.add(aid)
-            unique_articles.append(article)
+    loaded: {原始文件名: 文章列表}, 流式模式下已在内存中的文章 (已标注、已写入检索索引), 不再读文件、不再重复处理
+    """
+    if categories is None:
+        categories = load_categories()
+    with article_index.ArticleIndex() as index, article_search.SearchIndex() as search:
+        is_new = lambda article, date: index.is_new("tech", article.get("url", ""), date)
+        annotate = lambda articles: annotate_articles(
+            [a for a in articles if ANNOTATION_FIELDS[0] not in a], categories, workers)
+        indexed = {id(article) for articles in (loaded or {}).values() for article in articles}
+        prepare = lambda article: id(article) in indexed or search.add("tech", article)
+        state.ingest(prepare, is_new, annotate, loaded)
+
+def build_processed(today, unique_articles, entity_spikes):
+    """报道聚类、分类排序, 返回当天的处理结果 (不写文件)"""
+    # 近似重复合并为报道 (同一新闻的多家转载), 分类统计和排序都以报道为单位
+    stories = story_cluster.group_stories(unique_articles, "importance_score")
+    rank = lambda x: (x.get("importance_score", 0), x.get("duplicate_count", 1))
     
     # 分类
     categorized = defaultdict(list)
-    for article in unique_articles:
-        # 自动分类
-        auto_categories = categorize_article(article, categories)
-        article["auto_categories"] = auto_categories
-        
-        # 计算重要性
-        article["importance_score"] = calculate_importance(article)
-        
-        for cat in auto_categories:
+    for article in stories:
+        for cat in article["auto_categories"]:
             categorized[cat].append(article)
     
-    # 按重要性排序
+    # 按重要性排序 (同分时转载多的在前)
     for cat in categorized:
-        categorized[cat].sort(key=lambda x: x.get("importance_score", 0), reverse=True)
-    
-    # 保存处理后的数据
-    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-    output_file = PROCESSED_DIR / f"processed_{today}.json"
+        categorized[cat].sort(key=rank, reverse=True)
     
+    # 分类和热门列表只保存文章 id 与得分的引用
+    table = processed_format.ArticleTable("importance_score")
     output_data = {
+        "format": processed_format.FORMAT_VERSION,
         "date": today,
         "process_time": datetime.now().isoformat(),
         "total_articles": len(unique_articles),
+        "total_stories": len(stories),
         "categories": {k: len(v) for k, v in categorized.items()},
-        "categorized_articles": dict(categorized),
-        "top_articles": sorted(unique_articles, key=lambda x: x.get("importance_score", 0), reverse=True)[:20]
+        "entity_spikes": entity_spikes,
+        "categorized_articles": {k: table.refs(v) for k, v in categorized.items()},
+        "top_articles": table.refs(sorted(stories, key=rank, reverse=True)[:20]),
+        # 文章表: 每篇只保存一份, 输出时才还原为字典结构
+        "articles": table.articles
     }
+    return output_data
+
+def save_processed(today, unique_articles, entity_spikes):
+    """生成并原子写入当天的处理结果; 返回 (处理结果, 文件路径)"""
+    output_data = build_processed(today, unique_articles, entity_spikes)
+    output_file = PROCESSED_DIR / f"processed_{today}.json"
+    
+    # 原子写入, 重新处理时读者不会看到写了一半的文件
+    buffer = io.StringIO()
+    processed_format.dump(output_data, buffer)
+    output_store.atomic_write(output_file, buffer.getvalue())
+    return output_data, output_file
+
+def process_data(date=None, workers=None, loaded=None):
+    """处理某天 (默认当天) 爬取的数据
+    
+    只解析上次运行之后新增的原始文件, 合并进当天的增量状态
+    workers: 标注用的进程数, 默认取 PROCESS_WORKERS
+    loaded:  流式模式下已在内存中标注好的原始文件内容, 见 ingest_new
+    """
+    print(f"[{datetime.now().isoformat()}] 开始处理数据...")
+    
+    # 加载分类配置
+    categories = load_categories()
+    
+    today = date or datetime.now().strftime("%Y-%m-%d")
+    
+    # 增量摄取原始数据 (当天已去重, 新文章在摄取时完成分类和评分)
+    state = open_state()
+    ingest_new(state, categories, workers, loaded)
+    unique_articles = [article_record.ArticleRecord.from_dict(article) for article in state.iter_day(today)]
+    
+    # 当天的来源/分类/实体/信号计数, 多日窗口统计直接合并日汇总
+    rollup = daily_rollup.build("tech", today, unique_articles)
+    daily_rollup.save(rollup, PROCESSED_DIR / "rollups")
+    
+    # 实体提及量与近两周基线比较, 标记异动
+    with entity_trends.EntityTrends(PROCESSED_DIR / entity_trends.TRENDS_NAME) as trends:
+        entity_spikes = trends.update(today, rollup["entity_stats"])
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    output_data, output_file = save_processed(today, unique_articles, entity_spikes)
     
-    print(f"处理完成! 共 {len(unique_articles)} 条资讯")
-    print(f"分类统计: {dict((k, len(v)) for k, v in categorized.items())}")
+    print(f"处理完成! 共 {len(unique_articles)} 条资讯, 合并为 {output_data['total_stories']} 条报道")
+    print(f"分类统计: {output_data['categories']}")
+    if entity_spikes:
+        spikes = [f"{x['entity']}({x['count']}次, {x['ratio']}×)" for x in entity_spikes]
+        print(f"提及异动: {', '.join(spikes)}")
     print(f"保存至: {output_file}")
     
     return output_data
 
 if __name__ == "__main__":
-    process_data()
\ No newline at end of file
+    process_data()